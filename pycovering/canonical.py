@@ -0,0 +1,140 @@
+"""
+This module recognizes coverings that are the same up to a symmetry
+of the covered area (e.g. mirror images), see `canonical_form`.
+
+`CoveringStore` remembers hashes of already seen coverings,
+optionally in an index file, so that duplicates can be rejected.
+"""
+
+import hashlib
+import os
+
+from pycovering.models import Block, TwoDCoveringModel, PyramidCoveringModel
+
+
+def area_key(model):
+    """
+    Returns a string identifying the covered area (model type
+    and dimensions), coverings of different areas are never equal
+    """
+    if isinstance(model, TwoDCoveringModel):
+        return f"2d:{model.width}x{model.height}"
+
+    if isinstance(model, PyramidCoveringModel):
+        return f"pyramid:{model.size}"
+
+    raise ValueError("Unknown model type")
+
+
+def canonical_form(model):
+    """
+    Returns a tuple that is equal for two coverings of the same area
+    if and only if one of them can be transformed into the other
+    by a symmetry of the area
+
+    The blocks are numbered in the order of the model positions
+    (block numbers and colors don't matter), the lexicographically
+    smallest numbering over all symmetries is the canonical one.
+    """
+    positions = list(model.all_positions())
+    state = model.state
+
+    best = None
+
+    for symmetry in model.symmetries():
+        labels = {}
+        form = []
+
+        for pos in positions:
+            block = state[symmetry(pos)]
+
+            if block is Block.EMPTY:
+                form.append(-1)
+            else:
+                form.append(labels.setdefault(block.number, len(labels)))
+
+        form = tuple(form)
+
+        if best is None or form < best:
+            best = form
+
+    return best
+
+
+def covering_hash(model):
+    """
+    Returns a stable (hexadecimal) hash of the canonical form of the covering
+    """
+    data = area_key(model) + ":" + ",".join(map(str, canonical_form(model)))
+
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class CoveringStore:
+    """
+    A set of already seen coverings (stored as their hashes)
+
+    If `path` is given, the hashes are loaded from the file and newly
+    added ones are appended to it (one per line), so the store
+    persists across runs.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._hashes = set()
+        self._file = None
+
+        if path is None:
+            return
+
+        try:
+            with open(path, encoding="ascii") as file:
+                self._hashes.update(line.strip() for line in file
+                                    if line.strip())
+        except FileNotFoundError:
+            pass
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # The file is kept open to append hashes, see `close`
+        # pylint: disable=consider-using-with
+        self._file = open(path, "a", encoding="ascii")
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, model):
+        return covering_hash(model) in self._hashes
+
+    def add(self, model):
+        """
+        Adds the covering of `model` to the store, returns False
+        if it (or its symmetric image) was already there
+        """
+        digest = covering_hash(model)
+
+        if digest in self._hashes:
+            return False
+
+        self._hashes.add(digest)
+
+        if self._file is not None:
+            self._file.write(digest + "\n")
+            self._file.flush()
+
+        return True
+
+    def close(self):
+        """
+        Closes the index file (if any)
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,253 @@
+"""
+Catalogs of block shapes satisfying the built-in constraints.
+
+The path and planar constraints only depend on the shape of a block,
+so instead of checking them position by position for every generated
+block, all shapes satisfying them can be enumerated in advance (see
+`pycovering.shapes`). The model then places random shapes from
+the catalog to the first empty position (see
+`GeneralCoveringModel._catalog_step`) and doesn't use the watchers.
+
+Both constraints hold for a connected part of every valid shape (a path
+without its end, a part of a planar block), so shapes of each size are
+grown from the valid shapes one position smaller only. Catalogs are
+saved as JSON files into `CATALOG_DIR` and loaded from there the next
+time, a file that doesn't match the catalog (or `MAX_SHAPES`) is built
+again. Sizes with more than `MAX_SHAPES` shapes are not cataloged,
+blocks of these sizes are generated with the watchers, and larger sizes
+are not grown (or saved) at all.
+
+The first catalogs are built during the covering, which checks its
+cancellation token (see `shapes`) for every grown shape.
+"""
+
+import json
+import os
+
+from pycovering.constraints import PathConstraintWatcher, \
+                                   PlanarConstraintWatcher
+from pycovering.shapes import grid_neighbors, pyramid_neighbors, grow, \
+                              is_valid_shape, normalize
+
+
+VERSION = 2
+
+CATALOG_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pycovering",
+                           "catalogs")
+
+# Larger catalogs would take long to build and to search through
+MAX_SHAPES = 5000
+
+# Geometries of the models (`SHAPE_GEOMETRY`) and their neighbors
+GEOMETRIES = {
+    "grid": grid_neighbors,
+    "pyramid": pyramid_neighbors
+}
+
+# Constraints that can be cataloged and their names in file names
+CONSTRAINTS = {
+    PathConstraintWatcher: "path",
+    PlanarConstraintWatcher: "planar"
+}
+
+
+# pylint: disable=too-many-instance-attributes
+class ShapeCatalog:
+    """
+    Shapes satisfying all `constraints` (watcher classes, keys
+    of `CONSTRAINTS`) in a `geometry` (a key of `GEOMETRIES`) by size,
+    they are loaded from (or built and saved to) `directory` when
+    first needed
+    """
+    def __init__(self, geometry, constraints, directory=None):
+        self.geometry = geometry
+        self.constraints = tuple(constraints)
+        self.directory = CATALOG_DIR if directory is None else directory
+
+        self._neighbors = GEOMETRIES[geometry]
+        self._origin = (0,) * (3 if geometry == "pyramid" else 2)
+        self._name = "-".join(sorted({CONSTRAINTS[constraint]
+                                      for constraint in self.constraints}))
+
+        # {size: tuple of shapes or None if there are too many}
+        self._shapes = {}
+        # {size: prefix tree of the shapes}, see `tree`
+        self._trees = {}
+
+    @staticmethod
+    def supports(geometry, constraints):
+        """
+        Returns True if blocks with `constraints` in a `geometry`
+        can be cataloged
+        """
+        return geometry in GEOMETRIES and bool(constraints) and \
+            all(constraint in CONSTRAINTS for constraint in constraints)
+
+    def file_path(self, size):
+        """
+        Returns the path of the file with shapes of `size`
+        """
+        return os.path.join(self.directory,
+                            f"{self.geometry}-{self._name}-{size}.json")
+
+    def shapes(self, size, cancel_token=None):
+        """
+        Returns a tuple of all valid shapes of `size`, or None if there
+        are more than `MAX_SHAPES` of them (or of smaller shapes)
+
+        Building the catalog raises `CoveringStoppedException` once
+        `cancel_token` is cancelled.
+        """
+        if size not in self._shapes:
+            if size > 1 and self.shapes(size - 1, cancel_token) is None:
+                # The shapes are grown from the smaller ones
+                shapes = None
+            else:
+                try:
+                    shapes = self._load(size)
+                except (OSError, ValueError, KeyError, TypeError):
+                    shapes = self._build(size, cancel_token)
+                    self._save(size, shapes)
+
+            self._shapes[size] = shapes
+
+        return self._shapes[size]
+
+    def tree(self, size, cancel_token=None):
+        """
+        Returns the shapes of `size` without their first position (the
+        origin) as a prefix tree: a tuple of (offset, subtree) pairs,
+        subtrees of the last positions are empty; or None if there are
+        more than `MAX_SHAPES` shapes
+        """
+        if size not in self._trees:
+            shapes = self.shapes(size, cancel_token)
+            self._trees[size] = None if shapes is None \
+                else prefix_tree([shape[1:] for shape in shapes])
+
+        return self._trees[size]
+
+    def _build(self, size, cancel_token):
+        if size == 1:
+            return ((self._origin,),)
+
+        grown = set()
+
+        for shape in self.shapes(size - 1):
+            if cancel_token is not None:
+                cancel_token.check()
+
+            grown |= grow((shape,), self._neighbors)
+
+        shapes = []
+
+        for shape in sorted(grown):
+            if cancel_token is not None:
+                cancel_token.check()
+
+            if is_valid_shape(shape, self.constraints, self._neighbors):
+                shapes.append(shape)
+
+                if len(shapes) > MAX_SHAPES:
+                    return None
+
+        return tuple(shapes)
+
+    def _load(self, size):
+        """
+        Loads the shapes of `size`, raises `ValueError` if the file
+        doesn't contain valid shapes of this catalog
+        """
+        with open(self.file_path(size), encoding="utf-8") as file:
+            data = json.load(file)
+
+        if data["version"] != VERSION:
+            raise ValueError("Unsupported catalog version")
+
+        # A catalog built with another limit may have a different size
+        if (data["geometry"], data["constraints"], data["size"],
+                data["max_shapes"]) != (self.geometry, self._name, size,
+                                        MAX_SHAPES):
+            raise ValueError("The catalog file doesn't match the catalog")
+
+        if data["shapes"] is None:
+            return None
+
+        shapes = tuple(tuple(tuple(pos) for pos in shape)
+                       for shape in data["shapes"])
+
+        if len(shapes) > MAX_SHAPES or len(set(shapes)) != len(shapes):
+            raise ValueError("Invalid number of shapes")
+
+        for shape in shapes:
+            if len(shape) != size or shape[0] != self._origin or \
+                    normalize(shape) != shape:
+                raise ValueError("Invalid shape")
+
+            if not is_valid_shape(shape, self.constraints, self._neighbors):
+                raise ValueError("The shape breaks the constraints")
+
+        return shapes
+
+    def _save(self, size, shapes):
+        """
+        Atomically saves the shapes of `size`, the catalog is only kept
+        in memory if it can't be saved
+        """
+        data = {
+            "version": VERSION,
+            "geometry": self.geometry,
+            "constraints": self._name,
+            "size": size,
+            "max_shapes": MAX_SHAPES,
+            "shapes": shapes
+        }
+
+        path = self.file_path(size)
+        # Processes covering in parallel may save the same catalog
+        temp_path = f"{path}.{os.getpid()}.tmp"
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file, separators=(",", ":"))
+
+            os.replace(temp_path, path)
+        except OSError:
+            pass
+
+
+def prefix_tree(sequences):
+    """
+    Returns a prefix tree of sequences of equal length, see
+    `ShapeCatalog.tree`
+    """
+    children = {}
+
+    for sequence in sequences:
+        if sequence:
+            children.setdefault(sequence[0], []).append(sequence[1:])
+
+    return tuple((first, prefix_tree(rests))
+                 for first, rests in children.items())
+
+
+# Catalogs shared by all models, see `get_catalog`
+_catalogs = {}
+
+
+def get_catalog(geometry, constraints, directory=None):
+    """
+    Returns the (shared) `ShapeCatalog` for `constraints` in a `geometry`,
+    saved in `directory` (`CATALOG_DIR` if None)
+    """
+    if directory is None:
+        directory = CATALOG_DIR
+
+    key = (geometry, frozenset(constraints), directory)
+
+    if key not in _catalogs:
+        _catalogs[key] = ShapeCatalog(geometry, constraints, directory)
+
+    return _catalogs[key]
@@ -0,0 +1,133 @@
+"""
+This module saves checkpoints of long-running coverings, so that
+the covering can be resumed after a crash or restart.
+
+A checkpoint contains the model parameters (see
+`pycovering.serialization.model_params`) and `model.search_state()`,
+pickled and compressed with zlib (pickling the state takes a fraction of
+the time JSON would). It is written to a temporary file which then
+atomically replaces the previous checkpoint, so a crash never leaves
+a half-written one behind. As with any pickle, only load checkpoints
+from trusted sources.
+"""
+
+import os
+import pickle
+import time
+import zlib
+
+from pycovering.serialization import model_params, \
+                                     InvalidModelDataException
+
+
+VERSION = 3
+
+# Seconds between two checkpoints
+DEFAULT_INTERVAL = 5
+
+# Keys of `model.search_state()`
+SEARCH_STATE_KEYS = ("blocks", "stack", "backtracks", "nodes", "lookups",
+                     "elapsed", "color_seed", "finishable_checks",
+                     "kernel_checks", "random")
+
+
+class InvalidCheckpointException(Exception):
+    """
+    This exception is raised if a checkpoint can not be loaded
+    """
+
+
+def save_checkpoint(model, path):
+    """
+    Atomically saves a checkpoint of the covering of `model` to `path`
+    """
+    data = {
+        "version": VERSION,
+        "params": model_params(model),
+        "search": model.search_state()
+    }
+
+    compressed = zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL), 1)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    temp_path = path + ".tmp"
+
+    with open(temp_path, "wb") as file:
+        file.write(compressed)
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path, model):
+    """
+    Loads a checkpoint saved by `save_checkpoint` and returns the search
+    state to resume from (`model.try_cover(resume_from=...)`)
+
+    Raises `InvalidCheckpointException` if the checkpoint is damaged
+    or if it is not a checkpoint of a model equal to `model`.
+    """
+    with open(path, "rb") as file:
+        compressed = file.read()
+
+    try:
+        data = pickle.loads(zlib.decompress(compressed))
+    except (zlib.error, pickle.UnpicklingError, EOFError, AttributeError,
+            ImportError, IndexError, TypeError, ValueError) as exc:
+        raise InvalidCheckpointException(
+            f"Damaged checkpoint: {exc}") from exc
+
+    if not isinstance(data, dict) or data.get("version") != VERSION:
+        raise InvalidCheckpointException("Unsupported checkpoint version")
+
+    try:
+        params = model_params(model)
+    except InvalidModelDataException as exc:
+        raise InvalidCheckpointException(str(exc)) from exc
+
+    if data.get("params") != params:
+        raise InvalidCheckpointException(
+            "The checkpoint is of a different model")
+
+    search = data.get("search")
+
+    if not isinstance(search, dict) or \
+            not all(key in search for key in SEARCH_STATE_KEYS):
+        raise InvalidCheckpointException("Invalid checkpoint data")
+
+    return search
+
+
+class Checkpointer:
+    """
+    Saves a checkpoint of the covering to `path` at most once per
+    `interval` seconds (pass it as `checkpoint` to `model.try_cover`)
+    """
+    def __init__(self, path, interval=DEFAULT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.saved = 0  # Number of saved checkpoints
+
+        self._next_save = time.monotonic() + interval
+
+    def __call__(self, model):
+        if time.monotonic() < self._next_save:
+            return
+
+        save_checkpoint(model, self.path)
+        self.saved += 1
+
+        self._next_save = time.monotonic() + self.interval
+
+    def remove(self):
+        """
+        Removes the checkpoint (once it is not needed)
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -8,6 +8,12 @@ don't have to be done over and over.
 
 Watchers are *persistent* -- they remember all of their previous states and can
 be rolled back to a previous state, which is useful while backtracking.
+
+A model creates its watchers once and resets them (see `reset`) for every
+generated block, so their allocations are not repeated for every step.
+
+Watchers can also check a whole block at once (see `is_valid_block`),
+this is used by algorithms enumerating block shapes in advance.
 """
 
 from math import isclose
@@ -25,6 +31,17 @@ class GeneralConstraintWatcher:
         self.model = model
         self._states = []
 
+    def reset(self, pos):
+        """
+        Start watching a new block at `pos`, forget all previous states.
+
+        This initializes the watcher again, subclasses should override it
+        to reuse their state.
+        """
+        # Watchers written before `reset` only initialize their state here
+        # pylint: disable=unnecessary-dunder-call
+        self.__init__(self.model, pos)
+
     def rollback_state(self):
         """
         Return watcher state to a previous one.
@@ -48,6 +65,14 @@ class GeneralConstraintWatcher:
         """
         self._load_last_state()
 
+    @classmethod
+    def is_valid_block(cls, positions, neighbors):
+        """
+        Returns True if a whole block consisting of `positions` satisfies
+        the constraint, `neighbors(pos)` returns all neighbors of a position
+        """
+        raise NotImplementedError
+
 
 class PathConstraintWatcher(GeneralConstraintWatcher):
     """
@@ -57,6 +82,14 @@ class PathConstraintWatcher(GeneralConstraintWatcher):
     def __init__(self, model, pos):
         super().__init__(model, pos)
 
+        self.end1 = None
+        self.end2 = None
+
+        self.reset(pos)
+
+    def reset(self, pos):
+        self._states.clear()
+
         self.end1 = pos
         self.end2 = pos
 
@@ -95,6 +128,33 @@ class PathConstraintWatcher(GeneralConstraintWatcher):
         new_state = (self.end1, self.end2)
         self._states.append(new_state)
 
+    @classmethod
+    def is_valid_block(cls, positions, neighbors):
+        """
+        The block is a path if it is connected and has one edge less
+        than positions, none of them with more than two neighbors in the block
+        """
+        block = set(positions)
+
+        degrees = [sum(1 for nbr in neighbors(pos) if nbr in block)
+                   for pos in block]
+
+        if sum(degrees) != 2 * (len(block) - 1) or max(degrees) > 2:
+            return False
+
+        # Check connectivity
+        start = next(iter(block))
+        seen = {start}
+        stack = [start]
+
+        while stack:
+            for nbr in neighbors(stack.pop()):
+                if nbr in block and nbr not in seen:
+                    seen.add(nbr)
+                    stack.append(nbr)
+
+        return len(seen) == len(block)
+
 
 class Vector:
     """
@@ -202,8 +262,16 @@ class PlanarConstraintWatcher(GeneralConstraintWatcher):
         super().__init__(model, pos)
 
         self.plane = None
+        self._points = []
+
+        self.reset(pos)
+
+    def reset(self, pos):
+        self._states.clear()
 
+        self.plane = None
         self._points = [Vector(*pos)]
+
         self.commit()
 
     def commit(self):
@@ -246,3 +314,19 @@ class PlanarConstraintWatcher(GeneralConstraintWatcher):
 
         # Other points must lie on the plane
         return self.plane.contains(new_point)
+
+    @classmethod
+    def is_valid_block(cls, positions, neighbors):
+        # Two-dimensional positions always lie in one plane
+        points = [Vector(*pos) if len(pos) == 3 else Vector(*pos, 0)
+                  for pos in positions]
+
+        for i, point3 in enumerate(points[2:], 2):
+            point1, point2 = points[0], points[1]
+
+            if not cls._on_the_same_line(point1, point2, point3):
+                plane = Plane(point1, point2, point3)
+                return all(plane.contains(point) for point in points[i:])
+
+        # All points lie on one line
+        return True
@@ -0,0 +1,225 @@
+"""
+Exact counting and uniformly random sampling of coverings of narrow
+rectangles, using a broken-profile (transfer-matrix) dynamic programming.
+
+The rectangle is filled position by position (row by row), a block is
+always placed so that its first position (see `pycovering.shapes`) covers
+the first empty position. The *profile* is a bit mask of already covered
+positions starting with the current one (bit `dy * width + dx`), it fits
+in `width * max_block_size` bits. A step either skips the current
+position (if it is covered) or places a block to it, and shifts
+the profile by one position.
+
+The steps only depend on the width, the current column, block sizes and
+constraints, so they are computed once (lazily, for reachable profiles)
+and cached in a `ProfileTable`, counting and sampling then take time
+linear in the height.
+"""
+
+import random
+
+from collections import defaultdict
+
+from pycovering.models import TwoDCoveringModel, ImpossibleToFinishException
+from pycovering.shapes import shapes
+
+
+class UnsupportedModelException(Exception):
+    """
+    This exception is raised if the model can not be covered
+    by the profile engine
+    """
+
+
+class ProfileTable:
+    """
+    Steps between profiles for one (width, block sizes,
+    constraints) combination
+    """
+    def __init__(self, width, min_block_size, max_block_size, constraints):
+        self.width = width
+        self.shapes = shapes(min_block_size, max_block_size, constraints)
+
+        # For each column, (bit mask, shape_index) of all shapes
+        # that can be placed to it (relative to the first position)
+        self._masks = [[] for _ in range(width)]
+
+        for index, shape in enumerate(self.shapes):
+            xs = [dx for dx, _ in shape]
+
+            if max(xs) - min(xs) >= width:
+                continue  # Doesn't fit in the rectangle at all
+
+            mask = 0
+
+            for dx, dy in shape:
+                mask |= 1 << (dy * width + dx)
+
+            for column in range(-min(xs), width - max(xs)):
+                self._masks[column].append((mask, index))
+
+        # (column, profile) -> ((next_profile, shape_index), ...),
+        # shape_index is None if the position was already covered
+        self._steps = {}
+
+    def steps(self, column, profile):
+        """
+        Returns a tuple of all possible steps from `profile`
+        in `column` as (next_profile, shape_index) pairs
+        """
+        key = (column, profile)
+        result = self._steps.get(key)
+
+        if result is None:
+            if profile & 1:
+                result = ((profile >> 1, None),)
+            else:
+                result = tuple(((profile | mask) >> 1, index)
+                               for mask, index in self._masks[column]
+                               if not profile & mask)
+
+            self._steps[key] = result
+
+        return result
+
+    def __len__(self):
+        """
+        Returns the number of profiles explored so far
+        """
+        return len(self._steps)
+
+
+_TABLES = {}
+
+
+def get_table(width, min_block_size, max_block_size, constraints=()):
+    """
+    Returns a (cached) `ProfileTable` for the given parameters
+    """
+    key = (width, min_block_size, max_block_size, tuple(constraints))
+    table = _TABLES.get(key)
+
+    if table is None:
+        table = ProfileTable(width, min_block_size, max_block_size,
+                             constraints)
+        _TABLES[key] = table
+
+    return table
+
+
+class ProfileEngine:
+    """
+    Counts and uniformly samples coverings of a `TwoDCoveringModel`
+    with a small width
+    """
+    MAX_WIDTH = 12
+
+    def __init__(self, model):
+        if not isinstance(model, TwoDCoveringModel):
+            raise UnsupportedModelException(
+                "Only rectangles can be covered exactly")
+
+        if model.width > self.MAX_WIDTH:
+            raise UnsupportedModelException(
+                f"The rectangle width must be at most {self.MAX_WIDTH}")
+
+        try:
+            self.table = get_table(model.width, model.min_block_size,
+                                   model.max_block_size,
+                                   model.constraint_watchers)
+        except NotImplementedError as exc:
+            raise UnsupportedModelException(
+                "Some constraints can't check whole blocks") from exc
+
+        self.model = model
+        self._layers_cache = None
+
+    def _layers(self):
+        """
+        Returns a list of dicts, the i-th maps profiles reachable before
+        the i-th position to the number of ways to reach them
+        """
+        width, height = self.model.width, self.model.height
+        total = width * height
+
+        if self._layers_cache is not None and \
+                self._layers_cache[0] == (width, height):
+            return self._layers_cache[1]
+
+        layers = [{0: 1}]
+
+        for index in range(total):
+            # Blocks must not reach below the last row
+            limit = 1 << (total - index - 1)
+            following = defaultdict(int)
+
+            for profile, ways in layers[-1].items():
+                for nxt, _ in self.table.steps(index % width, profile):
+                    if nxt < limit:
+                        following[nxt] += ways
+
+            layers.append(following)
+
+        self._layers_cache = ((width, height), layers)
+
+        return layers
+
+    def count_coverings(self):
+        """
+        Returns the number of all coverings of the model
+        """
+        return self._layers()[-1].get(0, 0)
+
+    def _predecessor(self, layer, column, profile, choice):
+        """
+        Returns the `choice`-th way (as a (previous_profile, shape_index)
+        pair) to reach `profile` from the profiles in `layer`
+        """
+        for previous, ways in layer.items():
+            for nxt, shape_index in self.table.steps(column, previous):
+                if nxt != profile:
+                    continue
+
+                choice -= ways
+
+                if choice < 0:
+                    return previous, shape_index
+
+        raise ValueError("The profile is not reachable")
+
+    def sample_covering(self, rng=random):
+        """
+        Covers the model with a uniformly random covering
+        (all its current blocks are removed)
+        """
+        layers = self._layers()
+        width = self.model.width
+
+        if not layers[-1].get(0):
+            raise ImpossibleToFinishException(
+                "The model can not be covered")
+
+        # Walk the layers backwards, choose a predecessor of the current
+        # profile with a probability proportional to the number of ways
+        # to reach it
+        profile = 0
+        placed = []
+
+        for index in range(len(layers) - 2, -1, -1):
+            choice = rng.randrange(layers[index + 1][profile])
+            profile, shape_index = self._predecessor(
+                layers[index], index % width, profile, choice)
+
+            if shape_index is not None:
+                placed.append((index, shape_index))
+
+        model = self.model
+        model.reset()
+
+        for index, shape_index in reversed(placed):
+            x, y = index % width, index // width
+
+            model.add_block([(x + dx, y + dy) for dx, dy
+                             in self.table.shapes[shape_index]])
+
+        return model
@@ -0,0 +1,229 @@
+"""
+This module exports coverings to image files (PNG or SVG) without
+showing any window.
+
+PNG images are painted into a `QImage`, which doesn't need a running
+QApplication (nor a display), SVG images are written directly.
+Pyramid coverings are exported as a row of layer projections,
+the bottom layer being the leftmost one.
+"""
+
+import os
+
+from xml.sax.saxutils import quoteattr
+
+from PySide2.QtCore import QLineF, QRectF, Qt
+from PySide2.QtGui import QColor, QImage, QPainter, QPen
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+
+
+CELL_SIZE = 24
+MARGIN = 12
+
+# Space between pyramid layers (in cells)
+LAYER_GAP = 1
+
+BACKGROUND = (255, 255, 255)
+BORDER = (0, 0, 0)
+BORDER_WIDTH = 2
+
+FORMATS = ("png", "svg")
+
+
+class ExportException(Exception):
+    """
+    This exception is raised if a covering can not be exported
+    """
+
+
+class Layout:
+    """
+    Geometry of an exported covering in cell units,
+    independent of the output format
+
+    `cells` is a list of (x, y, color) tuples (color is None for cells
+    that shouldn't be filled), `edges` is a list of (x1, y1, x2, y2)
+    segments separating different blocks.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+        self.cells = []
+        self.edges = []
+
+    def add_grid(self, grid, offset_x=0):
+        """
+        Adds cells of `grid`, a dict mapping (x, y) to a block,
+        shifted by `offset_x` cells
+        """
+        for (x, y), block in grid.items():
+            color = block.color if block.number > 0 and block.visible \
+                else None
+
+            self.cells.append((offset_x + x, y, color))
+
+            # Each edge is drawn from the cell on its left/top side,
+            # the other cell doesn't exist for outer edges
+            sides = [
+                ((x + 1, y), (x + 1, y, x + 1, y + 1)),
+                ((x - 1, y), (x, y, x, y + 1)),
+                ((x, y + 1), (x, y + 1, x + 1, y + 1)),
+                ((x, y - 1), (x, y, x + 1, y))
+            ]
+
+            for (nx, ny), (x1, y1, x2, y2) in sides:
+                other = grid.get((nx, ny))
+
+                if other is not None and (other is block or
+                                          (nx, ny) < (x, y)):
+                    continue
+
+                self.edges.append((offset_x + x1, y1, offset_x + x2, y2))
+
+
+def get_layout(model):
+    """
+    Returns a `Layout` of the current covering of `model`
+    """
+    if isinstance(model, TwoDCoveringModel):
+        layout = Layout(model.width, model.height)
+
+        grid = {pos: model.state[pos] for pos in model.all_positions()}
+        layout.add_grid(grid)
+
+        return layout
+
+    if isinstance(model, PyramidCoveringModel):
+        size = model.size
+        layout = Layout(size * size + (size - 1) * LAYER_GAP, size)
+
+        layers = [{} for _ in range(size)]
+
+        for x, y, z in model.all_positions():
+            layers[z][(x, y)] = model.state[(x, y, z)]
+
+        offset = 0
+
+        for layer in layers:
+            layout.add_grid(layer, offset)
+            offset += size + LAYER_GAP
+
+        return layout
+
+    raise ExportException("Unknown model type")
+
+
+def _image_size(layout, cell_size):
+    return (layout.width * cell_size + 2 * MARGIN,
+            layout.height * cell_size + 2 * MARGIN)
+
+
+def render_image(model, cell_size=CELL_SIZE):
+    """
+    Paints the covering of `model` into a new QImage
+    """
+    layout = get_layout(model)
+    width, height = _image_size(layout, cell_size)
+
+    image = QImage(width, height, QImage.Format_RGB32)
+    image.fill(QColor(*BACKGROUND))
+
+    painter = QPainter(image)
+
+    for x, y, color in layout.cells:
+        if color is not None:
+            painter.fillRect(QRectF(MARGIN + x * cell_size,
+                                    MARGIN + y * cell_size,
+                                    cell_size, cell_size),
+                             QColor(*color))
+
+    pen = QPen(QColor(*BORDER), BORDER_WIDTH)
+    pen.setCapStyle(Qt.SquareCap)
+    painter.setPen(pen)
+
+    painter.drawLines([
+        QLineF(MARGIN + x1 * cell_size, MARGIN + y1 * cell_size,
+               MARGIN + x2 * cell_size, MARGIN + y2 * cell_size)
+        for x1, y1, x2, y2 in layout.edges
+    ])
+
+    painter.end()
+
+    return image
+
+
+def svg_lines(model, cell_size=CELL_SIZE):
+    """
+    Returns an iterator of lines of an SVG image of the covering of `model`
+    """
+    layout = get_layout(model)
+    width, height = _image_size(layout, cell_size)
+
+    def rgb(color):
+        red, green, blue = color
+        return quoteattr(f"#{red:02x}{green:02x}{blue:02x}")
+
+    yield '<?xml version="1.0" encoding="UTF-8"?>'
+    yield (f'<svg xmlns="http://www.w3.org/2000/svg" '
+           f'width="{width}" height="{height}" '
+           f'viewBox="0 0 {width} {height}">')
+    yield f'<rect width="100%" height="100%" fill={rgb(BACKGROUND)}/>'
+
+    yield f'<g transform="translate({MARGIN} {MARGIN})">'
+
+    for x, y, color in layout.cells:
+        if color is not None:
+            yield (f'<rect x="{x * cell_size}" y="{y * cell_size}" '
+                   f'width="{cell_size}" height="{cell_size}" '
+                   f'fill={rgb(color)}/>')
+
+    yield (f'<g stroke={rgb(BORDER)} stroke-width="{BORDER_WIDTH}" '
+           f'stroke-linecap="square">')
+
+    for x1, y1, x2, y2 in layout.edges:
+        yield (f'<line x1="{x1 * cell_size}" y1="{y1 * cell_size}" '
+               f'x2="{x2 * cell_size}" y2="{y2 * cell_size}"/>')
+
+    yield '</g>'
+    yield '</g>'
+    yield '</svg>'
+
+
+def export_format(path):
+    """
+    Returns the format ("png" or "svg") given by the extension of `path`
+    """
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+
+    if ext not in FORMATS:
+        raise ExportException(f"Unsupported format '{ext}', "
+                              f"use one of: {', '.join(FORMATS)}")
+
+    return ext
+
+
+def export(model, path, cell_size=CELL_SIZE):
+    """
+    Exports the covering of `model` to `path`,
+    the format is given by the file extension
+    """
+    fmt = export_format(path)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    if fmt == "png":
+        if not render_image(model, cell_size).save(path, "PNG"):
+            raise ExportException(f"Could not write '{path}'")
+        return
+
+    try:
+        with open(path, "w", encoding="utf-8") as file:
+            for line in svg_lines(model, cell_size):
+                file.write(line)
+                file.write("\n")
+    except OSError as exc:
+        raise ExportException(f"Could not write '{path}': {exc}") from exc
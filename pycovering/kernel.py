@@ -0,0 +1,590 @@
+"""
+An optional compiled search kernel, it does the work of
+`GeneralCoveringModel._valid_step` (growing a block by a randomized DFS
+and checking the empty components around it) over flat integer arrays.
+
+Positions are numbered in the order of `model.all_positions()`,
+`neighbors[i]` contains the numbers of neighbors of the i-th position
+(padded with -1) and `occupied[i]` is one of EMPTY, FILLED, PLACEHOLDER.
+The frontier of the generated block is kept like in
+`pycovering.models.Frontier`, `where[i]` is the index of the i-th
+position in it (-1 if it isn't there) and `count[i]` the number of its
+neighbors in the block (both are reset after every block).
+
+The functions are compiled with `numba.njit` if numba is installed
+(`AVAILABLE`), `valid_step.py_func` is the same code in plain Python.
+Random numbers come from a xorshift generator seeded from `random` for
+every block, so both give identical results under a fixed seed. These
+differ from the coverings `_valid_step` finds, that's why models only
+use the kernel with `use_kernel`.
+
+A compiled call can't be interrupted from Python, so the search and
+the flood fills read the `flag` of the covering's cancellation token
+(a one-byte buffer) every `POLL_INTERVAL` iterations and return early
+once it is set.
+"""
+
+import random
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:
+    np = None
+    njit = None
+
+from pycovering.constraints import PathConstraintWatcher, \
+                                   PlanarConstraintWatcher
+
+# The compiled functions get all state as flat arrays
+# pylint: disable=too-many-arguments,too-many-positional-arguments
+
+
+AVAILABLE = njit is not None
+
+# Constraint watchers the kernel reimplements, models with other
+# watchers are covered by `GeneralCoveringModel._valid_step`
+SUPPORTED_WATCHERS = (PathConstraintWatcher, PlanarConstraintWatcher)
+
+EMPTY = 0
+FILLED = 1
+PLACEHOLDER = 2
+
+# Results of `_fill` that are not component sizes
+LARGE = -1
+MERGED = -2
+# Returned by `_fill` and `valid_step` if the covering was cancelled
+CANCELLED = -3
+
+
+def _jit(func):
+    if njit is None:
+        return func
+
+    # Without the GIL, other threads can cancel a running kernel
+    return njit(cache=True, nogil=True)(func)
+
+
+@_jit
+def _next_random(rng):
+    value = rng[0]
+    value ^= value << np.uint64(13)
+    value ^= value >> np.uint64(7)
+    value ^= value << np.uint64(17)
+    rng[0] = value
+
+    return value
+
+
+@_jit
+def _swap(items, i, j, where):
+    items[i], items[j] = items[j], items[i]
+    where[items[i]] = i
+    where[items[j]] = j
+
+
+@_jit
+def _frontier_push(pos, items, size, where, count, occupied, neighbors):
+    """
+    See `Frontier.push`, returns the new size of the frontier, the former
+    index of `pos` in it and the number of added positions
+    """
+    index = where[pos]
+
+    if index >= 0:
+        size -= 1
+        last = items[size]
+        items[index] = last
+        where[last] = index
+        where[pos] = -1
+
+    added = 0
+
+    for nbr in neighbors[pos]:
+        if nbr < 0 or occupied[nbr] != EMPTY:
+            continue
+
+        count[nbr] += 1
+
+        if count[nbr] == 1:
+            where[nbr] = size
+            items[size] = nbr
+            size += 1
+            added += 1
+
+    return size, index, added
+
+
+@_jit
+def _frontier_pop(pos, index, added, items, size, where, count, occupied,
+                  neighbors):
+    """
+    See `Frontier.pop`, returns the new size of the frontier
+    """
+    for nbr in neighbors[pos]:
+        if nbr >= 0 and occupied[nbr] == EMPTY:
+            count[nbr] -= 1
+
+    for _ in range(added):
+        size -= 1
+        where[items[size]] = -1
+
+    if index < 0:
+        return size
+
+    if index < size:
+        items[size] = items[index]
+        where[items[size]] = size
+
+    items[index] = pos
+    where[pos] = index
+
+    return size + 1
+
+
+@_jit
+def _fill(start, fill, base, limit, occupied, neighbors, visited, stack,
+          cancel, poll_interval):
+    """
+    Flood fills the empty component of `start` (see
+    `GeneralCoveringModel._check_components`), returns its size, LARGE
+    if it has more than `limit` positions (if not negative), MERGED
+    if it reached another fill since `base` or CANCELLED
+    """
+    visited[start] = fill
+    stack[0] = start
+    top = 1
+    size = 0
+
+    while top:
+        size += 1
+
+        if 0 <= limit < size:
+            return LARGE
+
+        if size % poll_interval == 0 and cancel[0]:
+            return CANCELLED
+
+        top -= 1
+
+        for nbr in neighbors[stack[top]]:
+            if nbr < 0 or occupied[nbr] != EMPTY:
+                continue
+
+            if visited[nbr] < base:
+                visited[nbr] = fill
+                stack[top] = nbr
+                top += 1
+            elif visited[nbr] != fill:
+                return MERGED
+
+    return size
+
+
+# pylint: disable=too-many-locals
+@_jit
+def _check_components(block, length, limit, occupied, neighbors,
+                      representable, visited, stamp, stack, cancel,
+                      poll_interval):
+    """
+    Returns the number of large components next to the block,
+    -1 if some other one can not be covered (or it was cancelled)
+    """
+    base = stamp[0] + 1
+    large = 0
+
+    for i in range(length):
+        for start in neighbors[block[i]]:
+            if start < 0 or occupied[start] != EMPTY or \
+                    visited[start] >= base:
+                continue
+
+            stamp[0] += 1
+            size = _fill(start, stamp[0], base, limit, occupied, neighbors,
+                         visited, stack, cancel, poll_interval)
+
+            if size == LARGE:
+                large += 1
+            elif size == CANCELLED or \
+                    size >= 0 and not representable[size]:
+                return -1
+
+    return large
+
+
+@_jit
+def _is_finishable(occupied, neighbors, representable, visited, stamp,
+                   stack, cancel, poll_interval):
+    base = stamp[0] + 1
+
+    for start in range(occupied.shape[0]):
+        if occupied[start] != EMPTY or visited[start] >= base:
+            continue
+
+        stamp[0] += 1
+        size = _fill(start, stamp[0], base, -1, occupied, neighbors,
+                     visited, stack, cancel, poll_interval)
+
+        if size == CANCELLED or not representable[size]:
+            return False
+
+    return True
+
+
+@_jit
+def _is_finishable_after(block, length, occupied, neighbors, representable,
+                         local_limit, checks, interval, visited, stamp,
+                         stack, cancel, poll_interval):
+    """
+    See `GeneralCoveringModel._is_finishable_after`, returns False
+    if it was cancelled
+    """
+    check = checks[0]
+    checks[0] += 1
+
+    if check % interval == 0:
+        return _is_finishable(occupied, neighbors, representable, visited,
+                              stamp, stack, cancel, poll_interval)
+
+    large = _check_components(block, length, local_limit, occupied,
+                              neighbors, representable, visited, stamp, stack,
+                              cancel, poll_interval)
+
+    if large < 0:
+        return False
+
+    if large <= 1:
+        return True
+
+    return _check_components(block, length, -1, occupied, neighbors,
+                             representable, visited, stamp, stack, cancel,
+                             poll_interval) >= 0
+
+
+@_jit
+def _path_accepts(pos, length, ends, occupied, neighbors):
+    """
+    See `PathConstraintWatcher`, `ends[length - 1]` are the ends of the
+    current block, the ends after adding `pos` are stored to `ends[length]`
+    """
+    previous = -1
+
+    for nbr in neighbors[pos]:
+        if nbr >= 0 and occupied[nbr] == PLACEHOLDER:
+            if previous >= 0:
+                return False
+
+            previous = nbr
+
+    end1, end2 = ends[length - 1, 0], ends[length - 1, 1]
+
+    if previous < 0:
+        return False
+
+    if previous == end1:
+        ends[length, 0], ends[length, 1] = pos, end2
+    elif previous == end2:
+        ends[length, 0], ends[length, 1] = end1, pos
+    else:
+        return False
+
+    return True
+
+
+@_jit
+def _planar_accepts(pos, length, block, coords, plane):
+    """
+    See `PlanarConstraintWatcher`, `plane` is (a, b, c, d, n) where
+    ax + by + cz = d is the plane of the first n positions of the block,
+    it isn't valid for shorter blocks
+    """
+    if length < 2:
+        return True
+
+    # The plane of positions removed while backtracking is no longer
+    # valid, a collinear third position wouldn't replace it
+    if plane[4] > length:
+        plane[4] = 0
+
+    point = coords[pos]
+
+    if plane[4] > 0:
+        return plane[0] * point[0] + plane[1] * point[1] + \
+            plane[2] * point[2] == plane[3]
+
+    first, second = coords[block[0]], coords[block[1]]
+    vector1 = second - first
+    vector2 = point - first
+
+    normal = (vector1[1] * vector2[2] - vector1[2] * vector2[1],
+              vector1[2] * vector2[0] - vector1[0] * vector2[2],
+              vector1[0] * vector2[1] - vector1[1] * vector2[0])
+
+    if normal[0] != 0 or normal[1] != 0 or normal[2] != 0:
+        plane[0], plane[1], plane[2] = normal
+        plane[3] = normal[0] * first[0] + normal[1] * first[1] + \
+            normal[2] * first[2]
+        plane[4] = length + 1
+
+    return True
+
+
+@_jit
+def _clear_block(out, length, items, size, where, count, occupied):
+    """
+    Removes the block and its frontier from the arrays
+    """
+    for i in range(size):
+        where[items[i]] = -1
+        count[items[i]] = 0
+
+    for i in range(length):
+        occupied[out[i]] = EMPTY
+        where[out[i]] = -1
+        count[out[i]] = 0
+
+
+# pylint: disable=too-many-locals,too-many-branches,too-many-statements
+@_jit
+def valid_step(start, step_size, check_finishable, occupied, neighbors,
+               coords, path, planar, representable, local_limit, checks,
+               interval, rng, visited, stamp, stack, where, count, out,
+               cancel, poll_interval):
+    """
+    Writes a valid block of `step_size` positions starting with `start`
+    to `out`, returns its size (0 if there is none, CANCELLED if `cancel`
+    was set)
+
+    This is `GeneralCoveringModel._valid_step` over the flat arrays,
+    `checks`, `rng` and `stamp` are one-element arrays with the state
+    of the finishability checks, the random generator and `visited`.
+    """
+    # Like `GeneralCoveringModel._valid_step`, blocks have
+    # at least two positions
+    if step_size < 2:
+        return 0
+
+    items = np.empty(step_size * neighbors.shape[1], np.int64)
+    # Indices swapped by the draws of each level
+    draws = np.empty((step_size, items.shape[0]), np.int64)
+    drawn = np.zeros(step_size, np.int64)
+    # Former frontier indices and numbers of added positions of the block
+    pushed = np.empty((step_size, 2), np.int64)
+    ends = np.empty((step_size, 2), np.int64)
+    plane = np.zeros(5, np.int64)
+
+    out[0] = start
+    length = 1
+    occupied[start] = PLACEHOLDER
+    ends[0, 0], ends[0, 1] = start, start
+
+    size, pushed[0, 0], pushed[0, 1] = _frontier_push(
+        start, items, 0, where, count, occupied, neighbors)
+    polls = 0
+
+    # There is one level of candidates for each position of the block
+    while length > 0:
+        polls += 1
+
+        if polls == poll_interval:
+            polls = 0
+
+            if cancel[0]:
+                _clear_block(out, length, items, size, where, count,
+                             occupied)
+                return CANCELLED
+
+        level = length - 1
+        index = drawn[level]
+
+        if index >= size:
+            # Undo the draws of the level and remove its position
+            for i in range(index - 1, -1, -1):
+                _swap(items, i, draws[level, i], where)
+
+            length -= 1
+            size = _frontier_pop(out[length], pushed[length, 0],
+                                 pushed[length, 1], items, size, where,
+                                 count, occupied, neighbors)
+            occupied[out[length]] = EMPTY
+            continue
+
+        other = index + int(_next_random(rng) % np.uint64(size - index))
+        _swap(items, index, other, where)
+        draws[level, index] = other
+        drawn[level] = index + 1
+
+        pos = items[index]
+
+        if path and not _path_accepts(pos, length, ends, occupied,
+                                      neighbors):
+            continue
+
+        if planar and not _planar_accepts(pos, length, out, coords, plane):
+            continue
+
+        out[length] = pos
+        length += 1
+        occupied[pos] = PLACEHOLDER
+
+        if length < step_size:
+            size, pushed[length - 1, 0], pushed[length - 1, 1] = \
+                _frontier_push(pos, items, size, where, count, occupied,
+                               neighbors)
+            drawn[length - 1] = 0
+            continue
+
+        if not check_finishable or \
+                _is_finishable_after(out, length, occupied, neighbors,
+                                     representable, local_limit, checks,
+                                     interval, visited, stamp, stack, cancel,
+                                     poll_interval):
+            _clear_block(out, length, items, size, where, count, occupied)
+            return length
+
+        length -= 1
+        occupied[pos] = EMPTY
+
+    return 0
+
+
+class Kernel:
+    """
+    Flat arrays of a model (with fixed positions) for `valid_step`
+
+    The model keeps `occupied` up to date with `fill` and `clear`,
+    `jit=False` runs the plain Python version of the kernel.
+    """
+    # pylint: disable=too-many-instance-attributes
+    def __init__(self, model, jit=True):
+        self.positions = list(model.all_positions())
+        self._index = {pos: i for i, pos in enumerate(self.positions)}
+        self.jit = jit
+
+        size = len(self.positions)
+        neighbor_lists = [list(model.neighbors(pos))
+                          for pos in self.positions]
+        degree = max((len(nbrs) for nbrs in neighbor_lists), default=0)
+
+        self.neighbors = np.full((size, max(degree, 1)), -1, np.int64)
+
+        for i, nbrs in enumerate(neighbor_lists):
+            for j, nbr in enumerate(nbrs):
+                self.neighbors[i, j] = self._index[nbr]
+
+        # Two-dimensional positions lie in the plane z = 0
+        self.coords = np.zeros((size, 3), np.int64)
+
+        for i, pos in enumerate(self.positions):
+            self.coords[i, :len(pos)] = pos
+
+        watchers = model.constraint_watchers
+        self.path = PathConstraintWatcher in watchers
+        self.planar = PlanarConstraintWatcher in watchers
+
+        self.occupied = np.zeros(size, np.int8)
+        self.visited = np.zeros(size, np.int64)
+        self.stack = np.empty(size, np.int64)
+        self.where = np.full(size, -1, np.int64)
+        self.count = np.zeros(size, np.int64)
+        self._stamp = np.zeros(1, np.int64)
+        self._checks = np.zeros(1, np.int64)
+        self._rng = np.zeros(1, np.uint64)
+        self._no_cancel = np.zeros(1, np.uint8)
+        # The buffer of the last cancellation token and its array
+        self._flag = None
+        self._cancel = None
+
+        self.representable = None
+        self.local_limit = None
+        self.interval = model.GLOBAL_CHECK_INTERVAL
+
+    @staticmethod
+    def supports(model):
+        """
+        Returns True if the kernel can cover `model`
+        """
+        return AVAILABLE and all(watcher in SUPPORTED_WATCHERS
+                                 for watcher in model.constraint_watchers)
+
+    @property
+    def checks(self):
+        """
+        The number of steps since the start, every `interval`-th checks
+        if the rest of the model can be covered
+        """
+        return int(self._checks[0])
+
+    @checks.setter
+    def checks(self, value):
+        self._checks[0] = value
+
+    def set_sizes(self, representable, local_limit):
+        """
+        Sets the representable component sizes and the local check limit
+        (see `GeneralCoveringModel._update_size_table`)
+        """
+        self.representable = np.array(representable, np.bool_)
+        self.local_limit = local_limit
+
+    def _cancel_flag(self, flag):
+        """
+        Returns an array sharing the memory of the `flag` buffer
+        """
+        if flag is not self._flag:
+            self._cancel = np.frombuffer(flag, np.uint8)
+            self._flag = flag
+
+        return self._cancel
+
+    def fill(self, positions):
+        """
+        Marks `positions` as filled
+        """
+        for pos in positions:
+            self.occupied[self._index[pos]] = FILLED
+
+    def clear(self, positions=None):
+        """
+        Marks `positions` (all positions if None) as empty
+        """
+        if positions is None:
+            self.occupied[:] = EMPTY
+            return
+
+        for pos in positions:
+            self.occupied[self._index[pos]] = EMPTY
+
+    def valid_step(self, pos, step_size, check_finishable=True,
+                   cancel_token=None):
+        """
+        Returns a tuple of positions of a valid step starting with `pos`,
+        None if there is none or if `cancel_token` was cancelled
+        """
+        if pos is None:
+            return None
+
+        if cancel_token is None:
+            cancel, poll_interval = self._no_cancel, 1 << 62
+        else:
+            cancel = self._cancel_flag(cancel_token.flag)
+            poll_interval = cancel_token.POLL_INTERVAL
+
+        func = valid_step if self.jit else \
+            getattr(valid_step, "py_func", valid_step)
+        out = np.empty(max(step_size, 1), np.int64)
+
+        # Zero is a fixed point of xorshift
+        self._rng[0] = random.getrandbits(64) | 1
+
+        length = func(self._index[pos], step_size, bool(check_finishable),
+                      self.occupied, self.neighbors, self.coords, self.path,
+                      self.planar, self.representable, self.local_limit,
+                      self._checks, self.interval, self._rng, self.visited,
+                      self._stamp, self.stack, self.where, self.count, out,
+                      cancel, poll_interval)
+
+        if length <= 0:
+            return None
+
+        return tuple(self.positions[i] for i in out[:length])
@@ -7,19 +7,26 @@ Program entrypoint, facilitates argument parsing.
 import argparse
 import sys
 
-from PySide2.QtWidgets import QApplication
-
 from pycovering.models import PyramidCoveringModel, \
                               TwoDCoveringModel, \
                               ImpossibleToFinishException, \
                               CoveringTimeoutException
 
-from pycovering.views import TwoDPrintView, PyramidPrintView, \
-                             PyramidVisualView, TwoDVisualView
+from pycovering.views import TwoDPrintView, PyramidPrintView
 
 from pycovering.constraints import PathConstraintWatcher,  \
                                    PlanarConstraintWatcher
 
+from pycovering.serialization import model_from_dict, \
+                                     InvalidModelDataException
+
+
+# How many duplicate coverings in a row are tolerated with --unique
+DUPLICATE_ATTEMPTS = 100
+
+# Keep in sync with ProfileEngine.MAX_WIDTH
+UNIFORM_MAX_WIDTH = 12
+
 
 class TooManyAttemptsException(Exception):
     """
@@ -38,6 +45,9 @@ def qapp_decorator(cls):
         The new, modified class
         """
         def __init__(self):
+            # pylint: disable=import-outside-toplevel
+            from PySide2.QtWidgets import QApplication
+
             self.app = QApplication()
             cls.__init__(self)
 
@@ -63,6 +73,15 @@ def check_args(args, parser):
         parser.error("Width must be positive")
     if "height" in args and args.height <= 0:
         parser.error("Height must be positive")
+    if args.timeout is not None and args.timeout <= 0:
+        parser.error("Timeout must be positive")
+    if args.count <= 0:
+        parser.error("Count must be positive")
+    check_uniform_args(args, parser)
+    check_export_args(args, parser)
+    check_checkpoint_args(args, parser)
+    check_partition_args(args, parser)
+    check_stream_args(args, parser)
     if "min_block_size" in args:
         mib = args.min_block_size
         if mib <= 0:
@@ -74,6 +93,96 @@ def check_args(args, parser):
                              "than lower block size bound")
 
 
+def check_uniform_args(args, parser):
+    """
+    Verify validity of the --uniform argument
+    """
+    if not is_uniform(args):
+        return
+
+    if args.width > UNIFORM_MAX_WIDTH:
+        parser.error(f"--uniform requires width at most "
+                     f"{UNIFORM_MAX_WIDTH}")
+    if args.server is not None:
+        parser.error("--uniform can not be used with --server")
+
+
+def check_export_args(args, parser):
+    """
+    Verify validity of the export arguments
+    """
+    if args.export is None:
+        if args.unique or args.unique_index is not None:
+            parser.error("--unique can only be used with --export")
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from pycovering.export import export_format, ExportException
+
+    try:
+        path = get_export_path(args, 0)
+        export_format(path)
+    except (TypeError, ValueError) as exc:
+        parser.error(f"Invalid export pattern: {exc}")
+    except ExportException as exc:
+        parser.error(str(exc))
+
+    if args.count > 1 and path == get_export_path(args, 1):
+        parser.error("The export pattern must contain a number "
+                     "placeholder (e.g. %04d) when exporting "
+                     "more coverings")
+
+
+def check_checkpoint_args(args, parser):
+    """
+    Verify validity of the checkpoint arguments
+    """
+    if args.checkpoint is None:
+        if args.resume:
+            parser.error("--resume requires --checkpoint")
+        return
+
+    if args.checkpoint_interval <= 0:
+        parser.error("Checkpoint interval must be positive")
+    if args.server is not None or args.export is not None or \
+            is_uniform(args):
+        parser.error("--checkpoint can not be used with --server, "
+                     "--export or --uniform")
+
+
+def check_partition_args(args, parser):
+    """
+    Verify validity of the partition arguments
+    """
+    if not is_partitioned(args):
+        if "workers" in args and args.workers is not None:
+            parser.error("--workers can only be used with --partition")
+        return
+
+    if args.workers is not None and args.workers <= 0:
+        parser.error("Number of workers must be positive")
+    if args.server is not None or args.checkpoint is not None or \
+            is_uniform(args):
+        parser.error("--partition can not be used with --server, "
+                     "--checkpoint or --uniform")
+
+
+def check_stream_args(args, parser):
+    """
+    Verify validity of the --stream argument
+    """
+    if not is_streamed(args):
+        return
+
+    if args.visual or args.export is not None or args.server is not None:
+        parser.error("--stream can not be used with --visual, --export "
+                     "or --server")
+    if args.checkpoint is not None or is_uniform(args) or \
+            is_partitioned(args):
+        parser.error("--stream can not be used with --checkpoint, "
+                     "--uniform or --partition")
+
+
 def get_parser():
     """
     Return a configured parser
@@ -119,6 +228,77 @@ def get_parser():
         help="Let all blocks be paths"
     )
 
+    general_subparser.add_argument(
+        "--kernel",
+        action="store_true",
+        help="Find blocks of large models with the compiled kernel "
+             "(needs numba, finds other coverings than without it)"
+    )
+
+    general_subparser.add_argument(
+        "--export",
+        metavar="PATTERN",
+        help="Export the covering to a PNG or SVG file instead of showing "
+             "it, the covering number is substituted into the pattern "
+             "(e.g. out/%%04d.png)"
+    )
+
+    general_subparser.add_argument(
+        "--count",
+        "-n",
+        type=int,
+        default=1,
+        help="Number of coverings to export (only with --export)"
+    )
+
+    general_subparser.add_argument(
+        "--unique",
+        "-u",
+        action="store_true",
+        help="Don't export coverings equal (up to a symmetry) to already "
+             "exported ones (only with --export)"
+    )
+
+    general_subparser.add_argument(
+        "--unique-index",
+        metavar="PATH",
+        help="A file keeping hashes of exported coverings, so that --unique "
+             "works across runs (implies --unique)"
+    )
+
+    general_subparser.add_argument(
+        "--server",
+        metavar="URL",
+        help="Let a running pycovering-server (e.g. http://127.0.0.1:8642) "
+             "cover the model"
+    )
+
+    general_subparser.add_argument(
+        "--timeout",
+        type=float,
+        help="Covering timeout in seconds (only with --server)"
+    )
+
+    general_subparser.add_argument(
+        "--checkpoint",
+        metavar="PATH",
+        help="Periodically save the state of the covering to a file, "
+             "it is removed once the covering finishes"
+    )
+
+    general_subparser.add_argument(
+        "--checkpoint-interval",
+        type=float,
+        default=5,
+        help="Seconds between two checkpoints (default 5)"
+    )
+
+    general_subparser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue the covering from --checkpoint (if it exists)"
+    )
+
     two_d_parser = subparsers.add_parser("2d", parents=[general_subparser])
     two_d_parser.set_defaults(model="2d")
 
@@ -136,6 +316,33 @@ def get_parser():
         help="The rectangle height"
     )
 
+    two_d_parser.add_argument(
+        "--uniform",
+        action="store_true",
+        help="Choose the covering uniformly at random from all coverings "
+             f"(only for width up to {UNIFORM_MAX_WIDTH})"
+    )
+
+    two_d_parser.add_argument(
+        "--partition",
+        action="store_true",
+        help="Cover the rectangle by parts in parallel processes "
+             "(for large rectangles)"
+    )
+
+    two_d_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of processes for --partition (default: all CPUs)"
+    )
+
+    two_d_parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print rows as soon as they are covered, keeping only a few "
+             "of them in memory (for very long strips)"
+    )
+
     pyramid_parser = subparsers.add_parser("pyramid",
                                            parents=[general_subparser])
 
@@ -158,28 +365,121 @@ def get_parser():
     return parser
 
 
+def get_view(args):
+    """
+    Return a view based on args
+
+    Visual views are imported only here, so that text runs
+    don't have to load Qt and VPython
+    """
+    if not args.visual:
+        if args.model == "pyramid":
+            return PyramidPrintView()
+        return TwoDPrintView()
+
+    # pylint: disable=import-outside-toplevel
+    from pycovering.visual_views import PyramidVisualView, TwoDVisualView
+
+    if args.model == "pyramid":
+        return PyramidVisualView()
+    return qapp_decorator(TwoDVisualView)()
+
+
+def get_model(args):
+    """
+    Return a model based on args
+    """
+    if args.model == "pyramid":
+        model = PyramidCoveringModel(args.size, args.min_block_size,
+                                     args.max_block_size, args.verbose)
+    else:
+        model = TwoDCoveringModel(args.width, args.height,
+                                  args.min_block_size, args.max_block_size,
+                                  args.verbose)
+
+    if args.kernel:
+        model.use_kernel = True
+        model.reset()
+
+    return model
+
+
 def get_model_view(args):
     """
     Return a (model, view) tuple based on args
     """
+    return (get_model(args), get_view(args))
+
+
+def get_export_path(args, index):
+    """
+    Return the path of the `index`-th exported covering
+    """
+    if "%" not in args.export:
+        return args.export
+
+    return args.export % index
+
+
+def get_request_params(args):
+    """
+    Return model parameters (as expected by pycovering-server)
+    based on args values
+    """
+    params = {
+        "model": args.model,
+        "min_block_size": args.min_block_size,
+        "max_block_size": args.max_block_size,
+        "constraints": []
+    }
+
     if args.model == "pyramid":
-        model = PyramidCoveringModel(args.size, args.min_block_size,
-                                     args.max_block_size,
-                                     args.verbose)
-        if args.visual:
-            view = PyramidVisualView()
-        else:
-            view = PyramidPrintView()
+        params["size"] = args.size
     elif args.model == "2d":
-        model = TwoDCoveringModel(args.width, args.height, args.min_block_size,
-                                  args.max_block_size, args.verbose)
+        params["width"] = args.width
+        params["height"] = args.height
 
-        if args.visual:
-            view = qapp_decorator(TwoDVisualView)()
-        else:
-            view = TwoDPrintView()
+    if args.path:
+        params["constraints"].append("path")
 
-    return (model, view)
+    if "planar" in args and args.planar:
+        params["constraints"].append("planar")
+
+    return params
+
+
+def cover_on_server(args):
+    """
+    Let a pycovering-server cover the model, return the covered model
+    """
+    # pylint: disable=import-outside-toplevel
+    from urllib.error import URLError
+    from pycovering.server import request_covering
+
+    params = get_request_params(args)
+
+    try:
+        response = request_covering(args.server, params, args.timeout)
+    except (URLError, OSError, ValueError) as exc:
+        print(f"Server request failed: {exc}")
+        sys.exit(1)
+
+    status = response.get("status")
+
+    if status == "timeout":
+        print("Covering timed out")
+        sys.exit(1)
+    if status != "ok":
+        print("Covering failed")
+        if "error" in response:
+            print(response["error"])
+        sys.exit(1)
+
+    try:
+        return model_from_dict(response["covering"], args.verbose)
+    except (InvalidModelDataException, KeyError):
+        print("Invalid server response")
+        sys.exit(1)
 
 
 def set_constraints(model, args):
@@ -193,6 +493,200 @@ def set_constraints(model, args):
         model.add_constraint(PlanarConstraintWatcher)
 
 
+def is_uniform(args):
+    """
+    Return True if the covering should be uniformly random
+    """
+    return "uniform" in args and args.uniform
+
+
+def is_partitioned(args):
+    """
+    Return True if the model should be covered by parts
+    """
+    return "partition" in args and args.partition
+
+
+def is_streamed(args):
+    """
+    Return True if the covering should be printed row by row
+    """
+    return "stream" in args and args.stream
+
+
+def stream_model(args):
+    """
+    Cover the model row by row, printing the rows
+    """
+    # pylint: disable=import-outside-toplevel
+    from pycovering.streaming import stream_covering
+
+    try:
+        stream_covering(get_request_params(args), sys.stdout)
+    except ImpossibleToFinishException:
+        print("Covering failed")
+        sys.exit(1)
+
+
+def cover_model(args, model):
+    """
+    Cover the model locally
+    """
+    if is_partitioned(args):
+        # pylint: disable=import-outside-toplevel
+        from pycovering.partition import cover_partitioned
+
+        cover_partitioned(model, workers=args.workers)
+        return
+
+    if not is_uniform(args):
+        if args.checkpoint is not None:
+            cover_with_checkpoints(args, model)
+            return
+
+        model.reset()
+        model.try_cover()
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from pycovering.exact import ProfileEngine
+
+    engine = ProfileEngine(model)
+
+    if args.verbose >= 1:
+        print(f"\tChoosing one of {engine.count_coverings()} coverings")
+
+    engine.sample_covering()
+
+
+def cover_with_checkpoints(args, model):
+    """
+    Cover the model locally, saving checkpoints to `args.checkpoint`
+    (and resuming from it with --resume)
+    """
+    # pylint: disable=import-outside-toplevel
+    from pycovering.checkpoint import Checkpointer, load_checkpoint, \
+                                      InvalidCheckpointException
+
+    checkpointer = Checkpointer(args.checkpoint, args.checkpoint_interval)
+    resume_from = None
+
+    if args.resume:
+        try:
+            resume_from = load_checkpoint(args.checkpoint, model)
+        except FileNotFoundError:
+            if args.verbose >= 1:
+                print("\tNo checkpoint found, starting from scratch")
+        except (OSError, InvalidCheckpointException) as exc:
+            print(f"Could not resume the covering: {exc}")
+            sys.exit(1)
+
+    if resume_from is None:
+        model.reset()
+    elif args.verbose >= 1:
+        print(f"\tResuming with {len(resume_from['blocks'])} blocks placed")
+
+    try:
+        model.try_cover(checkpoint=checkpointer, resume_from=resume_from)
+    except OSError as exc:
+        print(f"Could not save a checkpoint: {exc}")
+        sys.exit(1)
+    except (ImpossibleToFinishException, CoveringTimeoutException):
+        # Nothing to resume, the covering can't be finished
+        checkpointer.remove()
+        raise
+
+    # Nothing to resume, the covering is finished
+    checkpointer.remove()
+
+
+def cover_unique(args, model, store):
+    """
+    Cover the model (or let the server do it) until the covering
+    is not in `store` (if given), return the covered model
+    """
+    for _ in range(DUPLICATE_ATTEMPTS):
+        if args.server is not None:
+            model = cover_on_server(args)
+        else:
+            cover_model(args, model)
+
+        if store is None or store.add(model):
+            return model
+
+        if args.verbose >= 1:
+            print("\tDuplicate covering, trying again")
+
+    raise TooManyAttemptsException
+
+
+def export_coverings(args):
+    """
+    Cover the model `args.count` times, export each covering
+    """
+    # pylint: disable=import-outside-toplevel
+    from pycovering.canonical import CoveringStore
+
+    model = None
+
+    if args.server is None:
+        model = get_model(args)
+        set_constraints(model, args)
+
+    store = None
+
+    if args.unique or args.unique_index is not None:
+        try:
+            store = CoveringStore(args.unique_index)
+        except OSError as exc:
+            print(f"Could not open the index: {exc}")
+            sys.exit(1)
+
+    try:
+        failed = export_loop(args, model, store)
+    finally:
+        if store is not None:
+            store.close()
+
+    if failed:
+        print(f"{failed} of {args.count} coverings failed")
+        sys.exit(1)
+
+
+def export_loop(args, model, store):
+    """
+    Export `args.count` coverings, return the number of failed ones
+    """
+    # pylint: disable=import-outside-toplevel
+    from pycovering.export import export, ExportException
+
+    failed = 0
+
+    for index in range(args.count):
+        try:
+            model = cover_unique(args, model, store)
+        except (ImpossibleToFinishException, CoveringTimeoutException):
+            print(f"Covering {index} failed")
+            failed += 1
+            continue
+        except TooManyAttemptsException:
+            print(f"No more unique coverings found after {index}")
+            return failed + args.count - index
+
+        path = get_export_path(args, index)
+
+        try:
+            export(model, path)
+        except ExportException as exc:
+            print(exc)
+            sys.exit(1)
+
+        if args.verbose >= 1:
+            print(f"Exported {path}")
+
+    return failed
+
+
 def main():
     """
     The program entrypoint
@@ -205,6 +699,19 @@ def main():
     if args.verbose:
         print(f"Used arguments: {args}")
 
+    if args.export is not None:
+        export_coverings(args)
+        return
+
+    if args.server is not None:
+        model = cover_on_server(args)
+        get_view(args).show(model)
+        return
+
+    if is_streamed(args):
+        stream_model(args)
+        return
+
     model, view = get_model_view(args)
 
     set_constraints(model, args)
@@ -213,15 +720,24 @@ def main():
         print("Attempting to cover the model... ", flush=True)
 
     try:
-        model.reset()
-        model.try_cover()
+        cover_model(args, model)
     except (ImpossibleToFinishException, CoveringTimeoutException):
         print("Covering failed")
         sys.exit(1)
 
-    if args.verbose >= 1:
+    if args.verbose >= 1 and not is_uniform(args) and \
+            not is_partitioned(args):
         print("\tSUCCESS")
 
+        progress = model.progress()
+        print(f"\tPlaced {progress.nodes} blocks "
+              f"({progress.backtracks} backtracks) "
+              f"in {progress.elapsed:.2f} s, "
+              f"{progress.nodes_per_second:.0f} blocks/s")
+        print(f"\tStack: {progress.tried_blocks} tried blocks, "
+              f"{progress.stack_bytes / 1024:.1f} kB, "
+              f"{progress.block_lookups} lookups")
+
     view.show(model)
 
 
@@ -2,9 +2,19 @@
 This module contains all covering models
 """
 
+# pylint: disable=too-many-lines
+
 import random
+import itertools as it
+import multiprocessing
+import sys
+import threading
+import time
 # import copy
 
+from collections import namedtuple
+from operator import add
+
 
 class ImpossibleToFinishException(Exception):
     """
@@ -27,15 +37,142 @@ class CoveringStoppedException(Exception):
     """
 
 
+class CancellationToken:
+    """
+    Tells a running covering to stop (see `GeneralCoveringModel.try_cover`),
+    it can be cancelled from another thread
+
+    Tight loops call `poll`, which only reads the flag once per
+    `POLL_INTERVAL` calls, other loops call `check`. Both raise
+    `CoveringStoppedException` if the token was cancelled. The compiled
+    kernel (see `pycovering.kernel`) reads `flag`, a one-byte buffer
+    set to 1 by `cancel`.
+    """
+    POLL_INTERVAL = 256
+
+    def __init__(self):
+        self._event = self._make_event()
+        self.flag = self._make_flag()
+        self._polls = self.POLL_INTERVAL
+
+    @staticmethod
+    def _make_event():
+        return threading.Event()
+
+    @staticmethod
+    def _make_flag():
+        return bytearray(1)
+
+    def cancel(self):
+        """
+        Cancel the covering using this token
+        """
+        self._event.set()
+        # The kernel stops on the flag, `check` must raise by then
+        self.flag[0] = 1
+
+    def cancelled(self):
+        """
+        Returns True if the token was cancelled
+        """
+        return self._event.is_set()
+
+    def check(self):
+        """
+        Raises `CoveringStoppedException` if the token was cancelled
+        """
+        if self._event.is_set():
+            raise CoveringStoppedException
+
+    def poll(self):
+        """
+        Like `check`, but only reads the flag once per `POLL_INTERVAL` calls
+        """
+        self._polls -= 1
+
+        if self._polls <= 0:
+            self._polls = self.POLL_INTERVAL
+            self.check()
+
+    def __getstate__(self):
+        # A `threading.Event` can't be pickled (e.g. with a model),
+        # the unpickled token gets a new one
+        return (self.cancelled(),)
+
+    def __setstate__(self, state):
+        self.__init__()
+
+        if state[0]:
+            self.cancel()
+
+
+class ProcessCancellationToken(CancellationToken):
+    """
+    A cancellation token shared by processes (using `multiprocessing.Event`),
+    it has to be passed to the covering process when it is started
+    (e.g. as an argument of `multiprocessing.Process`)
+    """
+    @staticmethod
+    def _make_event():
+        return multiprocessing.Event()
+
+    @staticmethod
+    def _make_flag():
+        return multiprocessing.RawArray("B", 1)
+
+    def __getstate__(self):
+        # The unpickled token shares the event and the flag
+        return (self._event, self.flag)
+
+    def __setstate__(self, state):
+        self._event, self.flag = state
+        self._polls = self.POLL_INTERVAL
+
+
+CoveringProgress = namedtuple("CoveringProgress", [
+    "filled",            # Number of filled positions
+    "total",             # Number of all positions
+    "depth",             # Depth of the backtracking stack
+    "backtracks",        # Number of removed blocks
+    "nodes",             # Number of placed blocks
+    "elapsed",           # Seconds since the covering started
+    "nodes_per_second",
+    "tried_blocks",      # Number of tried blocks kept in the stack
+    "stack_bytes",       # Approximate memory used by the stack
+    "block_lookups"      # Number of lookups in the sets of tried blocks
+])
+
+
 class Block:
     """
     This class represents one block in the model
+
+    The block color is not generated until it is needed, it is derived
+    from the block number and the `seed` (which is shared by all blocks
+    of one covering).
     """
-    def __init__(self, number):
+    __slots__ = ("number", "positions", "visible", "seed", "_color")
+
+    def __init__(self, number, seed=0):
         self.number = number
         self.positions = []
-        self.color = self.random_color()
         self.visible = True
+        self.seed = seed
+        self._color = None
+
+    @property
+    def color(self):
+        """
+        The block color as (0-255, 0-255, 0-255)
+        """
+        if self._color is None:
+            self._color = self.derive_color(self.number, self.seed)
+
+        return self._color
+
+    @color.setter
+    def color(self, color):
+        self._color = color
 
     @staticmethod
     def random_color():
@@ -44,6 +181,22 @@ class Block:
         """
         return tuple((random.randint(0, 255) for _ in range(3)))
 
+    @staticmethod
+    def derive_color(number, seed):
+        """
+        Returns a pseudorandom color as (0-255, 0-255, 0-255), which only
+        depends on `number` and `seed`
+        """
+        # A 32-bit integer hash (the murmur3 finalizer)
+        val = (number * 0x9E3779B1 + seed) & 0xFFFFFFFF
+        val ^= val >> 16
+        val = (val * 0x85EBCA6B) & 0xFFFFFFFF
+        val ^= val >> 13
+        val = (val * 0xC2B2AE35) & 0xFFFFFFFF
+        val ^= val >> 16
+
+        return (val & 0xFF, (val >> 8) & 0xFF, (val >> 16) & 0xFF)
+
     def add_position(self, pos):
         """
         Adds `pos` to the block
@@ -59,16 +212,66 @@ class Block:
     @classmethod
     def setup_static_instances(cls):
         """
-        As is is (probably?) impossible to create static `Block`-type members
-        directly, this method needs to be called once befero they can be used
+        The static instances (`Block.EMPTY` and `Block.PLACEHOLDER`) are now
+        created with the module, this is kept only for compatibility
         """
-        cls.EMPTY = Block(-1)
-        cls.PLACEHOLDER = Block(-2)
 
     def __deepcopy__(self, memo):
         return self  # HACK, in this case we don't need to go THIS deep
 
 
+class _SentinelBlock(Block):
+    """
+    An immutable block marking special positions (see `EMPTY`
+    and `PLACEHOLDER`)
+    """
+    __slots__ = ()
+
+    NAMES = {-1: "EMPTY", -2: "PLACEHOLDER"}
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, number):
+        values = {
+            "number": number,
+            "positions": (),
+            "visible": True,
+            "seed": 0,
+            "_color": (0, 0, 0)
+        }
+
+        for attr, val in values.items():
+            object.__setattr__(self, attr, val)
+
+    @property
+    def name(self):
+        """
+        The module-level name of the sentinel
+        """
+        return self.NAMES[self.number]
+
+    def __setattr__(self, attr, val):
+        raise AttributeError(f"Block {self.name} is immutable")
+
+    def add_position(self, pos):
+        raise AttributeError(f"Block {self.name} is immutable")
+
+    def __reduce__(self):
+        # Unpickled sentinels are the module-level instances,
+        # so that `is` comparisons still work
+        return self.name
+
+    def __repr__(self):
+        return f"Block.{self.name}"
+
+
+EMPTY = _SentinelBlock(-1)
+PLACEHOLDER = _SentinelBlock(-2)
+
+Block.EMPTY = EMPTY
+Block.PLACEHOLDER = PLACEHOLDER
+
+
+# pylint: disable=too-many-instance-attributes
 class Coverer:
     """
     This class contains some logic for covering the model.
@@ -78,18 +281,143 @@ class Coverer:
     calculate it), we try to generate a random block `ATTEMPTS` times and if
     none if the blocks is was that wasn't tried out yet, we claim that one
     doesn't exist.
+
+    Tried blocks are kept as integer bitmasks of position numbers
+    (in the order of `model.all_positions()`) relative to the position
+    the block was generated from (see `block_key`). All positions before
+    it are filled, so the masks are never negative. The set of tried
+    blocks of a level is only created once the level backtracks.
     """
     ATTEMPTS = 100
 
+    # Progress is published at most once per PROGRESS_INTERVAL seconds
+    PROGRESS_INTERVAL = 0.1
+
     def __init__(self, model):
         self.model = model
 
         # Backtracking stack
-        # [(used_blocks, last_block, start_pos), ...]
-        self._stack = [(set(), None, self.model.INITIAL_POSITION)]
+        # [(tried_blocks or None, start_pos), ...]
+        self._stack = [(None, self.model.INITIAL_POSITION)]
+
+        # Position numbers for `block_key`, created when first needed
+        self._index = None
+        self._index_key = None
+
+        # Search statistics, see `CoveringProgress`
+        self._backtracks = 0
+        self._nodes = 0
+        self._elapsed = 0
+        self._tried_blocks = 0
+        self._tried_bytes = 0  # Size of the sets of tried blocks
+        self._lookups = 0
+
+        # The last published progress snapshot (an immutable tuple,
+        # so it can be read from other threads without locking)
+        self.progress = None
+
+    def reset(self):
+        """
+        Return the coverer to its initial state, reusing the stack
+        """
+        # The stack is empty after a failed covering
+        del self._stack[:]
+        self._stack.append((None, self.model.INITIAL_POSITION))
+
+        if self._index_key != self.model.state.dimensions():
+            self._index = None
+
+        self._backtracks = 0
+        self._nodes = 0
+        self._elapsed = 0
+        self._tried_blocks = 0
+        self._tried_bytes = 0
+        self._lookups = 0
+        self.progress = self._snapshot(0)
+
+    def search_state(self):
+        """
+        Returns the backtracking stack (with copies of the sets of tried
+        blocks) and statistics, see `restore_search_state`
+        """
+        return {
+            "stack": [(None if tried is None else set(tried), pos)
+                      for tried, pos in self._stack],
+            "backtracks": self._backtracks,
+            "nodes": self._nodes,
+            "lookups": self._lookups,
+            "elapsed": self.progress.elapsed if self.progress else 0
+        }
+
+    def restore_search_state(self, state):
+        """
+        Restores the stack and statistics returned by `search_state`,
+        the model must already contain the placed blocks
+        """
+        self._stack[:] = [(None if tried is None else set(tried), pos)
+                          for tried, pos in state["stack"]]
+
+        self._tried_blocks = 0
+        self._tried_bytes = 0
+
+        for tried, _ in self._stack:
+            if tried is not None:
+                self._tried_blocks += len(tried)
+                self._tried_bytes += self._set_size(tried)
+
+        self._backtracks = state["backtracks"]
+        self._nodes = state["nodes"]
+        self._lookups = state["lookups"]
+        self._elapsed = state["elapsed"]
+        self.progress = self._snapshot(self._elapsed)
+
+    def _snapshot(self, elapsed):
+        total = self.model.total_positions()
+        filled = total - self.model.empty_positions()
+        speed = self._nodes / elapsed if elapsed > 0 else 0
 
-    def _random_unused_block(self, used_blocks, pos, check_finishable=True):
+        # The stack list, its (tried, pos) tuples and the tried blocks
+        stack_bytes = sys.getsizeof(self._stack) + self._tried_bytes + \
+            len(self._stack) * sys.getsizeof((None, None))
+
+        return CoveringProgress(filled, total, len(self._stack),
+                                self._backtracks, self._nodes,
+                                elapsed, speed, self._tried_blocks,
+                                stack_bytes, self._lookups)
+
+    @staticmethod
+    def _set_size(tried):
+        return sys.getsizeof(tried) + sum(map(sys.getsizeof, tried))
+
+    def block_key(self, positions, start):
+        """
+        Returns the bitmask of `positions` relative to `start`
+        (the position the block was generated from)
+        """
+        if self._index is None:
+            self._index = {pos: number for number, pos
+                           in enumerate(self.model.all_positions())}
+            self._index_key = self.model.state.dimensions()
+
+        index = self._index
+        first = index[start]
+        key = 0
+
+        for pos in positions:
+            key |= 1 << (index[pos] - first)
+
+        return key
+
+    def _publish_progress(self, elapsed, callback):
+        self.progress = self._snapshot(elapsed)
+
+        if callback is not None:
+            callback(self.progress)
+
+    def _random_unused_block(self, tried, pos, check_finishable=True):
         for _ in range(self.ATTEMPTS):
+            self.model.cancel_token.check()
+
             try:
                 new_block = self.model.random_block(
                     pos, check_finishable=check_finishable)
@@ -97,55 +425,250 @@ class Coverer:
                 # No more blocks can be generated
                 return None
 
-            sorted_block = tuple(sorted(new_block))
+            if tried is None:
+                # Nothing was tried here yet, no need to compute the key
+                return new_block
+
+            self._lookups += 1
 
-            if sorted_block not in used_blocks:
+            if self.block_key(new_block, pos) not in tried:
                 # Found a good block
-                return sorted_block
+                return new_block
 
         # No block found, backtrack
         return None
 
-    def try_cover(self, check_finishable=True):
+    def try_cover(self, check_finishable=True, progress_callback=None,
+                  checkpoint=None):
         """
         Try to cover the model with blocks.
 
         If it is not possible, throw an exception.
+
+        `progress_callback(progress)` is called with a `CoveringProgress`
+        at most once per `PROGRESS_INTERVAL` seconds and once at the end.
+        `checkpoint(model)` is called before every step of the search,
+        when `model.search_state()` can be saved (see
+        `pycovering.checkpoint.Checkpointer`).
         """
+        start = time.monotonic() - self._elapsed
+
+        try:
+            self._try_cover(check_finishable, progress_callback, checkpoint,
+                            start)
+        finally:
+            self._elapsed = time.monotonic() - start
+            self._publish_progress(self._elapsed, progress_callback)
+
+    def _try_cover(self, check_finishable, progress_callback, checkpoint,
+                   start):
+        next_publish = start
+        token = self.model.cancel_token
+
+        if self.model.is_filled():
+            return
+
+        # Blocks added to the model before the covering started stay
+        # where they are, start at the first empty position
+        tried, pos = self._stack[-1]
+        self._stack[-1] = (tried, self.model.next_empty(pos))
+
         while self._stack:
-            used_blocks, _, pos = self._stack[-1]
+            token.check()
+            now = time.monotonic()
+
+            if now >= next_publish:
+                self._publish_progress(now - start, progress_callback)
+                next_publish = now + self.PROGRESS_INTERVAL
+
+            if checkpoint is not None:
+                checkpoint(self.model)
+
+            tried, pos = self._stack[-1]
 
             new_block = self._random_unused_block(
-                used_blocks, pos, check_finishable=check_finishable)
+                tried, pos, check_finishable=check_finishable)
 
             if new_block is None:
                 # Backtraaack
-                self._stack.pop()  # This is a deadend
+                self._backtrack()
 
                 if not self._stack:
                     # Nothing to continue
                     break
 
-                prev_used, prev_last, _ = self._stack[-1]  # One but last
-                prev_used.add(prev_last)
-                self.model.pop_block()
                 continue
 
             # Continue with the new found block
 
             self.model.add_block(new_block)
+            self._nodes += 1
 
             if self.model.is_filled():
                 return  # Great!
 
-            self._stack[-1] = (used_blocks, new_block, pos)
-
             next_pos = self.model.next_empty(pos)
             # Create a stack entry for the next level
-            self._stack.append((set(), None, next_pos))
+            self._stack.append((None, next_pos))
 
         raise ImpossibleToFinishException
 
+    def _backtrack(self):
+        """
+        Removes the last level (a deadend) and the block placed
+        on the previous one, which is marked as tried there
+        """
+        tried, _ = self._stack.pop()
+
+        if tried is not None:
+            self._tried_blocks -= len(tried)
+            self._tried_bytes -= self._set_size(tried)
+
+        if not self._stack:
+            return
+
+        prev_tried, prev_pos = self._stack[-1]  # One but last
+        key = self.block_key(self.model.blocks[-1].positions, prev_pos)
+
+        if prev_tried is None:
+            prev_tried = set()
+            self._stack[-1] = (prev_tried, prev_pos)
+        else:
+            self._tried_bytes -= sys.getsizeof(prev_tried)
+
+        prev_tried.add(key)
+
+        self._tried_blocks += 1
+        self._tried_bytes += sys.getsizeof(prev_tried) + sys.getsizeof(key)
+
+        self.model.pop_block()
+        self._backtracks += 1
+
+
+class Frontier:
+    """
+    Empty neighbors of a block being generated by
+    `GeneralCoveringModel._valid_step`, updated in O(degree) when
+    a position is pushed to or popped from the block
+
+    Every level of the search draws its candidates from `positions` by
+    a lazy Fisher-Yates shuffle (`open_level`, `sample`, `close_level`).
+    Deeper levels undo all their changes exactly, so a level continues
+    its shuffle on the same list.
+    """
+    def __init__(self, model, state):
+        self.model = model
+        self.state = state
+
+        self.positions = []
+        self._where = {}  # Indices in `positions`
+        # Number of block positions next to a position, it is kept
+        # for block positions as well, so that `pop` can restore them
+        self._count = {}
+
+        self._pushed = []  # (pos, its former index, number of new positions)
+        self._levels = []  # Indices swapped by the draws of each level
+
+    def push(self, pos):
+        """
+        Adds `pos` (already marked in the state) to the block
+        """
+        positions = self.positions
+        where = self._where
+        index = where.pop(pos, None)
+
+        if index is not None:
+            last = positions.pop()
+
+            if last != pos:
+                positions[index] = last
+                where[last] = index
+
+        added = 0
+
+        for nbr in self.model.neighbors(pos):
+            if self.state[nbr] is not Block.EMPTY:
+                continue
+
+            count = self._count.get(nbr, 0) + 1
+            self._count[nbr] = count
+
+            if count == 1:
+                where[nbr] = len(positions)
+                positions.append(nbr)
+                added += 1
+
+        self._pushed.append((pos, index, added))
+
+    def pop(self):
+        """
+        Removes the last pushed position from the block
+        """
+        pos, index, added = self._pushed.pop()
+        positions = self.positions
+        where = self._where
+
+        for nbr in self.model.neighbors(pos):
+            if self.state[nbr] is Block.EMPTY:
+                self._count[nbr] -= 1
+
+        for _ in range(added):
+            nbr = positions.pop()
+            del where[nbr]
+            del self._count[nbr]
+
+        if index is None:
+            return
+
+        if index < len(positions):
+            moved = positions[index]
+            where[moved] = len(positions)
+            positions.append(moved)
+            positions[index] = pos
+        else:
+            positions.append(pos)
+
+        where[pos] = index
+
+    def _swap(self, i, j):
+        positions = self.positions
+        positions[i], positions[j] = positions[j], positions[i]
+        self._where[positions[i]] = i
+        self._where[positions[j]] = j
+
+    def open_level(self):
+        """
+        Starts drawing candidates for the next position of the block
+        """
+        self._levels.append([])
+
+    def sample(self):
+        """
+        Returns a random position of the frontier not yet drawn
+        on this level, None if all of them were drawn
+        """
+        draws = self._levels[-1]
+        drawn = len(draws)
+        size = len(self.positions)
+
+        if drawn >= size:
+            return None
+
+        index = drawn + int(random.random() * (size - drawn))
+        self._swap(drawn, index)
+        draws.append(index)
+
+        return self.positions[drawn]
+
+    def close_level(self):
+        """
+        Undoes the draws of the last level
+        """
+        draws = self._levels.pop()
+
+        for drawn in range(len(draws) - 1, -1, -1):
+            self._swap(drawn, draws[drawn])
+
 
 # I guess it is right... but I don't think it is much of an issue
 # pylint: disable=too-many-instance-attributes
@@ -156,9 +679,23 @@ class GeneralCoveringModel:
 
     INITIAL_POSITION = None
 
-    def __init__(self, min_block_size, max_block_size, verbosity=0):
-        Block.setup_static_instances()
+    # Geometry of the shape catalogs (see `pycovering.catalog`),
+    # None if the model can't use them
+    SHAPE_GEOMETRY = None
+
+    # Components larger than this multiple of the maximal block size
+    # are considered finishable by the local check
+    LOCAL_CHECK_FACTOR = 4
 
+    # Every n-th finishability check is global
+    GLOBAL_CHECK_INTERVAL = 32
+
+    # Smaller models are covered without the compiled kernel (even with
+    # `use_kernel`), its import and compilation would take longer than
+    # the covering
+    KERNEL_MIN_POSITIONS = 256
+
+    def __init__(self, min_block_size, max_block_size, verbosity=0):
         self.min_block_size = min_block_size
         self.max_block_size = max_block_size
 
@@ -169,7 +706,36 @@ class GeneralCoveringModel:
         self.pos = None  # Implementations will change this in reset()
 
         self.constraint_watchers = []
-        self.stopped = False  # Was covering interrupted by another thread
+
+        # See `_get_watchers`
+        self._watchers = []
+        self._watchers_key = None
+
+        # Cancelled by `stop_covering`, see `try_cover`
+        self.cancel_token = CancellationToken()
+
+        self.blocks = []
+        self._coverer = Coverer(self)
+
+        # See `_update_size_table`
+        self._representable = None
+        self._representable_key = None
+        self._local_limit = None
+
+        # See `_is_finishable_after`
+        self._finishable_checks = 0
+
+        # See `_update_kernel`, the kernel finds other coverings
+        # than the Python code under the same seed, so it is opt-in
+        self.use_kernel = False
+        self._kernel = None
+        self._kernel_key = None
+
+        # See `_update_catalog`, catalogs are saved into `catalog_dir`
+        # (`pycovering.catalog.CATALOG_DIR` if None)
+        self.use_catalog = True
+        self.catalog_dir = None
+        self._catalog = None
 
         self.reset()
 
@@ -177,6 +743,13 @@ class GeneralCoveringModel:
     def _get_state_container(cls):
         raise NotImplementedError
 
+    def _state_dimensions(self):
+        """
+        Returns a tuple of dimensions the state container should have
+        (as passed to `GeneralCoveringState.reset`)
+        """
+        raise NotImplementedError
+
     def message(self, msg):
         """
         Print a message if `-vv` is present in arguments
@@ -190,17 +763,35 @@ class GeneralCoveringModel:
 
         This method is meant to be OVERRIDEN, this is just
         a common part meant to be called as `super().reset()`
+
+        The state is only reallocated if the model dimensions changed,
+        otherwise just the positions of placed blocks are cleared.
         """
+        dimensions = self._state_dimensions()
+
+        if self.state.dimensions() == dimensions:
+            for block in self.blocks:
+                for pos in block.positions:
+                    self.state[pos] = Block.EMPTY
+        else:
+            self.state.reset(*dimensions)
+
         self._empty_positions = self.total_positions()
+        self._update_size_table()
+        self._update_kernel()
+        self._update_catalog()
         self.blocks = []
         self.block_nu = 1
-        self._coverer = Coverer(self)
+        self.color_seed = random.getrandbits(32)
+        # A reset model is no longer stopped
+        self.cancel_token = CancellationToken()
+        self._coverer.reset()
 
     def next_block(self):
         """
         Return a new (empty) block object
         """
-        block = Block(self.block_nu)
+        block = Block(self.block_nu, self.color_seed)
         self.block_nu += 1
 
         return block
@@ -209,7 +800,14 @@ class GeneralCoveringModel:
         """
         Stop covering the model (if covering is in progress)
         """
-        self.stopped = True
+        self.cancel_token.cancel()
+
+    @property
+    def stopped(self):
+        """
+        Was the covering interrupted (by another thread)
+        """
+        return self.cancel_token.cancelled()
 
     def is_filled(self):
         """
@@ -227,6 +825,19 @@ class GeneralCoveringModel:
         """
         raise NotImplementedError
 
+    def _is_valid_position(self, pos):
+        """
+        Returns True if `pos` lies within the model
+        """
+        raise NotImplementedError
+
+    def symmetries(self):
+        """
+        Returns a list of functions mapping positions to positions,
+        one for each symmetry of the covered area (including identity)
+        """
+        raise NotImplementedError
+
     def total_positions(self):
         """
         Returns the number of all positions
@@ -280,6 +891,9 @@ class GeneralCoveringModel:
             self.state[pos] = block_obj
             block_obj.positions.append(pos)
 
+        if self._kernel is not None:
+            self._kernel.fill(block_positions)
+
         self._empty_positions -= len(block_positions)
 
     def pop_block(self):
@@ -291,6 +905,9 @@ class GeneralCoveringModel:
         for pos in last.positions:
             self.state[pos] = Block.EMPTY
 
+        if self._kernel is not None:
+            self._kernel.clear(last.positions)
+
         self._empty_positions += len(last.positions)
         self.block_nu -= 1
 
@@ -304,9 +921,17 @@ class GeneralCoveringModel:
 
         step_size = 0
 
+        # See `_update_kernel` and `_update_catalog`
+        if self._kernel is not None:
+            find_step = self._kernel_step
+        elif self._catalog is not None:
+            find_step = self._catalog_step
+        else:
+            find_step = self._valid_step
+
         for step_size in all_sizes:
-            valid = self._valid_step(position, step_size,
-                                     check_finishable=check_finishable)
+            valid = find_step(position, step_size,
+                              check_finishable=check_finishable)
             if valid is not None:
                 break
         else:
@@ -322,126 +947,463 @@ class GeneralCoveringModel:
         """
         return self._empty_positions
 
-    def try_cover(self, check_finishable=True):
+    # pylint: disable=too-many-arguments
+    def try_cover(self, check_finishable=True, progress_callback=None,
+                  cancel_token=None, checkpoint=None, resume_from=None):
         """
         Tries to cover the whole area with blocks, throws
         an exception if not successful
+
+        See `Coverer.try_cover` for `progress_callback` and `checkpoint`.
+        The covering stops with `CoveringStoppedException` once
+        `cancel_token` (a `CancellationToken`, the model's token
+        if None) is cancelled, so `stop_covering` also stops a covering
+        that didn't start yet. If `resume_from` is a `search_state()`,
+        the covering continues from it.
         """
-        self.stopped = False
-        self._coverer.try_cover(check_finishable)
+        if cancel_token is not None:
+            self.cancel_token = cancel_token
 
-    def _empty_neighbors(self, pos, state=None):
-        if state is None:
-            state = self.state
+        if resume_from is not None:
+            # Restoring resets the model, but not the token of this covering
+            cancel_token = self.cancel_token
+            self.restore_search_state(resume_from)
+            self.cancel_token = cancel_token
 
-        result = set()
+        self._coverer.try_cover(check_finishable, progress_callback,
+                                checkpoint)
 
-        for nbr in self.neighbors(pos):
-            if state[nbr] is not Block.EMPTY:
-                continue
-            result.add(nbr)
+    def search_state(self):
+        """
+        Returns a snapshot of the covering search: placed blocks,
+        the backtracking stack, statistics and the `random` state
 
-        return result
+        Constraint watchers are reset for every generated block,
+        so there is no watcher state between the steps of the search.
+        """
+        state = self._coverer.search_state()
+        state.update(blocks=[tuple(block.positions) for block in self.blocks],
+                     color_seed=self.color_seed,
+                     finishable_checks=self._finishable_checks,
+                     kernel_checks=0 if self._kernel is None
+                     else self._kernel.checks,
+                     random=random.getstate())
+
+        return state
 
-    def _group_neighbors(self, group, state=None):
+    def restore_search_state(self, state):
         """
-        Return a shuffled list of all empty neighbors of a group
+        Resets the model to a snapshot returned by `search_state`
         """
+        self.reset()
+        self.color_seed = state["color_seed"]
+        self._finishable_checks = state["finishable_checks"]
 
-        if state is None:
-            state = self.state
-
-        result = set()
+        if self._kernel is not None:
+            self._kernel.checks = state["kernel_checks"]
 
-        for pos in group:
-            result.update(self._empty_neighbors(pos, state=state))
+        for block in state["blocks"]:
+            self.add_block(block)
 
-        res_list = list(result)
-        random.shuffle(res_list)
+        self._coverer.restore_search_state(state)
+        random.setstate(state["random"])
 
-        return res_list
+    def progress(self):
+        """
+        Returns the last published `CoveringProgress` of the covering,
+        this is safe to call from another thread
+        """
+        return self._coverer.progress
 
     def _valid_step(self, pos, step_size, check_finishable=True):
         """
         Returns a tuple of positions of a valid step
         starting with pos
         """
-
         self.message(f"\t\t\tLooking for a valid block/step "
                      f"of size {step_size}...")
-        iterables = []
         curr_generated = [pos]
 
         # Don't copy the state, just make sure to return it as it was
         state = self.state
         # state = copy.deepcopy(self.state)
 
-        watcher_instances = [watcher(self, pos)
-                             for watcher in self.constraint_watchers]
-
-        if pos is None:
+        # The search only returns blocks with at least two positions
+        if pos is None or step_size < 2:
             return None
 
+        watcher_instances = self._get_watchers(pos)
+
         state[pos] = Block.PLACEHOLDER
 
-        new_gen = iter(self._group_neighbors(curr_generated, state=state))
-        iterables.append(new_gen)
+        # Candidates for the next position are the empty neighbors
+        # of the whole block
+        frontier = Frontier(self, state)
+        frontier.push(pos)
+        frontier.open_level()
 
-        while iterables:
-            # Another thread interrupted the covering
-            if self.stopped:
-                raise CoveringStoppedException
+        while curr_generated:
+            # Another thread may have cancelled the covering
+            self._poll_cancel_token(curr_generated, state)
 
-            last_gen = iterables[-1]
-            try:
-                generated_pos = next(last_gen)
+            generated_pos = frontier.sample()
 
-                if not all((watcher.check_position(generated_pos)
-                            for watcher in watcher_instances)):
-                    # At least one constraint failed
-                    continue
+            if generated_pos is None:
+                # All candidates were tried, remove the last position
+                frontier.close_level()
+                frontier.pop()
+                state[curr_generated.pop()] = Block.EMPTY
+
+                if curr_generated:
+                    for watcher in watcher_instances:
+                        # Return all watchers state to the one before
+                        # the last position
+                        watcher.rollback_state()
+
+                continue
+
+            if not all((watcher.check_position(generated_pos)
+                        for watcher in watcher_instances)):
+                # At least one constraint failed
+                continue
+
+            for watcher in watcher_instances:
+                # Commit the new tile to watchers
+                watcher.commit()
+
+            curr_generated.append(generated_pos)
+
+            state[generated_pos] = Block.PLACEHOLDER
+
+            if len(curr_generated) < step_size:
+                frontier.push(generated_pos)
+                frontier.open_level()
+                continue
+
+            if not check_finishable or \
+                    self._is_finishable_after(curr_generated, state):
+                for gen_pos in curr_generated:
+                    state[gen_pos] = Block.EMPTY
+
+                return tuple(curr_generated)
+
+            state[generated_pos] = Block.EMPTY
+            curr_generated.pop()
+
+            for watcher in watcher_instances:
+                watcher.rollback_state()
+
+            self.message("\t\t\tThe generated position was not "
+                         "finishable, trying another one...")
 
-                for watcher in watcher_instances:
-                    # Commit the new tile to watchers
-                    watcher.commit()
-
-                curr_generated.append(generated_pos)
-
-                state[generated_pos] = Block.PLACEHOLDER
-
-                if len(curr_generated) == step_size:
-                    if not check_finishable or \
-                           self._is_finishable(state=state):
-                        return tuple(curr_generated)
-                    state[generated_pos] = Block.EMPTY
-                    curr_generated.pop()
-                    self.message("\t\t\tThe generated position was not "
-                                 "finishable, trying another one...")
-                else:
-                    new_gen = iter(self._group_neighbors(curr_generated,
-                                                         state=state))
-                    iterables.append(new_gen)
-
-            except StopIteration:
-                iterables.pop()
-                last_pos = curr_generated.pop()
-                state[last_pos] = Block.EMPTY
-
-                for watcher in watcher_instances:
-                    # Return all watchers state to the one before the last
-                    # position
-                    watcher.rollback_state()
-
-        # Restore the initial position
-        state[pos] = Block.EMPTY
         return None
 
-    def _is_finishable(self, state=None):
+    def _get_watchers(self, pos):
+        """
+        Returns instances of the constraint watchers reset to a block
+        starting at `pos`, they are only created again if the constraints
+        change
+        """
+        key = tuple(self.constraint_watchers)
+
+        if key != self._watchers_key:
+            self._watchers = [watcher(self, pos) for watcher in key]
+            self._watchers_key = key
+        else:
+            for watcher in self._watchers:
+                watcher.reset(pos)
+
+        return self._watchers
+
+    def _poll_cancel_token(self, block, state):
+        """
+        Polls the cancellation token while `block` is being generated
         """
-        Do a DFS and check that all component sizes are:
+        try:
+            self.cancel_token.poll()
+        except CoveringStoppedException:
+            # Don't leave placeholders in the state
+            for pos in block:
+                state[pos] = Block.EMPTY
+
+            raise
 
-        1) if min_block_size == max_block_size: divisible by block_size
-        2) else:                                larger than min_block_size
+    def _kernel_step(self, pos, step_size, check_finishable=True):
+        """
+        `_valid_step` done by the compiled kernel
+        """
+        result = self._kernel.valid_step(pos, step_size, check_finishable,
+                                         self.cancel_token)
+
+        # The kernel returns None once the token is cancelled
+        self.cancel_token.check()
+
+        return result
+
+    def _catalog_step(self, pos, step_size, check_finishable=True):
+        """
+        `_valid_step` placing shapes from the shape catalog to `pos`,
+        without the constraint watchers
+
+        The shapes are searched in the prefix tree of the catalog
+        (see `ShapeCatalog.tree`), a filled position rules out all shapes
+        starting with it at once.
+        """
+        if pos is None or step_size < 2:
+            return None
+
+        tree = self._catalog.tree(step_size, self.cancel_token)
+
+        if tree is None:
+            # Too many shapes of this size to catalog
+            return self._valid_step(pos, step_size, check_finishable)
+
+        self.message(f"\t\t\tLooking for a catalog block "
+                     f"of size {step_size}...")
+
+        state = self.state
+        is_valid = self._is_valid_position
+        token = self.cancel_token
+
+        block = [pos]
+        # Iterators of the remaining (offset, subtree) children
+        stack = [iter(random.sample(tree, len(tree)))]
+
+        while stack:
+            token.poll()
+
+            for diff, subtree in stack[-1]:
+                block_pos = tuple(map(add, pos, diff))
+
+                if is_valid(block_pos) and state[block_pos] is Block.EMPTY:
+                    break
+            else:
+                # All children were tried
+                stack.pop()
+                block.pop()
+                continue
+
+            block.append(block_pos)
+
+            if subtree:
+                stack.append(iter(random.sample(subtree, len(subtree))))
+                continue
+
+            if not check_finishable or self._is_finishable_with(block):
+                return tuple(block)
+
+            block.pop()
+
+        return None
+
+    def _is_finishable_with(self, block):
+        """
+        `_is_finishable_after` for a block not marked in the state
+        """
+        for pos in block:
+            self.state[pos] = Block.PLACEHOLDER
+
+        try:
+            return self._is_finishable_after(block, self.state)
+        finally:
+            for pos in block:
+                self.state[pos] = Block.EMPTY
+
+    def _update_size_table(self):
+        """
+        Precomputes which sizes of empty components can be covered, that is,
+        which numbers up to `total_positions()` are sums of allowed block sizes
+        """
+        key = (self.min_block_size, self.max_block_size,
+               self.total_positions())
+
+        if key == self._representable_key:
+            return
+
+        sizes = range(self.min_block_size, self.max_block_size + 1)
+        total = self.total_positions()
+
+        table = [False] * (total + 1)
+        table[0] = True
+
+        for size in range(1, total + 1):
+            table[size] = any(table[size - block_size]
+                              for block_size in sizes
+                              if block_size <= size)
+
+        self._representable = table
+        self._representable_key = key
+
+        # All sizes above the limit have to be representable (the largest
+        # unrepresentable size is finite for more block sizes), so that
+        # `_is_locally_finishable` can skip large components
+        self._local_limit = self.LOCAL_CHECK_FACTOR * self.max_block_size
+
+        if self.min_block_size < self.max_block_size:
+            unrepresentable = [size for size in range(total + 1)
+                               if not table[size]]
+
+            if unrepresentable:
+                self._local_limit = max(self._local_limit,
+                                        unrepresentable[-1])
+
+    def _update_kernel(self):
+        """
+        Prepares the compiled kernel (see `pycovering.kernel`) if it is
+        enabled by `use_kernel` and can cover the model, it is only rebuilt
+        if the model dimensions or constraints changed
+        """
+        if not self.use_kernel or \
+                self.total_positions() < self.KERNEL_MIN_POSITIONS:
+            self._kernel = None
+            return
+
+        # Numba takes a while to import, only load it when needed. Like
+        # the catalog, the kernel imports the constraint watchers.
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from pycovering.kernel import Kernel
+
+        if not Kernel.supports(self):
+            self._kernel = None
+            return
+
+        key = (type(self), self._state_dimensions(),
+               tuple(self.constraint_watchers))
+
+        if self._kernel is None or key != self._kernel_key:
+            self._kernel = Kernel(self)
+            self._kernel_key = key
+        else:
+            self._kernel.clear()
+
+        self._kernel.set_sizes(self._representable, self._local_limit)
+
+    def _update_catalog(self):
+        """
+        Selects the shape catalog (see `pycovering.catalog`) if the model
+        can use it, that is, if all its constraints are built-in ones
+        and it isn't covered by the compiled kernel
+        """
+        # The catalog imports the constraint watchers, which import this
+        # module (see `PathConstraintWatcher.check_position`)
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from pycovering.catalog import ShapeCatalog, get_catalog
+
+        if not self.use_catalog or self._kernel is not None or \
+                not ShapeCatalog.supports(self.SHAPE_GEOMETRY,
+                                          self.constraint_watchers):
+            self._catalog = None
+            return
+
+        self._catalog = get_catalog(self.SHAPE_GEOMETRY,
+                                    self.constraint_watchers,
+                                    self.catalog_dir)
+
+    def _is_finishable_after(self, block, state):
+        """
+        Checks that the model is finishable after placing `block`
+
+        Only components next to the block can have changed, so usually
+        just they are checked (see `_is_locally_finishable`), the global
+        check runs once per `GLOBAL_CHECK_INTERVAL` calls as a safety net.
+        """
+        check = self._finishable_checks
+        self._finishable_checks += 1
+
+        try:
+            if check % self.GLOBAL_CHECK_INTERVAL == 0:
+                return self._is_finishable(state=state)
+
+            return self._is_locally_finishable(block, state)
+        except CoveringStoppedException:
+            # The covering was cancelled during the check, the block
+            # is not going to be placed
+            for pos in block:
+                state[pos] = Block.EMPTY
+
+            raise
+
+    def _is_locally_finishable(self, block, state):
+        """
+        Checks the empty components next to `block`, assuming
+        the model was finishable before it was placed
+
+        The block was placed to one empty component, which it split into
+        the components next to it. Flood fills of these stop at
+        `_local_limit` positions. If at most one of them is larger,
+        its size must be a sum of block sizes as well (see
+        `_update_size_table`). Otherwise the block might have split
+        a large component and the components are filled completely.
+        """
+        large = self._check_components(block, state, self._local_limit)
+
+        if large is None:
+            return False
+
+        if large <= 1:
+            return True
+
+        return self._check_components(block, state, None) is not None
+
+    def _check_components(self, block, state, limit):
+        """
+        Flood fills the empty components next to `block` and checks their
+        sizes like `_is_finishable` does
+
+        A flood fill stops once its component has more than `limit`
+        positions (if not None) or once it reaches a position of such
+        component. Returns the number of these large components, or None
+        if some other component can not be covered.
+        """
+        # Position -> number of the flood fill that visited it
+        visited = {}
+        large = 0
+        token = self.cancel_token
+
+        starts = [nbr for pos in block for nbr in self.neighbors(pos)]
+
+        for fill, start in enumerate(starts):
+            if start in visited or state[start] is not Block.EMPTY:
+                continue
+
+            visited[start] = fill
+            stack = [start]
+            component_size = 0
+            stopped = False
+
+            while stack and not stopped:
+                token.poll()
+                component_size += 1
+
+                if limit is not None and component_size > limit:
+                    large += 1
+                    break
+
+                for nbr in self.neighbors(stack.pop()):
+                    if state[nbr] is not Block.EMPTY:
+                        continue
+
+                    other = visited.get(nbr)
+
+                    if other is None:
+                        visited[nbr] = fill
+                        stack.append(nbr)
+                    elif other != fill:
+                        # Only a stopped flood fill leaves unvisited
+                        # positions behind, this is the same component
+                        stopped = True
+                        break
+            else:
+                if not stopped and \
+                        not self._representable[component_size]:
+                    return None
+
+        return large
+
+    def _is_finishable(self, state=None):
+        """
+        Do a DFS and check that all component sizes are sums
+        of allowed block sizes (see `_update_size_table`)
         """
 
         def dfs(pos):
@@ -449,6 +1411,7 @@ class GeneralCoveringModel:
             component_size = 0
 
             while stack:
+                token.poll()
                 pos = stack.pop()
 
                 if state[pos] is not Block.EMPTY:
@@ -469,6 +1432,8 @@ class GeneralCoveringModel:
         if state is None:
             state = self.state
 
+        token = self.cancel_token
+
         # A little hack, but provides exactly the interface we need
         visited = self._get_state_container()
 
@@ -478,12 +1443,7 @@ class GeneralCoveringModel:
                 continue
             component_size = dfs(pos)
 
-            if self.min_block_size == self.max_block_size:
-                if component_size % self.min_block_size != 0:
-                    return False
-
-            # If block size is ambiguous
-            elif component_size < self.min_block_size:
+            if not self._representable[component_size]:
                 return False
 
         return True
@@ -516,6 +1476,7 @@ class GeneralCoveringState:
     """
     def __init__(self):
         self._state = None  # Implementations will redefine this
+        self._dimensions = None
         raise NotImplementedError
 
     def __getitem__(self, pos):
@@ -543,6 +1504,12 @@ class GeneralCoveringState:
         """
         raise NotImplementedError
 
+    def dimensions(self):
+        """
+        Return the dimensions of the state (as passed to `reset`)
+        """
+        return self._dimensions
+
     def raw_data(self):
         """
         Return the inner state object
@@ -568,6 +1535,7 @@ class TwoDCoveringState(GeneralCoveringState):
     def reset(self, width, height):
         self._state = [[Block.EMPTY for _ in range(width)]
                        for _ in range(height)]
+        self._dimensions = (width, height)
 
     def __getitem__(self, pos):
         x, y = pos
@@ -584,6 +1552,7 @@ class TwoDCoveringModel(GeneralCoveringModel):
     """
 
     INITIAL_POSITION = (0, 0)
+    SHAPE_GEOMETRY = "grid"
 
     # pylint: disable=too-many-arguments
     def __init__(self, width, height,
@@ -595,6 +1564,9 @@ class TwoDCoveringModel(GeneralCoveringModel):
     def _get_state_container(self):
         return TwoDCoveringState(self.width, self.height)
 
+    def _state_dimensions(self):
+        return (self.width, self.height)
+
     def set_size(self, width, height):
         """
         Sets the area width and height (this resets current state)
@@ -608,7 +1580,6 @@ class TwoDCoveringModel(GeneralCoveringModel):
         """
         Removes all blocks, resets position
         """
-        self.state.reset(self.width, self.height)
         self.pos = (0, 0)
 
         super().reset()
@@ -629,6 +1600,11 @@ class TwoDCoveringModel(GeneralCoveringModel):
 
         return None
 
+    def _is_valid_position(self, pos):
+        x, y = pos
+
+        return 0 <= x < self.width and 0 <= y < self.height
+
     def neighbors(self, pos):
         neighbors = [
             (pos[0] - 1, pos[1]),
@@ -642,6 +1618,30 @@ class TwoDCoveringModel(GeneralCoveringModel):
                 continue
             yield (x, y)
 
+    def symmetries(self):
+        """
+        The dihedral group of the rectangle (of the square,
+        if width and height are equal)
+        """
+        max_x, max_y = self.width - 1, self.height - 1
+
+        result = [
+            lambda pos: pos,
+            lambda pos: (max_x - pos[0], pos[1]),
+            lambda pos: (pos[0], max_y - pos[1]),
+            lambda pos: (max_x - pos[0], max_y - pos[1])
+        ]
+
+        if self.width == self.height:
+            result += [
+                lambda pos: (pos[1], pos[0]),
+                lambda pos: (max_x - pos[1], pos[0]),
+                lambda pos: (pos[1], max_y - pos[0]),
+                lambda pos: (max_x - pos[1], max_y - pos[0])
+            ]
+
+        return result
+
 # 3D
 
 
@@ -658,6 +1658,7 @@ class ThreeDCoveringState(GeneralCoveringState):
         self._state = [[[Block.EMPTY for _ in range(zs)]
                         for _ in range(ys)]
                        for _ in range(xs)]
+        self._dimensions = (xs, ys, zs)
 
     def __getitem__(self, pos):
         x, y, z = pos
@@ -676,6 +1677,7 @@ class PyramidCoveringModel(GeneralCoveringModel):
     """
 
     INITIAL_POSITION = (0, 0, 0)
+    SHAPE_GEOMETRY = "pyramid"
 
     def __init__(self, pyramid_size, min_block_size, max_block_size,
                  verbosity=0):
@@ -684,7 +1686,6 @@ class PyramidCoveringModel(GeneralCoveringModel):
         super().__init__(min_block_size, max_block_size, verbosity)
 
     def reset(self):
-        self.state.reset(self.size, self.size, self.size)
         self.pos = (0, 0, 0)
 
         super().reset()
@@ -699,6 +1700,9 @@ class PyramidCoveringModel(GeneralCoveringModel):
     def _get_state_container(self):
         return ThreeDCoveringState(self.size, self.size, self.size)
 
+    def _state_dimensions(self):
+        return (self.size, self.size, self.size)
+
     def _next_position(self, pos):
         x, y, z = pos
 
@@ -762,6 +1766,26 @@ class PyramidCoveringModel(GeneralCoveringModel):
             if self._is_valid_position(nbr):
                 yield nbr
 
+    def symmetries(self):
+        """
+        The tetrahedral symmetries of the pyramid
+
+        A position (x, y, z) has the barycentric coordinates
+        (x, y, z, size - 1 - x - y - z), the symmetries permute them.
+        """
+        top = self.size - 1
+
+        def symmetry(perm):
+            def apply(pos):
+                x, y, z = pos
+                coords = (x, y, z, top - x - y - z)
+
+                return (coords[perm[0]], coords[perm[1]], coords[perm[2]])
+
+            return apply
+
+        return [symmetry(perm) for perm in it.permutations(range(4))]
+
     def set_size(self, size):
         """
         Sets the pyramid size (this resets current state)
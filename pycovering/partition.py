@@ -0,0 +1,346 @@
+"""
+Divide-and-conquer covering of large rectangles.
+
+The rectangle is split into a grid of sub-rectangles (tiles) whose areas
+can be covered by the allowed block sizes, the tiles are covered
+independently in a process pool and the results are stitched into one
+model. Tile boundaries would show in the covering as long straight lines,
+so a seam pass then re-covers windows along all boundaries (blocks
+intersecting a window are removed and the freed positions are covered
+again, with all other positions fixed).
+"""
+
+import random
+import threading
+
+from contextlib import nullcontext
+from math import gcd
+from multiprocessing import Pool
+
+from pycovering.models import TwoDCoveringModel, CancellationToken, \
+                              CoveringStoppedException, \
+                              ImpossibleToFinishException
+from pycovering.serialization import model_params, model_from_params
+
+
+# Target tile width and height
+TILE_SIZE = 24
+
+# Randomized coverings mostly finish quickly, but some get stuck for
+# a very long time, so tiles are covered again with a new seed after
+# TILE_TIMEOUT seconds, the timeout doubles with every attempt
+TILE_TIMEOUT = 0.5
+TILE_ATTEMPTS = 8
+
+# Seconds to re-cover a seam window (the old blocks stay otherwise)
+SEAM_TIMEOUT = 0.5
+
+# Seam windows reach this many positions to both sides of a boundary
+# (as a multiple of the maximal block size)
+SEAM_FACTOR = 1
+
+
+def is_coverable_area(area, min_size, max_size):
+    """
+    Returns True if `area` is a sum of block sizes
+    """
+    table = [True] + [False] * area
+
+    for size in range(1, area + 1):
+        table[size] = any(table[size - block_size]
+                          for block_size in range(min_size, max_size + 1)
+                          if block_size <= size)
+
+    return table[area]
+
+
+def split_length(length, unit, pieces):
+    """
+    Splits `length` (a multiple of `unit`) into at most `pieces` parts
+    of almost equal lengths, all of them multiples of `unit`
+    """
+    units = length // unit
+    pieces = max(1, min(pieces, units))
+
+    return [unit * (units // pieces + (i < units % pieces))
+            for i in range(pieces)]
+
+
+def split(width, height, min_size, max_size, tile_size=TILE_SIZE):
+    """
+    Returns (column widths, row heights) of tiles covering a `width` x
+    `height` rectangle, such that the area of each tile is a sum of block
+    sizes (tiles get larger if needed)
+
+    All sums of block sizes are multiples of their greatest common
+    divisor `d`, so tile widths are multiples of `gcd(width, d)` and
+    heights of the rest of `d`.
+    """
+    divisor = 0
+
+    for size in range(min_size, max_size + 1):
+        divisor = gcd(divisor, size)
+
+    if width * height % divisor:
+        raise ImpossibleToFinishException(
+            "The area is not a multiple of the block sizes")
+
+    width_unit = gcd(width, divisor)
+    height_unit = divisor // width_unit
+
+    columns = max(1, round(width / tile_size))
+    rows = max(1, round(height / tile_size))
+
+    while True:
+        widths = split_length(width, width_unit, columns)
+        heights = split_length(height, height_unit, rows)
+
+        if all(is_coverable_area(area, min_size, max_size)
+               for area in {w * h for w in widths for h in heights}):
+            return widths, heights
+
+        if columns == rows == 1:
+            raise ImpossibleToFinishException(
+                "The area is not a sum of block sizes")
+
+        columns, rows = max(1, columns // 2), max(1, rows // 2)
+
+
+def cover_with_timeout(model, timeout):
+    """
+    Covers `model`, raises `CoveringStoppedException` after `timeout`
+    seconds (a randomized covering can get stuck for a long time,
+    another attempt is usually faster)
+    """
+    token = CancellationToken()
+    timer = threading.Timer(timeout, token.cancel)
+    timer.start()
+
+    try:
+        model.try_cover(cancel_token=token)
+    finally:
+        timer.cancel()
+
+
+def _cover_tile(task):
+    """
+    Covers a tile described by model parameters, returns its blocks
+    or None if it was not successful
+
+    This is run in the worker processes.
+    """
+    params, seed = task
+    random.seed(seed)
+
+    model = model_from_params(params)
+
+    for attempt in range(TILE_ATTEMPTS):
+        try:
+            model.reset()
+            cover_with_timeout(model, TILE_TIMEOUT * 2 ** attempt)
+        except (ImpossibleToFinishException, CoveringStoppedException):
+            continue
+
+        return [block.positions for block in model.blocks]
+
+    return None
+
+
+def _cover_region(task):
+    """
+    Covers the positions `free` of a rectangle described by model
+    parameters (all other positions are fixed), returns a list of blocks
+    or None if it was not successful
+
+    This is run in the worker processes.
+    """
+    params, free, seed = task
+    random.seed(seed)
+
+    min_x = min(x for x, _ in free)
+    min_y = min(y for _, y in free)
+    width = max(x for x, _ in free) - min_x + 1
+    height = max(y for _, y in free) - min_y + 1
+
+    model = model_from_params(dict(params, width=width, height=height))
+
+    fixed = [(x, y) for y in range(height) for x in range(width)
+             if (x + min_x, y + min_y) not in free]
+
+    if fixed:
+        # Blocks added before the covering stay where they are
+        model.add_block(fixed)
+
+    try:
+        cover_with_timeout(model, SEAM_TIMEOUT)
+    except (ImpossibleToFinishException, CoveringStoppedException):
+        return None
+
+    return [[(x + min_x, y + min_y) for x, y in block.positions]
+            for block in model.blocks[1 if fixed else 0:]]
+
+
+def _boundaries(lengths):
+    result = []
+    total = 0
+
+    for length in lengths[:-1]:
+        total += length
+        result.append(total)
+
+    return result
+
+
+def seam_windows(widths, heights, reach, shift=0):
+    """
+    Returns (x1, y1, x2, y2) windows (x2 and y2 exclusive) along all tile
+    boundaries, reaching `reach` positions to both sides of them
+
+    Windows are `2 * reach` long, the first one along each boundary
+    is shorter by `shift`.
+    """
+    width, height = sum(widths), sum(heights)
+    size = 2 * reach
+    windows = []
+
+    for boundary in _boundaries(widths):
+        x1, x2 = max(0, boundary - reach), min(width, boundary + reach)
+
+        for y in range(-shift, height, size):
+            windows.append((x1, max(0, y), x2, min(height, y + size)))
+
+    for boundary in _boundaries(heights):
+        y1, y2 = max(0, boundary - reach), min(height, boundary + reach)
+
+        for x in range(-shift, width, size):
+            windows.append((max(0, x), y1, min(width, x + size), y2))
+
+    return windows
+
+
+def _next_batch(windows, owner):
+    """
+    Returns the sets of indices of blocks intersecting the windows that
+    can be re-covered at once (their blocks don't intersect) and
+    the deferred windows
+    """
+    batch = []
+    deferred = []
+    taken = set()
+
+    for x1, y1, x2, y2 in windows:
+        indices = {owner[(x, y)] for x in range(x1, x2)
+                   for y in range(y1, y2)}
+
+        if indices & taken:
+            deferred.append((x1, y1, x2, y2))
+            continue
+
+        taken |= indices
+        batch.append(indices)
+
+    return batch, deferred
+
+
+def randomize_seams(params, blocks, windows, map_function=map, rng=random):
+    """
+    Re-covers every window: all blocks intersecting it are removed
+    and their positions covered again, returns the new list of blocks
+
+    Windows whose blocks don't intersect are re-covered at once,
+    by `map_function` (e.g. `Pool.map`).
+    """
+    blocks = list(blocks)
+    owner = {pos: index for index, block in enumerate(blocks)
+             for pos in block}
+
+    while windows:
+        batch, windows = _next_batch(windows, owner)
+
+        tasks = [(params, {pos for index in indices for pos in blocks[index]},
+                  rng.getrandbits(32))
+                 for indices in batch]
+
+        for indices, new_blocks in zip(batch,
+                                       map_function(_cover_region, tasks)):
+            if new_blocks is None:
+                continue  # Keep the old blocks
+
+            for index in indices:
+                blocks[index] = None
+
+            for block in new_blocks:
+                for pos in block:
+                    owner[pos] = len(blocks)
+
+                blocks.append(block)
+
+    return [block for block in blocks if block is not None]
+
+
+# pylint: disable=too-many-arguments,too-many-locals
+def cover_partitioned(model, tile_size=TILE_SIZE, workers=None, seam_passes=1,
+                      rng=random):
+    """
+    Covers `model` (a `TwoDCoveringModel`, all its current blocks are
+    removed) tile by tile, using `workers` processes (all CPUs if None),
+    then re-covers the seams between tiles `seam_passes` times
+
+    Blocks are numbered by their first position (row by row)
+    over the whole rectangle.
+    """
+    if not isinstance(model, TwoDCoveringModel):
+        raise ValueError("Only rectangles can be partitioned")
+
+    params = model_params(model)
+    widths, heights = split(model.width, model.height, model.min_block_size,
+                            model.max_block_size, tile_size)
+
+    tasks = []
+    offsets = []
+    y = 0
+
+    for tile_height in heights:
+        x = 0
+
+        for tile_width in widths:
+            tile_params = dict(params, width=tile_width, height=tile_height)
+            tasks.append((tile_params, rng.getrandbits(32)))
+            offsets.append((x, y))
+            x += tile_width
+
+        y += tile_height
+
+    single = workers == 1 or len(tasks) == 1
+
+    with nullcontext() if single else Pool(workers) as pool:
+        map_function = map if single else pool.map
+
+        blocks = []
+
+        for (dx, dy), tile_blocks in zip(offsets,
+                                         map_function(_cover_tile, tasks)):
+            if tile_blocks is None:
+                raise ImpossibleToFinishException(
+                    "A tile could not be covered")
+
+            blocks.extend([(x + dx, y + dy) for x, y in block]
+                          for block in tile_blocks)
+
+        reach = SEAM_FACTOR * model.max_block_size
+
+        for seam_pass in range(seam_passes):
+            # Every other pass shifts the windows by half of their length,
+            # so that their own edges are re-covered as well
+            windows = seam_windows(widths, heights, reach,
+                                   reach * (seam_pass % 2))
+            blocks = randomize_seams(params, blocks, windows, map_function,
+                                     rng)
+
+    model.reset()
+
+    for block in sorted(blocks, key=lambda block: min((y, x)
+                                                      for x, y in block)):
+        model.add_block(block)
+
+    return model
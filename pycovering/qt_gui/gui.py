@@ -7,16 +7,16 @@ Gui interface for the application
 import sys
 import webbrowser
 
-from contextlib import redirect_stdout
+from collections import OrderedDict
 from io import StringIO
 
 from PySide2.QtWidgets import QApplication, QMainWindow, QDialog, \
                               QActionGroup, QMessageBox, \
                               QAction, QPlainTextEdit
 
-from PySide2.QtCore import Signal, QThread, Qt
-from PySide2.QtGui import QFont, QStandardItemModel, QStandardItem, QIcon, \
-                          QPixmap, QColor
+from PySide2.QtCore import Signal, QThread, Qt, QAbstractListModel, \
+                           QModelIndex
+from PySide2.QtGui import QFont, QIcon, QPixmap, QColor
 
 from pycovering.qt_gui.ui_main import Ui_MainWindow
 from pycovering.qt_gui.ui_about import Ui_Dialog
@@ -31,8 +31,8 @@ from pycovering.models import GeneralCoveringModel, TwoDCoveringModel, \
                               ImpossibleToFinishException, \
                               CoveringStoppedException, Block
 
-from pycovering.views import GeneralView, TwoDPrintView, PyramidPrintView, \
-                             PyramidVisualView, TwoDVisualView
+from pycovering.views import GeneralView, TwoDPrintView, PyramidPrintView
+from pycovering.visual_views import PyramidVisualView, TwoDVisualView
 
 from pycovering.constraints import PathConstraintWatcher, \
                                    PlanarConstraintWatcher
@@ -56,7 +56,7 @@ def parented_decorator(cls, parent):
 
 def text_view_decorator(cls, parent):
     """
-    This function takes a view class that prints to stdout
+    This function takes a print view class (see `PrintView`)
     and turns it into a function that shows the output in a dialog
 
     `cls` is the class to be decorated, `parent` is the main GUI
@@ -90,9 +90,7 @@ def text_view_decorator(cls, parent):
                 self.showing = True
 
             output_io = StringIO()
-
-            with redirect_stdout(output_io):
-                self.wrapped.show(model)
+            self.wrapped.render(model, output_io)
 
             out_str = output_io.getvalue()
             self.outputText.setPlainText(out_str)
@@ -116,6 +114,9 @@ class GenerateModelThread(QThread):
     stopped = Signal()
     done = Signal()
 
+    # Emitted with a `CoveringProgress` (at most ~10 times per second)
+    progress = Signal(object)
+
     def __init__(self, model):
         self.model = model
 
@@ -123,7 +124,7 @@ class GenerateModelThread(QThread):
 
     def run(self):
         try:
-            self.model.try_cover()
+            self.model.try_cover(progress_callback=self.progress.emit)
             self.success.emit()
             self.done.emit()
         except CoveringStoppedException:
@@ -136,63 +137,115 @@ class GenerateModelThread(QThread):
             self.done.emit()
 
 
-class BlockListModel(QStandardItemModel):
+class BlockListModel(QAbstractListModel):
     """
     Qt MVC model for the block list view (QListView)
+
+    Rows are served lazily from the covering model blocks, icons are
+    cached per color.
     """
     BLOCK_ROLE = Qt.UserRole
-    ICON_SIZE = 100
+    ICON_SIZE = 16
+    ICON_CACHE_SIZE = 1024
 
     checkedChanged = Signal(Block, bool)
 
-    def __init__(self):
+    def __init__(self, icon_size=ICON_SIZE):
         super().__init__()
-        self.itemChanged.connect(self._emit_checked_changed)
 
-    @classmethod
-    def color_icon(cls, color):
+        self.icon_size = icon_size
+        self._blocks = []
+        self._icons = OrderedDict()
+
+    def color_icon(self, color):
         """
-        Creates a one-color QIcon from (R, G, B) tuple
+        Returns a one-color QIcon for (R, G, B) tuple
         """
+        icon = self._icons.get(color)
+
+        if icon is not None:
+            self._icons.move_to_end(color)
+            return icon
+
         r, g, b = color
 
         qcolor = QColor(r, g, b)
-        pixmap = QPixmap(cls.ICON_SIZE, cls.ICON_SIZE)
+        pixmap = QPixmap(self.icon_size, self.icon_size)
         pixmap.fill(qcolor)
         icon = QIcon(pixmap)
+
+        self._icons[color] = icon
+
+        if len(self._icons) > self.ICON_CACHE_SIZE:
+            self._icons.popitem(last=False)
+
         return icon
 
     def update_data(self, covering_model):
         """
-        Reinserts all covering model blocks
-        in the MVC model
+        Shows blocks of `covering_model` in the MVC model
         """
-        self.clear()
+        self.beginResetModel()
 
         if covering_model is not None:
-            for block in covering_model.blocks:
-                block_str = f"Block {block.number}"
-                item = QStandardItem(block_str)
-                item.setFlags(
-                    Qt.ItemIsUserCheckable |
-                    Qt.ItemIsSelectable |
-                    Qt.ItemIsEnabled
-                )
-                checkstate = Qt.Checked if block.visible else Qt.Unchecked
-                color = block.color
-                icon = self.color_icon(color)
-
-                item.setCheckState(checkstate)
-                item.setData(block, self.BLOCK_ROLE)
-                item.setData(icon, Qt.DecorationRole)
-
-                self.appendRow(item)
-
-    def _emit_checked_changed(self, item):
-        checked = item.checkState() == Qt.Checked
-        block = item.data(self.BLOCK_ROLE)
+            # The covering model may change the list later (while covering)
+            self._blocks = list(covering_model.blocks)
+        else:
+            self._blocks = []
+
+        self.endResetModel()
+
+    # The names and signatures are given by QAbstractListModel
+    # pylint: disable=invalid-name,no-self-use
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Returns the number of blocks
+        """
+        if parent.isValid():
+            return 0
+
+        return len(self._blocks)
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Returns data of one block for given role
+        """
+        if not index.isValid() or index.row() >= len(self._blocks):
+            return None
+
+        block = self._blocks[index.row()]
+
+        if role == Qt.DisplayRole:
+            return f"Block {block.number}"
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if block.visible else Qt.Unchecked
+        if role == Qt.DecorationRole:
+            return self.color_icon(block.color)
+        if role == self.BLOCK_ROLE:
+            return block
+
+        return None
+
+    def flags(self, _):
+        """
+        All blocks are checkable
+        """
+        return Qt.ItemIsUserCheckable | Qt.ItemIsSelectable | Qt.ItemIsEnabled
+
+    def setData(self, index, value, role=Qt.EditRole):
+        """
+        Handles (un)checking a block
+        """
+        if role != Qt.CheckStateRole or not index.isValid():
+            return False
+
+        block = self._blocks[index.row()]
+        checked = value == Qt.Checked
 
         self.checkedChanged.emit(block, checked)
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+
+        return True
 
 
 class AboutDialog(QDialog, Ui_Dialog):
@@ -214,6 +267,22 @@ class CoveringDialog(QDialog, Ui_CoveringDialog):
 
         self.setupUi(self)
 
+    def show_progress(self, progress):
+        """
+        Shows covering progress (a `CoveringProgress`)
+        """
+        percent = 100 * progress.filled / progress.total \
+            if progress.total else 100
+
+        self.label.setText(
+            f"Covering...\n\n"
+            f"Filled: {progress.filled}/{progress.total} ({percent:.0f} %)\n"
+            f"Blocks placed: {progress.nodes} "
+            f"({progress.nodes_per_second:.0f}/s)\n"
+            f"Stack depth: {progress.depth} "
+            f"({progress.stack_bytes / 1024:.0f} kB)\n"
+            f"Backtracks: {progress.backtracks}")
+
 
 class TwoDDimensionsDialog(QDialog, Ui_TwoDDimensionsDialog):
     """
@@ -321,7 +390,12 @@ class MainWindow(QMainWindow, Ui_MainWindow):
 
     model_type_changed = Signal()
     view_type_changed = Signal()
-    model_changed = Signal(GeneralCoveringModel)
+    # The whole covering changed (new covering or a new model)
+    covering_replaced = Signal(GeneralCoveringModel)
+    # Only visibility of one block changed
+    block_visibility_changed = Signal(Block)
+    # Model parameters (and so the model state) changed
+    parameters_changed = Signal(GeneralCoveringModel)
     view_changed = Signal(GeneralView)
     info_updated = Signal(GeneralCoveringModel, GeneralView)
     settings_changed = Signal()
@@ -354,8 +428,11 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.model_type_changed.connect(self.update_constraints_menu)
         self.model_type_changed.connect(self.enable_model_menu_buttons)
 
-        self.model_changed.connect(
+        self.covering_replaced.connect(
+            lambda _: self.info_updated.emit(self.model, self.view))
+        self.parameters_changed.connect(
             lambda _: self.info_updated.emit(self.model, self.view))
+        self.block_visibility_changed.connect(self.update_view_block)
 
         self.view_type_changed.connect(self.update_view_type)
 
@@ -364,13 +441,19 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.info_updated.connect(self.infoText.update)
         self.info_updated.connect(self.update_view)
 
-        self.tiles_list_model = BlockListModel()
+        icon_size = self.tilesList.iconSize()
+        if icon_size.isValid():
+            self.tiles_list_model = BlockListModel(icon_size.height())
+        else:
+            self.tiles_list_model = BlockListModel()
+
         self.tilesList.setModel(self.tiles_list_model)
 
-        self.model_changed.connect(self.tiles_list_model.update_data)
+        self.covering_replaced.connect(self.tiles_list_model.update_data)
+        self.parameters_changed.connect(self.tiles_list_model.update_data)
         self.tiles_list_model.checkedChanged.connect(self.set_block_visibility)
 
-        self.model_changed.emit(self.model)
+        self.covering_replaced.emit(self.model)
         self.update_view_type_menu()
 
     def set_block_visibility(self, block, visible):
@@ -378,7 +461,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         Update model visibility based on block list checkbox change
         """
         block.visible = visible
-        self.model_changed.emit(self.model)
+        self.block_visibility_changed.emit(block)
 
     def show_about_dialog(self):
         """
@@ -401,6 +484,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         dialog = CoveringDialog(self)
 
         dialog.rejected.connect(self.cancel_covering)
+        self.thread.progress.connect(dialog.show_progress)
 
         self.thread.success.connect(dialog.accept)
         self.thread.success.connect(self.covering_success)
@@ -408,7 +492,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         self.thread.failed.connect(self.covering_failed)
 
         self.thread.done.connect(
-            lambda: self.model_changed.emit(self.model))
+            lambda: self.covering_replaced.emit(self.model))
 
         self.thread.start()
         dialog.open()
@@ -463,7 +547,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         assert isinstance(self.model, TwoDCoveringModel)
 
         self.model.set_size(width, height)
-        self.model_changed.emit(self.model)
+        self.parameters_changed.emit(self.model)
 
         self.message("Size updated")
 
@@ -477,7 +561,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         # and not a `TwoDCoveringModel`
         # pylint: disable=no-value-for-parameter
         self.model.set_size(size)
-        self.model_changed.emit(self.model)
+        self.parameters_changed.emit(self.model)
 
         self.message("Size updated")
 
@@ -488,7 +572,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         assert self.model is not None
 
         self.model.set_block_size(min_val, max_val)
-        self.model_changed.emit(self.model)
+        self.parameters_changed.emit(self.model)
 
         self.message("Block size updated")
 
@@ -504,6 +588,16 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         else:
             view.close()
 
+    def update_view_block(self, block):
+        """
+        Refreshes only the part of the current view showing `block`
+        """
+        if self.view is None or self.model is None or \
+                not self.model.is_filled():
+            return
+
+        self.view.update_block(self.model, block)
+
     def message(self, msg):
         """
         Shows a log message in the "Messages" window
@@ -546,7 +640,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
             model = None
 
         self.model = model
-        self.model_changed.emit(model)
+        self.covering_replaced.emit(model)
         self.message("Model type updated")
 
     def enable_model_menu_buttons(self):
@@ -691,7 +785,7 @@ class MainWindow(QMainWindow, Ui_MainWindow):
         else:
             self.model.remove_constraint(constraint)
 
-        self.model_changed.emit(self.model)
+        self.parameters_changed.emit(self.model)
         self.message("Constraint settings changed")
 
     def update_constraints_menu(self):
@@ -3,62 +3,187 @@ One-class module, see `TwoDVisualWidget`
 """
 
 from PySide2.QtWidgets import QWidget
-from PySide2.QtCore import QRect, Qt
-from PySide2.QtGui import QPainter, QBrush, QColor
-
-from pycovering.models import Block
+from PySide2.QtCore import QRectF, QPointF, Qt
+from PySide2.QtGui import QPainter, QImage
 
 
 class TwoDVisualWidget(QWidget):
     """
     A widget visually showing the state of TwoDCoveringModule,
     being the core of TwoDVisualView
+
+    The covering is rasterized once into a QImage with one pixel per cell,
+    repainting only (scaled) blits the visible part of the image. The view
+    can be zoomed with the mouse wheel and panned by dragging, double click
+    resets it.
     """
     START_X, START_Y = 0, 0
 
+    ZOOM_STEP = 1.25
+    MAX_ZOOM = 256
+
+    TRANSPARENT = 0x00000000
+
     def __init__(self, parent=None):
         self.model = None
+        self._image = None
+
+        # Zoom relative to the size fitting the widget,
+        # offset (pan) in widget pixels
+        self._zoom = 1.0
+        self._offset = QPointF(self.START_X, self.START_Y)
+        self._drag_start = None
+
         QWidget.__init__(self, parent)
 
     def show(self, model):
         self.model = model
-        self.repaint()
+        self._render_image()
+        self.update()
 
-    # pylint: disable=too-many-locals
-    def paintEvent(self, _):
+    @staticmethod
+    def _block_pixel(block):
+        if not block.visible:
+            return TwoDVisualWidget.TRANSPARENT
+
+        r, g, b = block.color
+        return 0xFF000000 | (r << 16) | (g << 8) | b
+
+    def _render_image(self):
         """
-        Paints the widget contents
+        Rasterizes the whole covering, one pixel per cell
         """
-        painter = QPainter(self)
+        width, height = self.model.width, self.model.height
+        buffer = bytearray(width * height * 4)  # All transparent
+
+        for block in self.model.blocks:
+            pixel = self._block_pixel(block).to_bytes(4, "little")
+
+            for x, y in block.positions:
+                index = 4 * (y * width + x)
+                buffer[index:index + 4] = pixel
+
+        image = QImage(bytes(buffer), width, height, 4 * width,
+                       QImage.Format_ARGB32)
+        self._image = image.copy()  # Don't depend on the buffer lifetime
+
+    def update_block(self, block):
+        """
+        Re-renders only the cells of `block` (e.g. after its visibility
+        changed) and repaints the corresponding part of the widget
+        """
+        if self._image is None or not block.positions:
+            return
+
+        pixel = self._block_pixel(block)
+
+        for x, y in block.positions:
+            self._image.setPixel(x, y, pixel)
+
+        xs = [x for x, _ in block.positions]
+        ys = [y for _, y in block.positions]
+
+        cells = QRectF(min(xs), min(ys),
+                       max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        self.update(self._to_widget(cells).toAlignedRect())
+
+    def _scale(self):
+        """
+        Returns the size of one cell in widget pixels
+        """
+        fit = min(self.width() / self.model.width,
+                  self.height() / self.model.height)
+
+        return fit * self._zoom
 
-        device = painter.device()
+    def _to_widget(self, cells):
+        """
+        Maps a QRectF in cell coordinates to widget coordinates
+        """
+        scale = self._scale()
 
-        optimal_vertical_tile_size = device.height() // self.model.height
-        optimal_horizontal_tile_size = device.width() // self.model.width
+        return QRectF(self._offset.x() + cells.x() * scale,
+                      self._offset.y() + cells.y() * scale,
+                      cells.width() * scale, cells.height() * scale)
 
-        tile_size = min(optimal_vertical_tile_size,
-                        optimal_horizontal_tile_size)
+    def paintEvent(self, event):
+        """
+        Paints the widget contents
+        """
+        if self._image is None:
+            return
 
-        brush = QBrush()
-        brush.setStyle(Qt.SolidPattern)
+        scale = self._scale()
 
-        for pos in self.model.all_positions():
-            block = self.model.state[pos]
+        if scale <= 0:
+            return
 
-            if block is Block.EMPTY:
-                continue
-            if not block.visible:
-                continue
+        # Only blit the cells in the exposed area
+        exposed = event.rect()
 
-            r, g, b = block.color
-            q_color = QColor(r, g, b)
-            brush.setColor(q_color)
+        left = max(int((exposed.left() - self._offset.x()) // scale), 0)
+        top = max(int((exposed.top() - self._offset.y()) // scale), 0)
+        right = min(int((exposed.right() - self._offset.x()) // scale) + 1,
+                    self.model.width)
+        bottom = min(int((exposed.bottom() - self._offset.y()) // scale) + 1,
+                     self.model.height)
 
-            x, y = pos
-            canvas_x = self.START_X + tile_size * x
-            canvas_y = self.START_Y + tile_size * y
+        if left >= right or top >= bottom:
+            return
 
-            rect = QRect(canvas_x, canvas_y, tile_size, tile_size)
-            painter.fillRect(rect, brush)
+        source = QRectF(left, top, right - left, bottom - top)
 
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        painter.drawImage(self._to_widget(source), self._image, source)
         painter.end()
+
+    # pylint: disable=invalid-name
+    def wheelEvent(self, event):
+        """
+        Zooms in/out around the cursor
+        """
+        if self._image is None:
+            return
+
+        steps = event.angleDelta().y() / 120
+        new_zoom = self._zoom * self.ZOOM_STEP ** steps
+        new_zoom = min(max(new_zoom, 1.0), self.MAX_ZOOM)
+
+        # Keep the point under the cursor in place
+        cursor = QPointF(event.pos())
+        ratio = new_zoom / self._zoom
+        self._offset = cursor - (cursor - self._offset) * ratio
+        self._zoom = new_zoom
+
+        self.update()
+
+    def mousePressEvent(self, event):
+        """
+        Starts panning
+        """
+        if event.button() == Qt.LeftButton:
+            self._drag_start = QPointF(event.pos()) - self._offset
+
+    def mouseMoveEvent(self, event):
+        """
+        Pans the view
+        """
+        if self._drag_start is not None:
+            self._offset = QPointF(event.pos()) - self._drag_start
+            self.update()
+
+    def mouseReleaseEvent(self, event):
+        """
+        Stops panning
+        """
+        if event.button() == Qt.LeftButton:
+            self._drag_start = None
+
+    def mouseDoubleClickEvent(self, _):
+        """
+        Resets zoom and pan
+        """
+        self._zoom = 1.0
+        self._offset = QPointF(self.START_X, self.START_Y)
+        self.update()
@@ -0,0 +1,138 @@
+"""
+This module converts covering models to and from plain (JSON-compatible)
+dictionaries, so that coverings can be sent between processes or stored.
+"""
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+from pycovering.constraints import PathConstraintWatcher, \
+                                   PlanarConstraintWatcher
+
+
+CONSTRAINTS = {
+    "path": PathConstraintWatcher,
+    "planar": PlanarConstraintWatcher
+}
+
+
+class InvalidModelDataException(Exception):
+    """
+    This exception is raised if a model can not be created
+    from the given data
+    """
+
+
+def constraint_names(model):
+    """
+    Returns names of all model constraints (keys of `CONSTRAINTS`)
+    """
+    names = []
+
+    for watcher in model.constraint_watchers:
+        for name, cls in CONSTRAINTS.items():
+            if cls is watcher:
+                names.append(name)
+                break
+        else:
+            raise InvalidModelDataException(
+                f"Constraint {watcher.__name__} can not be serialized")
+
+    return names
+
+
+def model_params(model):
+    """
+    Returns a dict of parameters needed to create
+    an (empty) model equivalent to `model`
+    """
+    params = {
+        "min_block_size": model.min_block_size,
+        "max_block_size": model.max_block_size,
+        "constraints": constraint_names(model)
+    }
+
+    if isinstance(model, TwoDCoveringModel):
+        params.update(model="2d", width=model.width, height=model.height)
+    elif isinstance(model, PyramidCoveringModel):
+        params.update(model="pyramid", size=model.size)
+    else:
+        raise InvalidModelDataException("Unknown model type")
+
+    return params
+
+
+def model_from_params(params, verbosity=0):
+    """
+    Creates a new empty model from a dict returned by `model_params`
+    """
+    try:
+        model_type = params["model"]
+        min_size = int(params["min_block_size"])
+        max_size = int(params["max_block_size"])
+
+        if min_size <= 0 or max_size < min_size:
+            raise InvalidModelDataException("Invalid block sizes")
+
+        if model_type == "2d":
+            width, height = int(params["width"]), int(params["height"])
+            if width <= 0 or height <= 0:
+                raise InvalidModelDataException("Invalid dimensions")
+            model = TwoDCoveringModel(width, height, min_size, max_size,
+                                      verbosity)
+        elif model_type == "pyramid":
+            size = int(params["size"])
+            if size <= 0:
+                raise InvalidModelDataException("Invalid size")
+            model = PyramidCoveringModel(size, min_size, max_size,
+                                         verbosity)
+        else:
+            raise InvalidModelDataException(
+                f"Unknown model type '{model_type}'")
+
+        for name in params.get("constraints", []):
+            model.add_constraint(CONSTRAINTS[name])
+
+    except (KeyError, TypeError, ValueError) as exc:
+        raise InvalidModelDataException(f"Invalid model data: {exc}") from exc
+
+    return model
+
+
+def model_to_dict(model):
+    """
+    Returns a dict containing model parameters as well as all
+    its blocks (positions, colors and visibility)
+    """
+    data = model_params(model)
+
+    data["blocks"] = [
+        {
+            "positions": [list(pos) for pos in block.positions],
+            "color": list(block.color),
+            "visible": block.visible
+        }
+        for block in model.blocks
+    ]
+
+    return data
+
+
+def model_from_dict(data, verbosity=0):
+    """
+    Recreates a model (including its blocks) from a dict
+    returned by `model_to_dict`
+    """
+    model = model_from_params(data, verbosity)
+
+    try:
+        for block_data in data["blocks"]:
+            positions = [tuple(pos) for pos in block_data["positions"]]
+            model.add_block(positions)
+
+            block = model.blocks[-1]
+            block.color = tuple(block_data["color"])
+            block.visible = block_data.get("visible", True)
+
+    except (KeyError, TypeError, ValueError, IndexError) as exc:
+        raise InvalidModelDataException(f"Invalid block data: {exc}") from exc
+
+    return model
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+
+"""
+A local covering server.
+
+The server keeps a pool of pre-forked worker processes, each of them
+with already imported modules and already constructed (warm) models,
+so that a covering request doesn't have to pay the program startup.
+
+Requests are JSON objects POSTed to `/cover`, containing model parameters
+(see `pycovering.serialization.model_params`) and optionally a `timeout`
+in seconds. The response is a JSON object with a `status` ("ok", "failed",
+"timeout" or "invalid") and, if successful, the serialized `covering`.
+"""
+
+import argparse
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Pool, TimeoutError as PoolTimeoutError
+
+from pycovering.models import ImpossibleToFinishException, \
+                              CoveringTimeoutException, \
+                              CoveringStoppedException
+
+from pycovering.serialization import model_from_params, model_to_dict, \
+                                     InvalidModelDataException
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8642
+DEFAULT_TIMEOUT = 60
+
+# How much longer than the covering timeout do we wait for the worker
+# (serialization, queueing...)
+TIMEOUT_GRACE = 5
+
+# Models created with these parameters are built in every worker on startup
+WARM_MODELS = [
+    {"model": "2d", "width": 10, "height": 10,
+     "min_block_size": 4, "max_block_size": 4},
+    {"model": "pyramid", "size": 4,
+     "min_block_size": 4, "max_block_size": 4},
+]
+
+MODEL_CACHE_SIZE = 16
+
+MODEL_KEYS = ("model", "width", "height", "size",
+              "min_block_size", "max_block_size", "constraints")
+
+
+# Worker side
+
+_MODELS = OrderedDict()
+
+
+def _model_key(params):
+    return json.dumps({key: params.get(key) for key in MODEL_KEYS},
+                      sort_keys=True)
+
+
+def _get_model(params):
+    """
+    Returns a cached model for given parameters (creates it if needed)
+    """
+    key = _model_key(params)
+
+    model = _MODELS.get(key)
+
+    if model is None:
+        model = model_from_params(params)
+        _MODELS[key] = model
+
+        if len(_MODELS) > MODEL_CACHE_SIZE:
+            _MODELS.popitem(last=False)
+    else:
+        _MODELS.move_to_end(key)
+
+    return model
+
+
+def _warm_up(warm_models):
+    """
+    Worker initializer, builds the most common models in advance
+    """
+    for params in warm_models:
+        _get_model(params)
+
+
+def cover(request):
+    """
+    Covers a model described by `request`, returns a response dict.
+
+    This is run in the worker processes.
+    """
+    try:
+        model = _get_model(request)
+        timeout = float(request.get("timeout") or DEFAULT_TIMEOUT)
+    except (InvalidModelDataException, TypeError, ValueError) as exc:
+        return {"status": "invalid", "error": str(exc)}
+
+    timer = threading.Timer(timeout, model.stop_covering)
+    timer.start()
+
+    try:
+        model.reset()
+        model.try_cover()
+    except CoveringStoppedException:
+        return {"status": "timeout"}
+    except (ImpossibleToFinishException, CoveringTimeoutException):
+        return {"status": "failed"}
+    finally:
+        timer.cancel()
+
+    return {"status": "ok", "covering": model_to_dict(model)}
+
+
+# Server side
+
+class CoveringRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handles HTTP covering requests, passes them to the worker pool
+    """
+    # The name is given by BaseHTTPRequestHandler
+    # pylint: disable=invalid-name
+    def do_POST(self):
+        """
+        Handles a POST request
+        """
+        if self.path != "/cover":
+            self._send_json(404, {"status": "invalid",
+                                  "error": "Unknown path"})
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+
+            timeout = float(request.get("timeout") or
+                            self.server.default_timeout)
+        except ValueError as exc:
+            self._send_json(400, {"status": "invalid", "error": str(exc)})
+            return
+
+        request["timeout"] = timeout
+        result = self.server.pool.apply_async(cover, (request,))
+
+        try:
+            response = result.get(timeout + TIMEOUT_GRACE)
+        except PoolTimeoutError:
+            response = {"status": "timeout"}
+
+        code = 400 if response["status"] == "invalid" else 200
+        self._send_json(code, response)
+
+    def _send_json(self, code, data):
+        body = json.dumps(data).encode()
+
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # pylint: disable=redefined-builtin
+    def log_message(self, format, *args):
+        if self.server.verbosity >= 1:
+            super().log_message(format, *args)
+
+
+class CoveringServer(ThreadingHTTPServer):
+    """
+    HTTP server owning the pool of covering workers
+    """
+    daemon_threads = True
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, address, workers=None, default_timeout=DEFAULT_TIMEOUT,
+                 warm_models=None, verbosity=0):
+        if warm_models is None:
+            warm_models = WARM_MODELS
+
+        self.default_timeout = default_timeout
+        self.verbosity = verbosity
+        # The pool lives as long as the server, see `server_close`
+        # pylint: disable=consider-using-with
+        self.pool = Pool(workers, initializer=_warm_up,
+                         initargs=(warm_models,))
+
+        super().__init__(address, CoveringRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+
+        self.pool.terminate()
+        self.pool.join()
+
+
+# Client side
+
+def request_covering(url, params, timeout=None):
+    """
+    Sends a covering request to a running server at `url`,
+    returns the response dict
+    """
+    request = dict(params)
+    request["timeout"] = timeout
+
+    data = json.dumps(request).encode()
+    http_request = urllib.request.Request(
+        url.rstrip("/") + "/cover", data=data,
+        headers={"Content-Type": "application/json"})
+
+    wait = (timeout or DEFAULT_TIMEOUT) + TIMEOUT_GRACE
+
+    try:
+        with urllib.request.urlopen(http_request, timeout=wait) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as exc:
+        # Invalid requests still carry a JSON body
+        return json.loads(exc.read())
+
+
+def get_parser():
+    """
+    Return a configured parser
+    """
+    parser = argparse.ArgumentParser(description="pyCovering server")
+
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HOST,
+        help="The address to listen on"
+    )
+
+    parser.add_argument(
+        "--port",
+        "-p",
+        type=int,
+        default=DEFAULT_PORT,
+        help="The port to listen on"
+    )
+
+    parser.add_argument(
+        "--workers",
+        "-w",
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes"
+    )
+
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="Covering timeout (seconds) for requests that don't set one"
+    )
+
+    parser.add_argument(
+        "--verbose",
+        "-v",
+        action="count",
+        default=0,
+        help="Be more verbose"
+    )
+
+    return parser
+
+
+def main():
+    """
+    The server entrypoint
+    """
+    parser = get_parser()
+    args = parser.parse_args()
+
+    if args.workers is not None and args.workers <= 0:
+        parser.error("Number of workers must be positive")
+
+    server = CoveringServer((args.host, args.port), args.workers,
+                            args.timeout, verbosity=args.verbose)
+
+    print(f"Listening on http://{args.host}:{args.port}", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+This module enumerates all possible block shapes in the plane
+(fixed polyominoes, i.e. rotated or mirrored shapes are different)
+or in the lattice of the pyramid model.
+
+A shape is a tuple of (dx, dy) offsets sorted by (dy, dx), normalized so
+that its first position is (0, 0). Placing the first position of a shape
+to the first empty position of a (row by row filled) rectangle therefore
+never collides with already filled positions. Shapes in the pyramid are
+(dx, dy, dz) offsets sorted by (dz, dy, dx), the order the pyramid model
+fills its positions in.
+"""
+
+# Offsets of the neighbors of a position in the pyramid model
+PYRAMID_OFFSETS = (
+    # Same level
+    (0, 1, 0), (1, 0, 0), (1, -1, 0), (0, -1, 0), (-1, 0, 0), (-1, 1, 0),
+    # Above
+    (0, -1, 1), (-1, 0, 1), (0, 0, 1),
+    # Below
+    (0, 0, -1), (1, 0, -1), (0, 1, -1)
+)
+
+
+def grid_neighbors(pos):
+    """
+    Returns the four neighbors of `pos` in an unbounded grid
+    """
+    x, y = pos
+
+    return [(x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)]
+
+
+def pyramid_neighbors(pos):
+    """
+    Returns the twelve neighbors of `pos` in an unbounded pyramid lattice
+    """
+    x, y, z = pos
+
+    return [(x + dx, y + dy, z + dz) for dx, dy, dz in PYRAMID_OFFSETS]
+
+
+def normalize(positions):
+    """
+    Returns the shape of a block consisting of `positions`
+    """
+    ordered = sorted(positions, key=lambda pos: pos[::-1])
+    first = ordered[0]
+
+    return tuple(tuple(coord - first_coord
+                       for coord, first_coord in zip(pos, first))
+                 for pos in ordered)
+
+
+def grow(current, neighbors=grid_neighbors):
+    """
+    Returns the set of all shapes made by adding a neighboring position
+    to one of the shapes in `current`
+    """
+    grown = set()
+
+    for shape in current:
+        occupied = set(shape)
+
+        for pos in shape:
+            for nbr in neighbors(pos):
+                if nbr not in occupied:
+                    grown.add(normalize(occupied | {nbr}))
+
+    return grown
+
+
+def is_valid_shape(shape, constraints, neighbors=grid_neighbors):
+    """
+    Returns True if `shape` satisfies all `constraints`
+    """
+    return all(constraint.is_valid_block(shape, neighbors)
+               for constraint in constraints)
+
+
+def shapes(min_size, max_size, constraints=(), neighbors=grid_neighbors):
+    """
+    Returns a list of all shapes with size between `min_size` and
+    `max_size` (inclusive) satisfying all `constraints` (constraint
+    watcher classes, see `GeneralConstraintWatcher.is_valid_block`),
+    `neighbors` is `grid_neighbors` or `pyramid_neighbors`
+    """
+    result = []
+    dimensions = 2 if neighbors is grid_neighbors else 3
+    current = {((0,) * dimensions,)}
+
+    for size in range(1, max_size + 1):
+        if size >= min_size:
+            for shape in sorted(current):
+                if is_valid_shape(shape, constraints, neighbors):
+                    result.append(shape)
+
+        if size == max_size:
+            break
+
+        # Grow all shapes by one position
+        current = grow(current, neighbors)
+
+    return result
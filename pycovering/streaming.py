@@ -0,0 +1,174 @@
+"""
+Streaming covering of long strips.
+
+Only a window of rows is kept in memory. Once the window is covered,
+its first `rows` rows are written to the output and never change again,
+blocks reaching from them below are carried (fixed) into the next window
+and all other blocks are dropped and covered again. The next window
+starts right below the written rows, so memory stays constant regardless
+of the strip height.
+
+The written rows are `rows` x width rectangles. If their area can be
+covered, the rest of each window can be covered as well (the dropped
+blocks plus a covering of the new rows), so the covering never has to
+return to rows already written.
+"""
+
+from pycovering.models import CoveringStoppedException, \
+                              ImpossibleToFinishException
+from pycovering.partition import cover_with_timeout, is_coverable_area
+from pycovering.serialization import model_from_params
+
+
+# Number of rows written at once (at least the maximal block size)
+STREAM_ROWS = 16
+
+# Windows are covered again with a new seed after WINDOW_TIMEOUT seconds,
+# the timeout doubles with every attempt
+WINDOW_TIMEOUT = 0.5
+WINDOW_ATTEMPTS = 8
+
+
+def stream_rows(width, min_size, max_size, rows=STREAM_ROWS):
+    """
+    Returns the number of rows written at once for a strip of `width`,
+    the least number of rows not smaller than `rows` and the maximal
+    block size, whose area is a sum of block sizes
+    """
+    rows = max(rows, max_size)
+
+    while not is_coverable_area(width * rows, min_size, max_size):
+        rows += 1
+
+    return rows
+
+
+class StripStreamer:
+    """
+    Covers a strip described by model parameters (see
+    `pycovering.serialization.model_params`, the model must be "2d")
+    window by window, `covering_rows` returns the finished rows
+    """
+    def __init__(self, params, rows=STREAM_ROWS):
+        self.params = params
+        self.width = int(params["width"])
+        self.height = int(params["height"])
+
+        self.rows = stream_rows(self.width, int(params["min_block_size"]),
+                                int(params["max_block_size"]), rows)
+
+        self.blocks = 0  # Number of blocks in the finished rows
+
+        self._model = None
+        # (block number, positions relative to the window)
+        self._carried = []
+
+    def _get_model(self, height):
+        if self._model is None or self._model.height != height:
+            self._model = model_from_params(dict(self.params, height=height))
+
+        return self._model
+
+    def _cover_window(self, height):
+        model = self._get_model(height)
+
+        for attempt in range(WINDOW_ATTEMPTS):
+            model.reset()
+
+            # The Coverer leaves the carried blocks in place
+            for _, positions in self._carried:
+                model.add_block(positions)
+
+            try:
+                cover_with_timeout(model, WINDOW_TIMEOUT * 2 ** attempt)
+            except (ImpossibleToFinishException, CoveringStoppedException):
+                continue
+
+            return model
+
+        raise ImpossibleToFinishException
+
+    def _finish_rows(self, model, rows):
+        """
+        Returns the first `rows` rows of `model` as lists of block numbers
+        and carries blocks reaching below them into the next window
+        """
+        numbers = {}
+
+        for block, (number, _) in zip(model.blocks, self._carried):
+            numbers[id(block)] = number
+
+        started = [block for block in model.blocks[len(self._carried):]
+                   if min(y for _, y in block.positions) < rows]
+        started.sort(key=lambda block: min((y, x)
+                                           for x, y in block.positions))
+
+        for block in started:
+            self.blocks += 1
+            numbers[id(block)] = self.blocks
+
+        data = model.state.raw_data()
+        result = [[numbers[id(block)] for block in data[y]]
+                  for y in range(rows)]
+
+        # Only the part of a block below the finished rows is carried
+        self._carried = []
+
+        for block in model.blocks:
+            if id(block) not in numbers:
+                continue
+
+            rest = [(x, y - rows) for x, y in block.positions if y >= rows]
+
+            if rest:
+                self._carried.append((numbers[id(block)], rest))
+
+        return result
+
+    def covering_rows(self):
+        """
+        Covers the strip, returns an iterator of its rows (lists of block
+        numbers, starting with 1), each row is returned once it is final
+
+        Raises `ImpossibleToFinishException` if a window can't be covered.
+        """
+        self.blocks = 0
+        self._carried = []
+        start = 0
+
+        while start < self.height:
+            height = min(self.height - start, 2 * self.rows)
+            last = start + height == self.height
+
+            model = self._cover_window(height)
+            rows = height if last else self.rows
+
+            yield from self._finish_rows(model, rows)
+
+            start += rows
+
+
+def stream_covering(params, out, rows=STREAM_ROWS):
+    """
+    Covers a strip described by model parameters and writes the rows
+    of block numbers into the text file `out` as soon as they are final
+    """
+    streamer = StripStreamer(params, rows)
+
+    max_blocks = streamer.width * streamer.height // \
+        int(params["min_block_size"])
+    width = len(str(max_blocks)) + 1
+
+    chunk = []
+
+    for row in streamer.covering_rows():
+        chunk.append("".join(str(number).center(width) for number in row))
+
+        if len(chunk) == streamer.rows:
+            out.write("\n".join(chunk) + "\n")
+            out.flush()
+            chunk.clear()
+
+    if chunk:
+        out.write("\n".join(chunk) + "\n")
+        out.flush()
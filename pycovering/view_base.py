@@ -0,0 +1,31 @@
+"""
+This module contains the base class of all views, shared by the text
+views (`pycovering.views`) and the visual ones (`pycovering.visual_views`)
+"""
+
+
+class GeneralView:
+    """
+    An abstract class from which all views should inherit
+    """
+    def show(self, model):
+        """
+        Show model data using the view
+        """
+        raise NotImplementedError
+
+    # pylint: disable=unused-argument
+    def update_block(self, model, block):
+        """
+        Updates the view after a change of one block (e.g. its visibility)
+
+        Shows the whole model again by default
+        """
+        self.show(model)
+
+    def close(self):
+        """
+        Closes the view window, if any
+
+        Doesn't do anything by default
+        """
@@ -1,190 +1,135 @@
 """
 This module contains various views for all covering models
-"""
 
-from math import sqrt
-from multiprocessing import Process, Queue
-from PySide2.QtWidgets import QDialog
+Only text views are defined here, so that importing this module doesn't
+load Qt or VPython. Visual views live in `pycovering.visual_views`,
+they are still accessible from this module (imported on first access).
+The base class `GeneralView` is in `pycovering.view_base`, so that visual
+views don't import this module back.
+"""
 
-import vpython as vp
+import io
+import sys
 
 from pycovering.models import Block
-from pycovering.qt_gui.ui_two_d_visual_dialog import Ui_Dialog
+from pycovering.view_base import GeneralView
 
 
-class GeneralView:
+class PrintView(GeneralView):
     """
-    An abstract class from which all views should inherit
+    An abstract class for views printing the covering as text
+
+    The text is produced line by line (see `lines`) and written
+    in chunks, so that the whole output never has to be kept in memory.
     """
-    def show(self, model):
+    CHUNK_LINES = 256
+
+    def lines(self, model):
         """
-        Show model data using the view
+        Returns an iterator of output lines (without line endings)
         """
         raise NotImplementedError
 
-    def close(self):
+    def render(self, model, out):
         """
-        Closes the view window, if any
-
-        Doesn't do anything by default
+        Writes the covering into `out`, which can be either a text
+        or a binary file (or buffer)
         """
+        binary = isinstance(out, (io.RawIOBase, io.BufferedIOBase))
+        chunk = []
 
+        for line in self.lines(model):
+            chunk.append(line)
+
+            if len(chunk) == self.CHUNK_LINES:
+                self._write_chunk(chunk, out, binary)
+                chunk.clear()
+
+        if chunk:
+            self._write_chunk(chunk, out, binary)
+
+    @staticmethod
+    def _write_chunk(chunk, out, binary):
+        text = "\n".join(chunk) + "\n"
+        out.write(text.encode() if binary else text)
 
-class TwoDPrintView(GeneralView):
-    """
-    A view for TwoDCoveringModel, prints the resulting
-    covering in console
-    """
     def show(self, model):
-        data = model.state.raw_data()
+        # Write directly into the binary buffer, if there is one
+        out = getattr(sys.stdout, "buffer", None)
 
-        vals = [x.number for row in data for x in row]
-        longest = max(vals)
-        max_len = len(str(longest))
-        width = max_len + 1
+        if out is None:
+            self.render(model, sys.stdout)
+            return
 
-        for row in data:
-            p_row = "".join([(str(x.number) if x.visible else "")
-                             .center(width) for x in row])
-            print(p_row)
+        sys.stdout.flush()
+        self.render(model, out)
+        out.flush()
+
+    @staticmethod
+    def _max_len(model):
+        """
+        Returns the length of the longest block number
+        """
+        if not model.blocks:
+            return len(str(Block.EMPTY.number))
 
+        return len(str(model.blocks[-1].number))
 
-class TwoDVisualView(QDialog, Ui_Dialog):
+    @staticmethod
+    def _row(blocks, width):
+        return "".join([(str(x.number) if x.visible else "").center(width)
+                        for x in blocks])
+
+
+class TwoDPrintView(PrintView):
     """
-    A view for TwoDCoveringModel, shows the resulting
-    covering visually in a QDialog
+    A view for TwoDCoveringModel, prints the resulting
+    covering in console
     """
-    def __init__(self, parent=None):
-        super().__init__(parent)
-
-        self.setupUi(self)
+    def lines(self, model):
+        data = model.state.raw_data()
+        width = self._max_len(model) + 1
 
-    def show(self, model):
-        self.widget.show(model)
-        QDialog.show(self)
+        for row in data:
+            yield self._row(row, width)
 
 
-class PyramidPrintView(GeneralView):
+class PyramidPrintView(PrintView):
     """
     A view for PyramidCoveringModel, prints the resulting
     covering in console
     """
-    @staticmethod
-    def _max_len(data):
-        vals = [x.number for layer in data for row in layer for x in row
-                if x is not Block.EMPTY]
-        longest = max(vals)
-        max_len = len(str(longest))
-        return max_len
-
-    def show(self, model):
-        def show_layer(layer_data, offset):
-            # The order is not neccessarily correct
-            layer_size = len(layer_data)
-            for i, row in enumerate(layer_data):
-                row_data = row[:layer_size-i]
-                print(i * offset * " ", end="")
-                row = "".join([(str(x.number) if x.visible else "")
-                               .center(width) for x in row_data])
-                print(row)
-
+    def lines(self, model):
         data = model.state.raw_data()
-        max_len = PyramidPrintView._max_len(data)
+        max_len = self._max_len(model)
 
         width = max_len + 1 if (max_len % 2 == 1) else max_len + 2
         offset = width // 2
         data_size = len(data)
 
         for i, layer in enumerate(data):
-            print(f"\nLayer {i + 1}\n")
-            layer_data = layer[:data_size-i]
-            show_layer(layer_data, offset)
-
-
-class PyramidVisualView(GeneralView):
-    """
-    A view for PyramidCoveringModel, shows the resulting
-    covering in a browser window as a simple 3d visualization
-    """
-    RADIUS = 1
-
-    def __init__(self):
-        self.spheres = []
+            yield ""
+            yield f"Layer {i + 1}"
+            yield ""
 
-        self.process = None
-        self.queue = Queue()
-
-    @staticmethod
-    def _to_vpython_color(color):
-        """
-        Converts (0-255, 0-255, 0-255) -> Vector(0-1, 0-1, 0-1)
-        """
-        r, g, b = color
-
-        return vp.vec(r / 255, g / 255, b / 255)
-
-    @staticmethod
-    def _real_coords(pos):
-        x, y, z = pos
+            # The order is not neccessarily correct
+            layer_size = data_size - i
 
-        real_z = sqrt(8/3) * PyramidVisualView.RADIUS * z
+            for j, row in enumerate(layer[:layer_size]):
+                row_data = row[:layer_size - j]
+                yield j * offset * " " + self._row(row_data, width)
 
-        # Layer offset
-        real_y_start = (sqrt(3) / 3) * PyramidVisualView.RADIUS * z
-        real_y = real_y_start + sqrt(3) * PyramidVisualView.RADIUS * y
 
-        real_x_start = PyramidVisualView.RADIUS * (y + z)
-        real_x = real_x_start + 2 * x * PyramidVisualView.RADIUS
+VISUAL_VIEWS = ("TwoDVisualView", "PyramidVisualView")
 
-        return vp.vec(real_x, real_y, real_z)
 
-    def reset(self):
-        """
-        Hides and deletes all already shown spheres
-        """
-        while self.spheres:
-            sphere = self.spheres.pop()
-            sphere.visible = False
+def __getattr__(name):
+    """
+    Imports visual views lazily
+    """
+    if name in VISUAL_VIEWS:
+        # pylint: disable=import-outside-toplevel
+        from pycovering import visual_views
+        return getattr(visual_views, name)
 
-    def show(self, model):
-        if self.process is None:
-            self.process = Process(
-                target=self._show_process,
-                args=(self.queue,))
-            self.process.start()
-
-        self.queue.put(model)
-
-    def _show_process(self, queue):
-        try:
-            while True:
-                if not queue.empty():
-                    last = queue.get()
-                    self._update(last)
-        except BrokenPipeError:
-            # Vpython raises this, can be ignored
-            pass
-
-    def _update(self, model):
-        self.reset()
-
-        for pos in model.all_positions():
-            block = model.state[pos]
-
-            if block is None or not block.visible:
-                continue
-
-            vp_color = self._to_vpython_color(block.color)
-
-            rpos = PyramidVisualView._real_coords(pos)
-            self.spheres.append(vp.sphere(
-                pos=rpos,
-                radius=PyramidVisualView.RADIUS,
-                color=vp_color,
-                opacity=0.8))
-
-    def close(self):
-        if self.process is not None:
-            self.process.terminate()
-
-        self.process = None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
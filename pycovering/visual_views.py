@@ -0,0 +1,252 @@
+"""
+Visual views of covering models, showing the covering in a Qt dialog
+or in a VPython (browser) scene
+
+This module imports PySide2 and VPython, so it should only be imported
+when a visual view is actually needed.
+"""
+
+from functools import lru_cache
+from math import sqrt
+from multiprocessing import Process, Queue
+from queue import Empty
+from PySide2.QtWidgets import QDialog
+
+import vpython as vp
+
+from pycovering.view_base import GeneralView
+from pycovering.qt_gui.ui_two_d_visual_dialog import Ui_Dialog
+
+
+class TwoDVisualView(QDialog, Ui_Dialog):
+    """
+    A view for TwoDCoveringModel, shows the resulting
+    covering visually in a QDialog
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.setupUi(self)
+
+    def show(self, model):
+        self.widget.show(model)
+        QDialog.show(self)
+
+    # pylint: disable=unused-argument
+    def update_block(self, model, block):
+        """
+        Repaints only the cells of `block`
+        """
+        self.widget.update_block(block)
+
+
+class PyramidVisualView(GeneralView):
+    """
+    A view for PyramidCoveringModel, shows the resulting
+    covering in a browser window as a simple 3d visualization
+
+    The visualization runs in a separate process, which only receives
+    compact snapshots of the covering (position -> block number and
+    block number -> color), or just the changed colors if the covering
+    itself did not change.
+    """
+    RADIUS = 1
+
+    def __init__(self):
+        # Position -> sphere, and position -> shown color (None if hidden),
+        # both only used in the visualization process
+        self.spheres = {}
+        self._sphere_colors = {}
+
+        # Block number -> its positions
+        self._block_cells = {}
+
+        self.process = None
+        self.queue = Queue()
+
+        # The last snapshot sent to the process
+        self._sent_cells = None
+        self._sent_colors = None
+
+    @staticmethod
+    def _to_vpython_color(color):
+        """
+        Converts (0-255, 0-255, 0-255) -> Vector(0-1, 0-1, 0-1)
+        """
+        r, g, b = color
+
+        return vp.vec(r / 255, g / 255, b / 255)
+
+    @staticmethod
+    def _real_coords(pos):
+        return vp.vec(*PyramidVisualView._real_xyz(pos))
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _real_xyz(pos):
+        x, y, z = pos
+
+        real_z = sqrt(8/3) * PyramidVisualView.RADIUS * z
+
+        # Layer offset
+        real_y_start = (sqrt(3) / 3) * PyramidVisualView.RADIUS * z
+        real_y = real_y_start + sqrt(3) * PyramidVisualView.RADIUS * y
+
+        real_x_start = PyramidVisualView.RADIUS * (y + z)
+        real_x = real_x_start + 2 * x * PyramidVisualView.RADIUS
+
+        return (real_x, real_y, real_z)
+
+    @staticmethod
+    def snapshot(model):
+        """
+        Returns a compact snapshot of the model as a tuple
+        (position -> block number, block number -> color),
+        where color is None for hidden blocks
+        """
+        cells = {pos: block.number
+                 for block in model.blocks for pos in block.positions}
+        colors = {block.number: (block.color if block.visible else None)
+                  for block in model.blocks}
+
+        return cells, colors
+
+    def reset(self):
+        """
+        Hides and deletes all already shown spheres
+        """
+        for sphere in self.spheres.values():
+            sphere.visible = False
+
+        self.spheres.clear()
+        self._sphere_colors.clear()
+        self._block_cells.clear()
+
+    def show(self, model):
+        if self.process is None:
+            self.process = Process(
+                target=self._show_process,
+                args=(self.queue,))
+            self.process.start()
+
+        cells, colors = self.snapshot(model)
+
+        if cells == self._sent_cells:
+            # The same covering, send only what changed
+            changed = {number: color for number, color in colors.items()
+                       if self._sent_colors.get(number) != color}
+
+            if changed:
+                self.queue.put(("colors", changed))
+        else:
+            self.queue.put(("covering", cells, colors))
+
+        self._sent_cells = cells
+        self._sent_colors = colors
+
+    def update_block(self, model, block):
+        if self.process is None or self._sent_colors is None:
+            self.show(model)
+            return
+
+        color = block.color if block.visible else None
+
+        if self._sent_colors.get(block.number) != color:
+            self._sent_colors[block.number] = color
+            self.queue.put(("colors", {block.number: color}))
+
+    def _show_process(self, queue):
+        cells = {}
+        colors = {}
+
+        try:
+            while True:
+                # Block until there is an update...
+                messages = [queue.get()]
+
+                # ...and then apply all updates that have arrived
+                # in the meantime at once
+                while True:
+                    try:
+                        messages.append(queue.get_nowait())
+                    except Empty:
+                        break
+
+                replaced = False
+                changed_blocks = set()
+
+                for message in messages:
+                    if message[0] == "covering":
+                        _, cells, colors = message
+                        replaced = True
+                    else:
+                        _, changed = message
+                        colors.update(changed)
+                        changed_blocks.update(changed)
+
+                if replaced:
+                    self._update(cells, colors)
+                else:
+                    self._update_blocks(changed_blocks, colors)
+        except BrokenPipeError:
+            # Vpython raises this, can be ignored
+            pass
+
+    def _update(self, cells, colors):
+        """
+        Shows a new covering, reusing the existing spheres
+        """
+        self._block_cells = {}
+
+        for pos, number in cells.items():
+            self._block_cells.setdefault(number, []).append(pos)
+
+        for pos in self.spheres.keys() - cells.keys():
+            self._set_sphere(pos, None)
+
+        for pos, number in cells.items():
+            self._set_sphere(pos, colors.get(number))
+
+    def _update_blocks(self, numbers, colors):
+        """
+        Updates only spheres of blocks with given numbers
+        """
+        for number in numbers:
+            for pos in self._block_cells.get(number, ()):
+                self._set_sphere(pos, colors.get(number))
+
+    def _set_sphere(self, pos, color):
+        """
+        Shows the sphere at `pos` with `color` (or hides it if color
+        is None), touching the scene only if something changed
+        """
+        if self._sphere_colors.get(pos) == color:
+            return
+
+        self._sphere_colors[pos] = color
+        sphere = self.spheres.get(pos)
+
+        if color is None:
+            if sphere is not None:
+                sphere.visible = False
+            return
+
+        vp_color = self._to_vpython_color(color)
+
+        if sphere is None:
+            self.spheres[pos] = vp.sphere(
+                pos=self._real_coords(pos),
+                radius=PyramidVisualView.RADIUS,
+                color=vp_color,
+                opacity=0.8)
+        else:
+            sphere.color = vp_color
+            sphere.visible = True
+
+    def close(self):
+        if self.process is not None:
+            self.process.terminate()
+
+        self.process = None
+        self._sent_cells = None
+        self._sent_colors = None
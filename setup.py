@@ -16,6 +16,10 @@ setup(
         "PySide2",
         "wheel",
     ],
+    extras_require={
+        # Optional, a compiled covering kernel for large models
+        "kernel": ["numba"],
+    },
 
     author="Jakub Komárek",
     author_email="komaja@email.cz",
@@ -24,6 +28,7 @@ setup(
     entry_points="""
         [console_scripts]
         pycovering-cli=pycovering.main:main
+        pycovering-server=pycovering.server:main
 
         [gui_scripts]
         pycovering=pycovering.qt_gui.gui:main
@@ -0,0 +1,17 @@
+"""
+Unittests of pyCovering
+
+Shape catalogs (see `pycovering.catalog`) built by the tests are saved
+into a temporary directory instead of the user's cache.
+"""
+
+import atexit
+import tempfile
+
+from pycovering import catalog
+
+# pylint: disable=consider-using-with
+_CATALOG_DIR = tempfile.TemporaryDirectory()
+atexit.register(_CATALOG_DIR.cleanup)
+
+catalog.CATALOG_DIR = _CATALOG_DIR.name
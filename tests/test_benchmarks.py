@@ -0,0 +1,178 @@
+"""
+Performance checks of the command line program
+"""
+
+# pylint: disable=missing-function-docstring
+
+import multiprocessing
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+import unittest
+
+from pycovering.kernel import AVAILABLE
+from pycovering.models import TwoDCoveringModel, CancellationToken, \
+                              ProcessCancellationToken, \
+                              CoveringStoppedException
+from pycovering.constraints import PathConstraintWatcher
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, a text covering run usually takes about 0.2 s
+STARTUP_BUDGET = 1.5
+
+HEAVY_MODULES = ("PySide2", "vpython")
+
+# Seconds from cancelling a token to the covering stopping,
+# usually takes about 2 ms
+CANCEL_LATENCY_BUDGET = 0.05
+
+# Wall-clock budgets fail randomly on shared machines (CI), the latency
+# is only checked with PYCOVERING_BENCHMARKS=1
+CHECK_LATENCY = os.environ.get("PYCOVERING_BENCHMARKS") == "1"
+
+# Seconds a cancelled covering may take to stop without the latency check
+STOP_TIMEOUT = 60
+
+# How long the covering runs before it is cancelled (seconds), it must
+# not finish by then
+CANCEL_AFTER = 0.2
+
+
+def run_python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, check=True,
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True)
+
+
+def large_model(use_kernel):
+    model = TwoDCoveringModel(300, 300, 3, 5)
+    model.use_kernel = use_kernel
+    model.reset()
+
+    # The first kernel call compiles it (or loads it from the cache),
+    # that can't be cancelled
+    model.random_block(model.INITIAL_POSITION)
+
+    return model
+
+
+def large_blocks_model():
+    # Compiles the kernel, a block of this model may take minutes to find
+    large_model(True)
+
+    model = TwoDCoveringModel(20, 20, 40, 40)
+    model.use_kernel = True
+    model.add_constraint(PathConstraintWatcher)
+
+    return model
+
+
+def cover_until_cancelled(model, token, events):
+    """
+    Covers `model`, puts "started" and the monotonic time
+    when the covering stopped to `events`
+    """
+    events.put("started")
+
+    try:
+        model.try_cover(cancel_token=token)
+    except CoveringStoppedException:
+        events.put(time.monotonic())
+
+
+class TestCancellation(unittest.TestCase):
+    """
+    A cancelled covering must stop (within `CANCEL_LATENCY_BUDGET`
+    if `CHECK_LATENCY`)
+    """
+    def measure(self, start, token, events):
+        start()
+
+        self.assertEqual(events.get(timeout=STOP_TIMEOUT), "started")
+        time.sleep(CANCEL_AFTER)
+
+        cancelled = time.monotonic()
+        token.cancel()
+
+        latency = events.get(timeout=STOP_TIMEOUT) - cancelled
+
+        if CHECK_LATENCY:
+            self.assertLess(latency, CANCEL_LATENCY_BUDGET,
+                            f"Cancelling took {latency * 1000:.1f} ms")
+
+    def test_thread(self):
+        cases = [
+            ("python", False, lambda: large_model(False)),
+            ("kernel", True, lambda: large_model(True)),
+            ("kernel_large_blocks", True, large_blocks_model),
+        ]
+
+        for name, use_kernel, get_model in cases:
+            with self.subTest(name):
+                # Without numba the kernel cases would cover in Python
+                if use_kernel and not AVAILABLE:
+                    self.skipTest("numba is not installed")
+
+                model = get_model()
+                token = CancellationToken()
+                events = queue.Queue()
+
+                thread = threading.Thread(
+                    target=cover_until_cancelled,
+                    args=(model, token, events), daemon=True)
+
+                self.measure(thread.start, token, events)
+                thread.join()
+
+    def test_process(self):
+        token = ProcessCancellationToken()
+        events = multiprocessing.Queue()
+
+        process = multiprocessing.Process(
+            target=cover_until_cancelled,
+            args=(large_model(False), token, events))
+
+        self.measure(process.start, token, events)
+        process.join()
+
+
+class TestStartup(unittest.TestCase):
+    """
+    The text (headless) path must not load Qt or VPython
+    """
+    def test_headless_imports(self):
+        result = run_python(
+            "-c",
+            "import sys\n"
+            "import pycovering.main\n"
+            "print('\\n'.join(sys.modules))")
+
+        loaded = {name.split(".")[0] for name in result.stdout.split()}
+
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, loaded)
+
+    def test_visual_views_still_accessible(self):
+        result = run_python(
+            "-c",
+            "import pycovering.views as views\n"
+            "print(views.TwoDVisualView.__module__)")
+
+        self.assertEqual(result.stdout.strip(), "pycovering.visual_views")
+
+    def test_startup_time(self):
+        timings = []
+
+        for _ in range(3):
+            start = time.monotonic()
+            run_python("-m", "pycovering.main", "2d",
+                       "--width", "4", "--height", "4")
+            timings.append(time.monotonic() - start)
+
+        self.assertLess(min(timings), STARTUP_BUDGET,
+                        f"The text covering run took {min(timings):.2f} s")
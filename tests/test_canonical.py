@@ -0,0 +1,111 @@
+"""
+Unittest for the canonical module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import os
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+from pycovering.canonical import canonical_form, covering_hash, \
+                                 CoveringStore
+
+
+def two_d_model(blocks, width=4, height=2):
+    model = TwoDCoveringModel(width, height, 2, 4)
+
+    for block in blocks:
+        model.add_block(block)
+
+    return model
+
+
+# Two L tetrominoes and their mirror image
+L_COVERING = [[(0, 0), (1, 0), (2, 0), (0, 1)],
+              [(3, 0), (1, 1), (2, 1), (3, 1)]]
+L_MIRRORED = [[(0, 0), (0, 1), (1, 1), (2, 1)],
+              [(1, 0), (2, 0), (3, 0), (3, 1)]]
+
+I_COVERING = [[(0, 0), (1, 0), (2, 0), (3, 0)],
+              [(0, 1), (1, 1), (2, 1), (3, 1)]]
+
+
+class TestCanonicalForm(unittest.TestCase):
+    """
+    Tests for canonical forms and hashes of coverings
+    """
+    def test_mirror_image(self):
+        model = two_d_model(L_COVERING)
+        mirrored = two_d_model(L_MIRRORED)
+
+        self.assertEqual(canonical_form(model), canonical_form(mirrored))
+        self.assertEqual(covering_hash(model), covering_hash(mirrored))
+
+    def test_different_coverings(self):
+        self.assertNotEqual(covering_hash(two_d_model(L_COVERING)),
+                            covering_hash(two_d_model(I_COVERING)))
+
+    def test_block_order(self):
+        model = two_d_model(I_COVERING)
+        reversed_model = two_d_model(I_COVERING[::-1])
+
+        self.assertEqual(covering_hash(model), covering_hash(reversed_model))
+
+    def test_different_areas(self):
+        model = two_d_model([[(0, 0), (1, 0)]], 2, 1)
+        transposed = two_d_model([[(0, 0), (0, 1)]], 1, 2)
+
+        self.assertEqual(canonical_form(model), canonical_form(transposed))
+        self.assertNotEqual(covering_hash(model), covering_hash(transposed))
+
+    def test_square_rotation(self):
+        model = two_d_model([[(0, 0), (1, 0)], [(0, 1), (1, 1)]], 2, 2)
+        rotated = two_d_model([[(0, 0), (0, 1)], [(1, 0), (1, 1)]], 2, 2)
+
+        self.assertEqual(covering_hash(model), covering_hash(rotated))
+
+    @parameterized.expand([(perm,) for perm in range(24)])
+    def test_pyramid_symmetries(self, index):
+        model = PyramidCoveringModel(3, 1, 4)
+        model.add_block([(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)])
+
+        symmetry = model.symmetries()[index]
+
+        image = PyramidCoveringModel(3, 1, 4)
+        image.add_block([symmetry(pos) for pos in model.blocks[0].positions])
+
+        self.assertEqual(covering_hash(model), covering_hash(image))
+
+
+class TestCoveringStore(unittest.TestCase):
+    """
+    Tests for the CoveringStore class
+    """
+    def test_duplicates(self):
+        store = CoveringStore()
+
+        self.assertTrue(store.add(two_d_model(L_COVERING)))
+        self.assertFalse(store.add(two_d_model(L_MIRRORED)))
+        self.assertTrue(store.add(two_d_model(I_COVERING)))
+
+        self.assertEqual(len(store), 2)
+        self.assertIn(two_d_model(I_COVERING), store)
+
+    def test_index(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "index")
+
+            with CoveringStore(path) as store:
+                self.assertTrue(store.add(two_d_model(L_COVERING)))
+
+            with CoveringStore(path) as store:
+                self.assertEqual(len(store), 1)
+                self.assertFalse(store.add(two_d_model(L_MIRRORED)))
+                self.assertTrue(store.add(two_d_model(I_COVERING)))
+
+            with CoveringStore(path) as store:
+                self.assertEqual(len(store), 2)
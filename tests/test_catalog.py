@@ -0,0 +1,224 @@
+"""
+Unittest for the catalog module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from unittest import mock
+
+from parameterized import parameterized
+
+from pycovering import catalog
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel, \
+                              CancellationToken, CoveringStoppedException
+from pycovering.constraints import GeneralConstraintWatcher, \
+                                   PathConstraintWatcher, \
+                                   PlanarConstraintWatcher
+from pycovering.catalog import ShapeCatalog, prefix_tree
+from pycovering.shapes import shapes, grid_neighbors, pyramid_neighbors
+
+
+class TestShapeCatalog(unittest.TestCase):
+    """
+    Tests for building, saving and loading shape catalogs
+    """
+    def setUp(self):
+        # pylint: disable=consider-using-with
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def catalog(self, geometry, constraints):
+        return ShapeCatalog(geometry, constraints, self.directory.name)
+
+    @parameterized.expand([
+        ("grid_path", "grid", [PathConstraintWatcher], grid_neighbors, 6),
+        ("pyramid_path", "pyramid", [PathConstraintWatcher],
+         pyramid_neighbors, 4),
+        ("pyramid_planar", "pyramid", [PlanarConstraintWatcher],
+         pyramid_neighbors, 4),
+        ("pyramid_both", "pyramid",
+         [PathConstraintWatcher, PlanarConstraintWatcher],
+         pyramid_neighbors, 4),
+    ])
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def test_all_shapes(self, _, geometry, constraints, neighbors, max_size):
+        shape_catalog = self.catalog(geometry, constraints)
+
+        # Growing only the valid shapes doesn't lose any of them
+        for size in range(1, max_size + 1):
+            self.assertEqual(list(shape_catalog.shapes(size)),
+                             shapes(size, size, constraints, neighbors))
+
+    def test_saved(self):
+        self.catalog("grid", [PathConstraintWatcher]).shapes(4)
+
+        loaded = self.catalog("grid", [PathConstraintWatcher])
+
+        self.assertTrue(os.path.exists(loaded.file_path(4)))
+
+        with mock.patch.object(ShapeCatalog, "_build") as build:
+            self.assertEqual(len(loaded.shapes(4)), 14)
+            build.assert_not_called()
+
+    def test_invalid_file(self):
+        shape_catalog = self.catalog("grid", [PathConstraintWatcher])
+
+        with open(shape_catalog.file_path(3), "w",
+                  encoding="utf-8") as file:
+            file.write("{")
+
+        self.assertEqual(len(shape_catalog.shapes(3)), 6)
+
+    @parameterized.expand([
+        ("size", {"size": 3}),
+        ("geometry", {"geometry": "pyramid"}),
+        ("constraints", {"constraints": "planar"}),
+        ("max_shapes", {"max_shapes": 10, "shapes": None}),
+        ("not_normalized", {"shapes": [[[1, 0], [2, 0], [3, 0], [4, 0]]]}),
+        ("not_path", {"shapes": [[[0, 0], [1, 0], [0, 1], [1, 1]]]}),
+        ("dimension", {"shapes": [[[0, 0, 0], [1, 0, 0], [2, 0, 0],
+                                   [3, 0, 0]]]}),
+    ])
+    def test_mismatched_file(self, _, changes):
+        shape_catalog = self.catalog("grid", [PathConstraintWatcher])
+        shape_catalog.shapes(4)
+
+        path = shape_catalog.file_path(4)
+
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+        data.update(changes)
+
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(data, file)
+
+        loaded = self.catalog("grid", [PathConstraintWatcher])
+        self.assertEqual(len(loaded.shapes(4)), 14)
+
+        # The file was replaced by the rebuilt catalog
+        with mock.patch.object(ShapeCatalog, "_build") as build:
+            self.catalog("grid", [PathConstraintWatcher]).shapes(4)
+            build.assert_not_called()
+
+    def test_too_many(self):
+        shape_catalog = self.catalog("grid", [PathConstraintWatcher])
+
+        with mock.patch.object(catalog, "MAX_SHAPES", 20):
+            self.assertEqual(len(shape_catalog.shapes(4)), 14)
+            self.assertIsNone(shape_catalog.shapes(5))
+
+            with mock.patch.object(ShapeCatalog, "_build") as build:
+                self.assertIsNone(shape_catalog.tree(6))
+                build.assert_not_called()
+
+        # Larger sizes than the first one with too many shapes are skipped
+        self.assertTrue(os.path.exists(shape_catalog.file_path(5)))
+        self.assertFalse(os.path.exists(shape_catalog.file_path(6)))
+
+    def test_cancelled(self):
+        shape_catalog = self.catalog("grid", [PathConstraintWatcher])
+        shape_catalog.shapes(3)
+
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(CoveringStoppedException):
+            shape_catalog.shapes(5, token)
+
+        self.assertFalse(os.path.exists(shape_catalog.file_path(4)))
+        self.assertEqual(len(shape_catalog.shapes(5)), 34)
+
+    def test_tree(self):
+        shape_catalog = self.catalog("grid", [PathConstraintWatcher])
+
+        def leaves(tree, prefix=((0, 0),)):
+            if not tree:
+                return [prefix]
+
+            return [leaf for diff, subtree in tree
+                    for leaf in leaves(subtree, prefix + (diff,))]
+
+        self.assertEqual(sorted(leaves(shape_catalog.tree(5))),
+                         sorted(shape_catalog.shapes(5)))
+
+    def test_prefix_tree(self):
+        self.assertEqual(prefix_tree([(1, 2), (1, 3), (2, 3)]),
+                         ((1, ((2, ()), (3, ()))), (2, ((3, ()),))))
+
+    def test_supports(self):
+        self.assertTrue(ShapeCatalog.supports("grid",
+                                              [PathConstraintWatcher]))
+        self.assertFalse(ShapeCatalog.supports("grid", []))
+        self.assertFalse(ShapeCatalog.supports(None,
+                                               [PathConstraintWatcher]))
+        self.assertFalse(ShapeCatalog.supports(
+            "grid", [PathConstraintWatcher, GeneralConstraintWatcher]))
+
+
+class TestCatalogCovering(unittest.TestCase):
+    """
+    Tests for covering models with shapes from catalogs
+    """
+    @parameterized.expand([
+        ("2d_path", lambda: TwoDCoveringModel(8, 8, 3, 5),
+         PathConstraintWatcher),
+        ("pyramid_planar", lambda: PyramidCoveringModel(5, 3, 4),
+         PlanarConstraintWatcher),
+        ("pyramid_path", lambda: PyramidCoveringModel(4, 4, 5),
+         PathConstraintWatcher),
+    ])
+    def test_valid_covering(self, _, get_model, constraint):
+        model = get_model()
+        model.use_kernel = False
+        model.add_constraint(constraint)
+
+        # pylint: disable=protected-access
+        self.assertIsNotNone(model._catalog)
+
+        random.seed(1)
+        model.try_cover()
+
+        self.assertTrue(model.is_filled())
+
+        for block in model.blocks:
+            self.assertGreaterEqual(len(block.positions), model.min_block_size)
+            self.assertLessEqual(len(block.positions), model.max_block_size)
+            self.assertTrue(constraint.is_valid_block(
+                block.positions, lambda pos: list(model.neighbors(pos))))
+
+    def test_catalog_dir(self):
+        model = TwoDCoveringModel(6, 6, 3, 3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            model.catalog_dir = directory
+            model.add_constraint(PathConstraintWatcher)
+
+            random.seed(1)
+            model.try_cover()
+
+            self.assertTrue(os.path.exists(os.path.join(directory,
+                                                        "grid-path-3.json")))
+
+    def test_only_builtin_constraints(self):
+        model = TwoDCoveringModel(4, 4, 4, 4)
+        model.add_constraint(PathConstraintWatcher)
+        model.add_constraint(GeneralConstraintWatcher)
+
+        # pylint: disable=protected-access
+        self.assertIsNone(model._catalog)
+
+        model.remove_constraint(GeneralConstraintWatcher)
+        self.assertIsNotNone(model._catalog)
+
+        model.use_catalog = False
+        model.reset()
+        self.assertIsNone(model._catalog)
@@ -0,0 +1,148 @@
+"""
+Unittest for the checkpoint module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+from parameterized import parameterized
+
+from pycovering.kernel import AVAILABLE
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+from pycovering.constraints import PlanarConstraintWatcher
+from pycovering.checkpoint import Checkpointer, save_checkpoint, \
+                                  load_checkpoint, \
+                                  InvalidCheckpointException
+
+
+def pyramid_model():
+    model = PyramidCoveringModel(5, 3, 4)
+    model.add_constraint(PlanarConstraintWatcher)
+
+    return model
+
+
+def kernel_model():
+    model = TwoDCoveringModel(16, 16, 4, 4)
+    model.use_kernel = True
+    model.reset()
+
+    return model
+
+
+MODELS = [
+    ("2d", lambda: TwoDCoveringModel(10, 10, 4, 4)),
+    ("2d_sizes", lambda: TwoDCoveringModel(9, 7, 3, 5)),
+    ("pyramid", pyramid_model),
+    # Covered with the compiled kernel if it is available
+    ("2d_kernel", kernel_model),
+]
+
+
+def blocks(model):
+    return [tuple(block.positions) for block in model.blocks]
+
+
+class TestCheckpoint(unittest.TestCase):
+    """
+    Tests for saving and resuming coverings
+    """
+    @parameterized.expand(MODELS)
+    def test_resume(self, _, get_model):
+        saved = []
+
+        def checkpoint(model):
+            if len(model.blocks) == 5 and not saved:
+                # The state is pickled like in a checkpoint file
+                data = pickle.dumps(model.search_state())
+                saved.append(pickle.loads(data))
+
+        random.seed(3)
+        model = get_model()
+        model.try_cover(checkpoint=checkpoint)
+
+        random.seed(4)  # The random state is restored as well
+        resumed = get_model()
+        resumed.try_cover(resume_from=saved[0])
+
+        self.assertEqual(blocks(resumed), blocks(model))
+        self.assertEqual([block.color for block in resumed.blocks],
+                         [block.color for block in model.blocks])
+        self.assertGreaterEqual(resumed.progress().nodes,
+                                model.progress().nodes)
+
+    @unittest.skipUnless(AVAILABLE, "Numba is not installed")
+    def test_resume_kernel(self):
+        saved = []
+
+        def checkpoint(model):
+            if len(model.blocks) == 20 and not saved:
+                saved.append(pickle.loads(pickle.dumps(model.search_state())))
+
+        random.seed(3)
+        model = kernel_model()
+        model.try_cover(checkpoint=checkpoint)
+
+        # The kernel of a fresh model starts counting its steps from zero
+        resumed = kernel_model()
+        # pylint: disable=protected-access
+        self.assertIsNotNone(resumed._kernel)
+        self.assertGreater(saved[0]["kernel_checks"], 0)
+
+        resumed.try_cover(resume_from=saved[0])
+
+        self.assertEqual(blocks(resumed), blocks(model))
+        self.assertEqual(resumed._kernel.checks, model._kernel.checks)
+
+    def test_file(self):
+        model = TwoDCoveringModel(6, 6, 4, 4)
+        model.add_block([(0, 0), (1, 0), (2, 0), (3, 0)])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sub", "covering.ckpt")
+            save_checkpoint(model, path)
+
+            self.assertEqual(os.listdir(os.path.dirname(path)),
+                             ["covering.ckpt"])
+
+            state = load_checkpoint(path, TwoDCoveringModel(6, 6, 4, 4))
+
+        self.assertEqual(state["blocks"], [((0, 0), (1, 0), (2, 0), (3, 0))])
+
+    def test_different_model(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "covering.ckpt")
+            save_checkpoint(TwoDCoveringModel(6, 6, 4, 4), path)
+
+            with self.assertRaises(InvalidCheckpointException):
+                load_checkpoint(path, TwoDCoveringModel(6, 6, 3, 4))
+
+    def test_damaged(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "covering.ckpt")
+
+            with open(path, "wb") as file:
+                file.write(b"not a checkpoint")
+
+            with self.assertRaises(InvalidCheckpointException):
+                load_checkpoint(path, TwoDCoveringModel(6, 6, 4, 4))
+
+    def test_checkpointer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "covering.ckpt")
+            checkpointer = Checkpointer(path, interval=0)
+
+            model = TwoDCoveringModel(6, 6, 4, 4)
+            model.try_cover(checkpoint=checkpointer)
+
+            self.assertGreater(checkpointer.saved, 0)
+            self.assertTrue(os.path.exists(path))
+
+            checkpointer.remove()
+
+            self.assertFalse(os.path.exists(path))
@@ -68,6 +68,29 @@ class TestPathConstraintWatcher(ConstraintWatcherTest):
         self.watcher.rollback_state()
         self._insert_while_checking((1, 1), True)
 
+    def test_reset(self):
+        self._insert_initial([(0, 1), (0, 2)])
+
+        self.model.reset()
+        self.watcher.reset((3, 3))
+        self.model.state[(3, 3)] = Block.PLACEHOLDER
+
+        self._insert_while_checking((0, 3), False)
+        self._insert_initial([(3, 2), (2, 3)])
+
+    @parameterized.expand([
+        ("Line", [(0, 0), (0, 1), (0, 2), (0, 3)], True),
+        ("L", [(0, 0), (0, 1), (0, 2), (1, 2)], True),
+        ("T", [(0, 0), (1, 0), (2, 0), (1, 1)], False),
+        ("Square", [(0, 0), (1, 0), (0, 1), (1, 1)], False),
+        ("Disconnected", [(0, 0), (0, 2)], False)
+    ])
+    def test_is_valid_block(self, _, positions, expected):
+        self.assertEqual(
+            PathConstraintWatcher.is_valid_block(positions,
+                                                 self.model.neighbors),
+            expected)
+
 
 class TestPlanarConstraintWatcher(ConstraintWatcherTest):
     """
@@ -102,3 +125,24 @@ class TestPlanarConstraintWatcher(ConstraintWatcherTest):
         self._insert_initial(added_positions)
         self.watcher.rollback_state()
         self._insert_while_checking((0, 0, 1), True)
+
+    def test_reset(self):
+        self._insert_initial([(1, 0, 0), (0, 1, 0)])
+
+        self.model.reset()
+        self.watcher.reset((0, 0, 1))
+        self.model.state[(0, 0, 1)] = Block.PLACEHOLDER
+
+        self._insert_initial([(1, 0, 1), (0, 0, 2)])
+        self._insert_while_checking((0, 1, 1), False)
+
+    @parameterized.expand([
+        ("Line", [(0, 0, 0), (1, 0, 0), (2, 0, 0)], True),
+        ("Plane", [(0, 0, 0), (1, 0, 0), (0, 1, 0), (1, 1, 0)], True),
+        ("Not_plane", [(0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)], False)
+    ])
+    def test_is_valid_block(self, _, positions, expected):
+        self.assertEqual(
+            PlanarConstraintWatcher.is_valid_block(positions,
+                                                   self.model.neighbors),
+            expected)
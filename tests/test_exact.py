@@ -0,0 +1,106 @@
+"""
+Unittest for the exact module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+
+from collections import Counter
+
+from parameterized import parameterized
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel, \
+                              ImpossibleToFinishException
+from pycovering.constraints import PathConstraintWatcher
+from pycovering.canonical import canonical_form
+from pycovering.exact import ProfileEngine, UnsupportedModelException
+
+
+class TestProfileEngine(unittest.TestCase):
+    """
+    Tests for the ProfileEngine class
+    """
+    @parameterized.expand([
+        ("dominoes_2x3", 2, 3, 2, 2, 3),
+        ("dominoes_2x10", 2, 10, 2, 2, 89),
+        ("dominoes_8x8", 8, 8, 2, 2, 12988816),
+        ("tetrominoes_4x4", 4, 4, 4, 4, 117),
+        ("monominoes", 3, 3, 1, 1, 1),
+        ("odd_area", 3, 3, 2, 2, 0),
+        ("too_narrow", 1, 3, 2, 2, 0),
+    ])
+    # pylint: disable=too-many-arguments
+    def test_count_coverings(self, _, width, height, min_size, max_size,
+                             expected):
+        model = TwoDCoveringModel(width, height, min_size, max_size)
+
+        self.assertEqual(ProfileEngine(model).count_coverings(), expected)
+
+    def test_count_with_constraints(self):
+        model = TwoDCoveringModel(4, 4, 4, 4)
+        all_coverings = ProfileEngine(model).count_coverings()
+
+        model.add_constraint(PathConstraintWatcher)
+        paths = ProfileEngine(model).count_coverings()
+
+        self.assertLess(0, paths)
+        self.assertLess(paths, all_coverings)
+
+    def test_sample_covering(self):
+        model = TwoDCoveringModel(6, 5, 2, 4)
+        model.add_constraint(PathConstraintWatcher)
+
+        ProfileEngine(model).sample_covering(random.Random(1))
+
+        self.assertTrue(model.is_filled())
+
+        for block in model.blocks:
+            self.assertTrue(2 <= len(block.positions) <= 4)
+            self.assertTrue(PathConstraintWatcher.is_valid_block(
+                block.positions, model.neighbors))
+
+    def test_sample_all_coverings(self):
+        model = TwoDCoveringModel(2, 3, 2, 2)
+        engine = ProfileEngine(model)
+        rng = random.Random(0)
+
+        counts = Counter()
+
+        for _ in range(300):
+            engine.sample_covering(rng)
+            counts[tuple(sorted(tuple(sorted(block.positions))
+                                for block in model.blocks))] += 1
+
+        self.assertEqual(len(counts), 3)
+
+        for count in counts.values():
+            self.assertGreater(count, 50)
+
+    def test_sample_impossible(self):
+        model = TwoDCoveringModel(3, 3, 2, 2)
+
+        with self.assertRaises(ImpossibleToFinishException):
+            ProfileEngine(model).sample_covering()
+
+    def test_sample_distinct(self):
+        model = TwoDCoveringModel(4, 4, 4, 4)
+        engine = ProfileEngine(model)
+        rng = random.Random(2)
+
+        forms = set()
+
+        for _ in range(20):
+            engine.sample_covering(rng)
+            forms.add(canonical_form(model))
+
+        self.assertGreater(len(forms), 1)
+
+    @parameterized.expand([
+        ("too_wide", TwoDCoveringModel(13, 2, 2, 2)),
+        ("pyramid", PyramidCoveringModel(3, 2, 2)),
+    ])
+    def test_unsupported(self, _, model):
+        with self.assertRaises(UnsupportedModelException):
+            ProfileEngine(model)
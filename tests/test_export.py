@@ -0,0 +1,110 @@
+"""
+Unittest for the export module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import os
+import tempfile
+import unittest
+
+from xml.dom import minidom
+
+from parameterized import parameterized
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+from pycovering.export import get_layout, render_image, svg_lines, export, \
+                              export_format, ExportException, \
+                              CELL_SIZE, MARGIN, BACKGROUND
+
+
+class TestTwoDExport(unittest.TestCase):
+    """
+    Tests exporting TwoDCoveringModel coverings
+    """
+    def setUp(self):
+        self.model = TwoDCoveringModel(4, 2, 4, 4)
+        self.model.add_block([(0, 0), (1, 0), (0, 1), (1, 1)])
+        self.model.add_block([(2, 0), (3, 0), (2, 1), (3, 1)])
+
+    def test_layout(self):
+        layout = get_layout(self.model)
+
+        self.assertEqual((layout.width, layout.height), (4, 2))
+        self.assertEqual(len(layout.cells), 8)
+
+        # 12 outer edges and 2 between the blocks, each drawn once
+        self.assertEqual(len(layout.edges), 14)
+        self.assertEqual(len(set(layout.edges)), 14)
+
+    def test_layout_hidden(self):
+        self.model.blocks[0].visible = False
+
+        layout = get_layout(self.model)
+        colors = {(x, y): color for x, y, color in layout.cells}
+
+        self.assertIsNone(colors[(0, 0)])
+        self.assertEqual(colors[(2, 0)], self.model.blocks[1].color)
+
+    def test_render_image(self):
+        image = render_image(self.model)
+
+        self.assertEqual(image.width(), 4 * CELL_SIZE + 2 * MARGIN)
+        self.assertEqual(image.height(), 2 * CELL_SIZE + 2 * MARGIN)
+
+        center = MARGIN + CELL_SIZE // 2
+        pixel = image.pixelColor(center, center)
+
+        self.assertEqual((pixel.red(), pixel.green(), pixel.blue()),
+                         self.model.blocks[0].color)
+
+        corner = image.pixelColor(0, 0)
+        self.assertEqual((corner.red(), corner.green(), corner.blue()),
+                         BACKGROUND)
+
+    def test_svg(self):
+        document = minidom.parseString("\n".join(svg_lines(self.model)))
+
+        # Background and 8 cells
+        self.assertEqual(len(document.getElementsByTagName("rect")), 9)
+        self.assertEqual(len(document.getElementsByTagName("line")), 14)
+
+    @parameterized.expand([
+        ("png", "covering.png", b"\x89PNG"),
+        ("svg", "covering.svg", b"<?xml"),
+    ])
+    def test_export(self, _, name, header):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sub", name)
+            export(self.model, path)
+
+            with open(path, "rb") as file:
+                self.assertTrue(file.read().startswith(header))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ExportException):
+            export_format("covering.gif")
+
+
+class TestPyramidExport(unittest.TestCase):
+    """
+    Tests exporting PyramidCoveringModel coverings
+    """
+    def test_layout(self):
+        model = PyramidCoveringModel(3, 4, 4)
+        model.add_block([(0, 0, 0), (1, 0, 0), (2, 0, 0), (0, 0, 1)])
+
+        layout = get_layout(model)
+
+        # Three layers side by side with gaps between them
+        self.assertEqual((layout.width, layout.height), (11, 3))
+        self.assertEqual(len(layout.cells), model.total_positions())
+
+        colors = {(x, y): color for x, y, color in layout.cells}
+
+        color = model.blocks[0].color
+        self.assertEqual(colors[(0, 0)], color)
+        self.assertEqual(colors[(2, 0)], color)
+        self.assertEqual(colors[(4, 0)], color)
+        self.assertIsNone(colors[(0, 1)])
+        self.assertIsNone(colors[(8, 0)])
@@ -0,0 +1,297 @@
+"""
+Unittest for the kernel module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+
+from unittest import mock
+
+from parameterized import parameterized
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel, \
+                              Block, CancellationToken, \
+                              ProcessCancellationToken, \
+                              CoveringStoppedException
+from pycovering.constraints import GeneralConstraintWatcher, \
+                                   PathConstraintWatcher, \
+                                   PlanarConstraintWatcher
+from pycovering import kernel as kernel_module
+from pycovering.kernel import AVAILABLE, Kernel, np, _planar_accepts
+
+
+class AnyPositionWatcher(GeneralConstraintWatcher):
+    """
+    A custom watcher the kernel doesn't know
+    """
+    def commit(self):
+        self._states.append(None)
+
+    def _load_last_state(self):
+        pass
+
+    def check_position(self, pos):
+        return True
+
+    @classmethod
+    def is_valid_block(cls, positions, neighbors):
+        return True
+
+
+def with_kernel(model):
+    model.use_kernel = True
+    model.reset()
+
+    return model
+
+
+def covering(model, seed, jit=True):
+    model.reset()
+    model._kernel.jit = jit  # pylint: disable=protected-access
+
+    random.seed(seed)
+    model.try_cover()
+
+    return [tuple(block.positions) for block in model.blocks]
+
+
+def connected_blocks(model, start, size):
+    """
+    Returns all connected sets of `size` positions containing `start`
+    """
+    blocks = {frozenset([start])}
+
+    for _ in range(size - 1):
+        blocks = {block | {nbr} for block in blocks for pos in block
+                  for nbr in model.neighbors(pos) if nbr not in block}
+
+    return blocks
+
+
+MODELS = [
+    ("tetrominoes", lambda: with_kernel(TwoDCoveringModel(16, 16, 4, 4)),
+     None),
+    ("2d_path", lambda: with_kernel(TwoDCoveringModel(16, 16, 3, 5)),
+     PathConstraintWatcher),
+    ("pyramid_planar", lambda: with_kernel(PyramidCoveringModel(11, 3, 5)),
+     PlanarConstraintWatcher),
+]
+
+
+@unittest.skipUnless(AVAILABLE, "numba is not installed")
+class TestKernel(unittest.TestCase):
+    """
+    Tests for the compiled kernel
+    """
+    @parameterized.expand(MODELS)
+    def test_identical_results(self, _, get_model, constraint):
+        model = get_model()
+
+        if constraint is not None:
+            model.add_constraint(constraint)
+
+        self.assertEqual(covering(model, 1), covering(model, 1, jit=False))
+
+    @parameterized.expand(MODELS)
+    def test_valid_covering(self, _, get_model, constraint):
+        model = get_model()
+        constraints = []
+
+        if constraint is not None:
+            model.add_constraint(constraint)
+            constraints.append(constraint)
+
+        covering(model, 2)
+
+        self.assertTrue(model.is_filled())
+
+        for block in model.blocks:
+            self.assertGreaterEqual(len(block.positions),
+                                    model.min_block_size)
+            self.assertLessEqual(len(block.positions), model.max_block_size)
+
+            for watcher in constraints:
+                self.assertTrue(watcher.is_valid_block(
+                    block.positions, lambda pos: list(model.neighbors(pos))))
+
+    def test_opt_in(self):
+        # pylint: disable=protected-access
+        model = TwoDCoveringModel(16, 16, 4, 4)
+        self.assertIsNone(model._kernel)
+
+        with_kernel(model)
+        self.assertIsNotNone(model._kernel)
+
+        model.add_constraint(AnyPositionWatcher)
+        self.assertIsNone(model._kernel)
+
+        self.assertIsNone(with_kernel(TwoDCoveringModel(4, 4, 4, 4))._kernel)
+
+    @parameterized.expand(MODELS)
+    def test_seed_independent_of_numba(self, _, get_model, constraint):
+        def seeded_covering(use_kernel):
+            model = get_model()
+            model.use_kernel = use_kernel
+
+            if constraint is not None:
+                model.add_constraint(constraint)
+
+            model.reset()
+            random.seed(4)
+            model.try_cover()
+
+            return [tuple(block.positions) for block in model.blocks]
+
+        # The Python path without the kernel, although numba is installed
+        python = seeded_covering(False)
+
+        # A model asking for the kernel where numba isn't installed
+        with mock.patch.object(kernel_module, "AVAILABLE", False):
+            self.assertEqual(seeded_covering(True), python)
+
+    def test_blocks_are_synchronized(self):
+        model = with_kernel(TwoDCoveringModel(16, 16, 2, 2))
+        model.add_block([(0, 0), (1, 0)])
+        model.add_block([(2, 0), (3, 0)])
+        model.pop_block()
+
+        kernel = model._kernel  # pylint: disable=protected-access
+
+        self.assertEqual(int(kernel.occupied.sum()), 2)
+
+        model.reset()
+
+        self.assertEqual(int(kernel.occupied.sum()), 0)
+
+    @parameterized.expand([
+        ("thread", CancellationToken),
+        ("process", ProcessCancellationToken),
+    ])
+    def test_cancelled(self, _, token_cls):
+        # A path of 40 positions takes the kernel a long time to find
+        model = with_kernel(TwoDCoveringModel(20, 20, 40, 40))
+        model.add_constraint(PathConstraintWatcher)
+        kernel = model._kernel  # pylint: disable=protected-access
+
+        token = token_cls()
+        token.cancel()
+
+        self.assertIsNone(kernel.valid_step(model.INITIAL_POSITION, 40,
+                                            cancel_token=token))
+
+        self.assertEqual(int(kernel.occupied.sum()), 0)
+        self.assertTrue((kernel.where == -1).all())
+        self.assertEqual(int(kernel.count.sum()), 0)
+
+        with self.assertRaises(CoveringStoppedException):
+            model.try_cover(cancel_token=token)
+
+    @parameterized.expand([("jit", True), ("python", False)])
+    def test_planar_after_backtracking(self, _, jit):
+        accepts = _planar_accepts if jit else _planar_accepts.py_func
+        points = [(0, 0, 0), (1, 0, 0), (0, 1, 0), (2, 0, 0), (0, 0, 1)]
+        coords = np.array(points, np.int64)
+        block = np.array([0, 1, 0, 0], np.int64)
+        plane = np.zeros(5, np.int64)
+
+        # (0, 1, 0) sets the plane z = 0, then the search backtracks
+        self.assertTrue(accepts(2, 2, block, coords, plane))
+
+        # A collinear position determines no plane
+        self.assertTrue(accepts(3, 2, block, coords, plane))
+        block[2] = 3
+
+        self.assertEqual(
+            accepts(4, 3, block, coords, plane),
+            PlanarConstraintWatcher.is_valid_block(
+                [points[0], points[1], points[3], points[4]], None))
+
+    @parameterized.expand(MODELS)
+    def test_blocks_satisfy_watchers(self, _, get_model, constraint):
+        model = get_model()
+        constraints = [] if constraint is None else [constraint]
+
+        for watcher in constraints:
+            model.add_constraint(watcher)
+
+        blocks = covering(model, 3)
+
+        # Random partial states: a prefix of the covering is kept
+        rng = random.Random(3)
+        kernel = model._kernel  # pylint: disable=protected-access
+
+        for _ in range(5):
+            model.reset()
+
+            for block in blocks[:rng.randrange(len(blocks))]:
+                model.add_block(block)
+
+            empty = [pos for pos in model.all_positions()
+                     if model.state[pos] is Block.EMPTY]
+
+            for pos in rng.sample(empty, min(20, len(empty))):
+                size = rng.randint(model.min_block_size, model.max_block_size)
+                block = kernel.valid_step(pos, size, check_finishable=False)
+
+                if block is None:
+                    continue
+
+                self.assertEqual(len(set(block)), size)
+                self.assertEqual(block[0], pos)
+
+                for block_pos in block:
+                    self.assertIs(model.state[block_pos], Block.EMPTY)
+
+                for watcher in constraints:
+                    self.assertTrue(watcher.is_valid_block(
+                        block, lambda pos: list(model.neighbors(pos))))
+
+    @parameterized.expand([
+        ("2d_path", lambda: TwoDCoveringModel(4, 4, 2, 5),
+         [PathConstraintWatcher], (1, 1)),
+        ("pyramid_planar", lambda: PyramidCoveringModel(4, 2, 4),
+         [PlanarConstraintWatcher], (0, 0, 0)),
+        ("pyramid_planar_inner", lambda: PyramidCoveringModel(4, 2, 4),
+         [PlanarConstraintWatcher], (1, 0, 1)),
+        ("pyramid_path", lambda: PyramidCoveringModel(4, 2, 4),
+         [PathConstraintWatcher], (1, 0, 1)),
+    ])
+    def test_same_blocks_as_watchers(self, _, get_model, constraints, start):
+        model = get_model()
+        model.use_kernel = False
+        model.use_catalog = False
+
+        for watcher in constraints:
+            model.add_constraint(watcher)
+
+        kernel = Kernel(model)
+        kernel.set_sizes([True] * (model.total_positions() + 1), 0)
+
+        def neighbors(pos):
+            return list(model.neighbors(pos))
+
+        for size in range(2, model.max_block_size + 1):
+            for block in connected_blocks(model, start, size):
+                rest = [pos for pos in model.all_positions()
+                        if pos not in block]
+
+                # Only the positions of the block are empty, so a search
+                # from `start` finds it iff it accepts the block
+                model.add_block(rest)
+                kernel.fill(rest)
+
+                # pylint: disable=protected-access
+                found = model._valid_step(start, size, False) is not None
+                kernel_found = kernel.valid_step(start, size, False) \
+                    is not None
+
+                model.pop_block()
+                kernel.clear()
+
+                expected = all(watcher.is_valid_block(block, neighbors)
+                               for watcher in constraints)
+
+                self.assertEqual(found, expected, block)
+                self.assertEqual(kernel_found, expected, block)
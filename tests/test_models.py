@@ -4,12 +4,19 @@ Unittest for the models module
 
 # pylint: disable=missing-function-docstring
 
+import pickle
+import random
 import unittest
 import itertools as it
 
 from parameterized import parameterized
 
-from pycovering.models import TwoDCoveringModel, PyramidCoveringModel, Block
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel, \
+                              Block, CoveringStoppedException, \
+                              ImpossibleToFinishException, \
+                              CancellationToken, Frontier
+from pycovering.constraints import GeneralConstraintWatcher, \
+                                   PathConstraintWatcher
 
 
 class TestTwoDCoveringModel(unittest.TestCase):
@@ -40,6 +47,233 @@ class TestTwoDCoveringModel(unittest.TestCase):
             self.assertEqual(self.model.state[pos], Block.EMPTY,
                              f"Position {pos} should be empty, but is not")
 
+    def test_reset_reuses_state(self):
+        data = self.model.state.raw_data()
+
+        self.model.try_cover()
+        self.model.reset()
+
+        self.assertIs(self.model.state.raw_data(), data)
+        self.assertEqual(self.model.empty_positions(),
+                         self.model.total_positions())
+
+        for pos in self.model.all_positions():
+            self.assertIs(self.model.state[pos], Block.EMPTY)
+
+        self.model.set_size(self.WIDTH + 1, self.HEIGHT)
+
+        self.assertIsNot(self.model.state.raw_data(), data)
+        self.assertEqual(self.model.state[(self.WIDTH, 0)], Block.EMPTY)
+
+    def test_reset_after_stop(self):
+        model = self.model
+
+        class StoppingWatcher(GeneralConstraintWatcher):
+            """
+            Stops the covering while a block is being generated
+            """
+            def check_position(self, pos):
+                model.stop_covering()
+                return True
+
+            def commit(self):
+                pass
+
+            def _load_last_state(self):
+                pass
+
+            @classmethod
+            def is_valid_block(cls, positions, neighbors):
+                return True
+
+        model.add_constraint(StoppingWatcher)
+
+        with self.assertRaises(CoveringStoppedException):
+            model.try_cover()
+
+        model.remove_constraint(StoppingWatcher)
+
+        for pos in model.all_positions():
+            self.assertIs(model.state[pos], Block.EMPTY)
+
+        model.try_cover()
+        self.assertTrue(model.is_filled())
+
+    def test_stop_before_cover(self):
+        model = self.model
+        model.stop_covering()
+
+        with self.assertRaises(CoveringStoppedException):
+            model.try_cover()
+
+        with self.assertRaises(CoveringStoppedException):
+            model.try_cover(resume_from=model.search_state())
+
+        model.reset()
+        model.try_cover()
+        self.assertTrue(model.is_filled())
+
+    def test_cancelled_token(self):
+        token = CancellationToken()
+        token.cancel()
+
+        with self.assertRaises(CoveringStoppedException):
+            self.model.try_cover(cancel_token=token)
+
+        self.assertTrue(self.model.stopped)
+
+        for pos in self.model.all_positions():
+            self.assertIs(self.model.state[pos], Block.EMPTY)
+
+    def test_cancelled_during_finishability_check(self):
+        model = self.model
+        token = model.cancel_token = CancellationToken()
+        block = [(0, 0), (1, 0), (2, 0), (3, 0)]
+
+        for pos in block:
+            model.state[pos] = Block.PLACEHOLDER
+
+        token.cancel()
+
+        with self.assertRaises(CoveringStoppedException):
+            for _ in range(CancellationToken.POLL_INTERVAL):
+                # pylint: disable=protected-access
+                model._is_finishable_after(block, model.state)
+
+        for pos in model.all_positions():
+            self.assertIs(model.state[pos], Block.EMPTY)
+
+    def test_reset_after_failure(self):
+        # 16 positions can't be covered by blocks of size 3
+        self.model.set_block_size(3, 3)
+
+        with self.assertRaises(ImpossibleToFinishException):
+            self.model.try_cover()
+
+        self.model.set_block_size(4, 4)
+        self.model.reset()
+
+        for pos in self.model.all_positions():
+            self.assertIs(self.model.state[pos], Block.EMPTY)
+
+        self.model.try_cover()
+        self.assertTrue(self.model.is_filled())
+
+    def test_random_block_keeps_state(self):
+        block = self.model.random_block((0, 0))
+
+        self.assertEqual(len(block), 4)
+
+        for pos in self.model.all_positions():
+            self.assertIs(self.model.state[pos], Block.EMPTY)
+
+    def test_progress(self):
+        reports = []
+
+        self.model.try_cover(progress_callback=reports.append)
+
+        self.assertTrue(reports)
+
+        final = reports[-1]
+        self.assertEqual(final, self.model.progress())
+        self.assertEqual(final.filled, final.total)
+        self.assertEqual(final.total, self.model.total_positions())
+        self.assertEqual(final.depth, len(self.model.blocks))
+        self.assertGreaterEqual(final.nodes, len(self.model.blocks))
+        self.assertGreaterEqual(final.elapsed, 0)
+
+        self.model.reset()
+
+        self.assertEqual(self.model.progress().filled, 0)
+        self.assertEqual(self.model.progress().nodes, 0)
+
+    def test_block_key(self):
+        # pylint: disable=protected-access
+        coverer = self.model._coverer
+        block = [(1, 0), (1, 1), (2, 1), (3, 1)]
+
+        self.assertEqual(coverer.block_key(block, (1, 0)), 0b1110001)
+        self.assertEqual(coverer.block_key(block[::-1], (1, 0)),
+                         coverer.block_key(block, (1, 0)))
+        self.assertEqual(coverer.block_key([(0, 2)], (0, 0)), 1 << 8)
+
+    def test_tried_blocks(self):
+        model = TwoDCoveringModel(8, 8, 4, 4)
+
+        random.seed(1)
+        model.try_cover(check_finishable=False)
+
+        progress = model.progress()
+
+        self.assertGreater(progress.backtracks, 0)
+        self.assertGreater(progress.block_lookups, 0)
+        self.assertGreater(progress.stack_bytes, 0)
+        self.assertLessEqual(progress.tried_blocks, progress.backtracks)
+
+        model.reset()
+
+        self.assertEqual(model.progress().tried_blocks, 0)
+        self.assertEqual(model.progress().block_lookups, 0)
+
+    def test_watchers_rolled_back_after_unfinishable_block(self):
+        model = self.model
+        watchers = []
+
+        class RecordingWatcher(GeneralConstraintWatcher):
+            """
+            Remembers the positions of the block
+            """
+            def __init__(self, model, pos):
+                super().__init__(model, pos)
+                self._positions = [pos]
+                self.commit()
+                watchers.append(self)
+
+            def commit(self):
+                self._states.append(list(self._positions))
+
+            def _load_last_state(self):
+                self._positions = list(self._states[-1])
+
+            def check_position(self, pos):
+                super().check_position(pos)
+                self._positions.append(pos)
+                return True
+
+            @classmethod
+            def is_valid_block(cls, positions, neighbors):
+                return True
+
+        model.add_constraint(RecordingWatcher)
+        checks = []
+
+        def is_finishable_after(block, _):
+            checks.append(tuple(block))
+            return len(checks) > 3
+
+        # pylint: disable=protected-access
+        model._is_finishable_after = is_finishable_after
+        block = model._valid_step((0, 0), 4)
+
+        self.assertEqual(len(checks), 4)
+        self.assertEqual(watchers[0]._states[-1], list(block))
+
+    def test_watchers_reused(self):
+        model = self.model
+        model.use_kernel = False
+        model.use_catalog = False
+        model.add_constraint(PathConstraintWatcher)
+
+        # pylint: disable=protected-access
+        watchers = model._get_watchers((0, 0))
+        model.try_cover()
+
+        self.assertTrue(model.is_filled())
+        self.assertIs(model._get_watchers((0, 0))[0], watchers[0])
+
+        model.remove_constraint(PathConstraintWatcher)
+        self.assertEqual(model._get_watchers((0, 0)), [])
+
     @parameterized.expand([
         ("empty", [], False),
         ("partially_filled", [(0, 0), (1, 1)], False),
@@ -53,6 +287,46 @@ class TestTwoDCoveringModel(unittest.TestCase):
     def test_total_positions(self):
         self.assertEqual(self.model.total_positions(), 16)
 
+    @parameterized.expand([
+        ("too_small", 3, 4, 5, False),
+        ("between_sizes", 7, 4, 5, False),
+        ("sum_of_sizes", 9, 4, 5, True),
+        ("large", 12, 4, 5, True),
+        ("not_divisible", 10, 4, 4, False),
+        ("divisible", 12, 4, 4, True)
+    ])
+    # pylint: disable=too-many-arguments
+    def test_is_finishable(self, _, length, min_size, max_size, expected):
+        model = TwoDCoveringModel(length, 1, min_size, max_size)
+
+        # pylint: disable=protected-access
+        self.assertEqual(model._is_finishable(), expected)
+
+    @parameterized.expand([
+        ("small_component", 1, False),
+        ("split_large_component", 17, False),
+        ("one_large_component", 16, True),
+        ("other_large_component", 20, True),
+        ("border", 0, True)
+    ])
+    def test_is_locally_finishable(self, _, start, expected):
+        model = TwoDCoveringModel(40, 1, 4, 4)
+
+        block = [(x, 0) for x in range(start, start + 4)]
+        model.add_block(block)
+
+        # pylint: disable=protected-access
+        self.assertEqual(model._is_locally_finishable(block, model.state),
+                         expected)
+        self.assertEqual(model._is_finishable(), expected)
+
+    def test_size_table_update(self):
+        model = TwoDCoveringModel(7, 1, 4, 5)
+        model.set_block_size(3, 4)
+
+        # pylint: disable=protected-access
+        self.assertTrue(model._is_finishable())
+
     def test_add_tile(self):
         tile1 = [(0, 0), (0, 1), (0, 2)]
         tile2 = [(1, 0), (1, 1), (1, 2)]
@@ -156,3 +430,150 @@ class TestPyramidCoveringModel(unittest.TestCase):
 
         self.model.add_block(tile2)
         self.assertEqual(self.model.empty_positions(), total - 6)
+
+
+class TestFrontier(unittest.TestCase):
+    """
+    Tests for the Frontier class
+    """
+    def setUp(self):
+        self.model = TwoDCoveringModel(5, 5, 4, 4)
+        self.frontier = Frontier(self.model, self.model.state)
+
+    def push(self, pos):
+        self.model.state[pos] = Block.PLACEHOLDER
+        self.frontier.push(pos)
+
+    def pop(self, pos):
+        self.frontier.pop()
+        self.model.state[pos] = Block.EMPTY
+
+    def test_neighbors(self):
+        self.push((2, 2))
+        self.assertEqual(set(self.frontier.positions),
+                         {(1, 2), (3, 2), (2, 1), (2, 3)})
+
+        self.push((2, 3))
+        self.assertEqual(set(self.frontier.positions),
+                         {(1, 2), (3, 2), (2, 1), (1, 3), (3, 3), (2, 4)})
+
+        self.pop((2, 3))
+        self.assertEqual(set(self.frontier.positions),
+                         {(1, 2), (3, 2), (2, 1), (2, 3)})
+
+    def test_pop_restores_order(self):
+        self.push((0, 0))
+        self.push((1, 0))
+        before = list(self.frontier.positions)
+
+        self.push((1, 1))
+        self.push((2, 1))
+        self.pop((2, 1))
+        self.pop((1, 1))
+
+        self.assertEqual(self.frontier.positions, before)
+
+    def test_levels(self):
+        self.push((2, 2))
+        before = list(self.frontier.positions)
+
+        self.frontier.open_level()
+        drawn = []
+
+        while True:
+            pos = self.frontier.sample()
+
+            if pos is None:
+                break
+
+            drawn.append(pos)
+
+            # A deeper level changes and restores the frontier
+            self.push(pos)
+            self.frontier.open_level()
+            self.frontier.sample()
+            self.frontier.close_level()
+            self.pop(pos)
+
+        self.frontier.close_level()
+
+        self.assertEqual(sorted(drawn), sorted(before))
+        self.assertEqual(self.frontier.positions, before)
+
+
+class TestCancellationToken(unittest.TestCase):
+    """
+    Tests for the CancellationToken classes
+    """
+    def test_poll_interval(self):
+        token = CancellationToken()
+        token.cancel()
+
+        for _ in range(CancellationToken.POLL_INTERVAL - 1):
+            token.poll()
+
+        with self.assertRaises(CoveringStoppedException):
+            token.poll()
+
+    def test_pickling(self):
+        token = CancellationToken()
+        token.cancel()
+
+        self.assertTrue(pickle.loads(pickle.dumps(token)).cancelled())
+
+    def test_model_pickling(self):
+        model = TwoDCoveringModel(2, 2, 4, 4)
+        restored = pickle.loads(pickle.dumps(model))
+
+        restored.stop_covering()
+
+        self.assertTrue(restored.stopped)
+        self.assertFalse(model.stopped)
+
+
+class TestBlock(unittest.TestCase):
+    """
+    Tests for the Block class
+    """
+    def test_color_is_derived(self):
+        block1 = Block(3, seed=42)
+        block2 = Block(3, seed=42)
+        block3 = Block(4, seed=42)
+
+        self.assertEqual(block1.color, block2.color)
+        self.assertNotEqual(block1.color, block3.color)
+
+        for channel in block1.color:
+            self.assertTrue(0 <= channel <= 255)
+
+    def test_color_can_be_set(self):
+        block = Block(1)
+        block.color = (1, 2, 3)
+
+        self.assertEqual(block.color, (1, 2, 3))
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            # pylint: disable=assigning-non-slot
+            Block(1).something = 1
+
+    def test_sentinels_are_immutable(self):
+        with self.assertRaises(AttributeError):
+            Block.EMPTY.visible = False
+
+        with self.assertRaises(AttributeError):
+            Block.PLACEHOLDER.add_position((0, 0))
+
+    def test_sentinels_survive_pickling(self):
+        model = TwoDCoveringModel(2, 2, 4, 4)
+        restored = pickle.loads(pickle.dumps(model))
+
+        self.assertIs(restored.state[(0, 0)], Block.EMPTY)
+        self.assertIs(pickle.loads(pickle.dumps(Block.PLACEHOLDER)),
+                      Block.PLACEHOLDER)
+
+    def test_sentinels_are_shared(self):
+        model = TwoDCoveringModel(2, 2, 4, 4)
+        TwoDCoveringModel(3, 3, 4, 4)  # Must not replace the sentinels
+
+        self.assertIs(model.state[(0, 0)], Block.EMPTY)
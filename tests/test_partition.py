@@ -0,0 +1,120 @@
+"""
+Unittest for the partition module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import random
+import unittest
+
+from parameterized import parameterized
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel, \
+                              ImpossibleToFinishException
+from pycovering.constraints import PathConstraintWatcher
+from pycovering.partition import cover_partitioned, split, seam_windows, \
+                                 is_coverable_area
+
+
+class TestSplit(unittest.TestCase):
+    """
+    Tests for splitting rectangles into tiles
+    """
+    @parameterized.expand([
+        (100, 100, 4, 4, 25),
+        (101, 99, 3, 5, 25),
+        (7, 300, 4, 4, 24),
+        (30, 30, 5, 5, 10),
+        (11, 13, 2, 3, 5),
+    ])
+    def test_tiles_are_coverable(self, width, height, min_size, max_size,
+                                 tile_size):
+        widths, heights = split(width, height, min_size, max_size, tile_size)
+
+        self.assertEqual(sum(widths), width)
+        self.assertEqual(sum(heights), height)
+
+        for tile_width in widths:
+            for tile_height in heights:
+                self.assertTrue(is_coverable_area(tile_width * tile_height,
+                                                  min_size, max_size))
+
+    def test_tile_count(self):
+        widths, heights = split(100, 50, 4, 4, 25)
+
+        self.assertEqual((len(widths), len(heights)), (4, 2))
+
+    def test_impossible(self):
+        with self.assertRaises(ImpossibleToFinishException):
+            split(5, 5, 4, 4)
+
+    def test_seam_windows(self):
+        windows = seam_windows([10, 10], [20], 2)
+
+        self.assertEqual(windows, [(8, 0, 12, 4), (8, 4, 12, 8),
+                                   (8, 8, 12, 12), (8, 12, 12, 16),
+                                   (8, 16, 12, 20)])
+        self.assertEqual(seam_windows([10, 10], [20], 2, 2)[:2],
+                         [(8, 0, 12, 2), (8, 2, 12, 6)])
+
+
+class TestCoverPartitioned(unittest.TestCase):
+    """
+    Tests for covering by parts
+    """
+    @parameterized.expand([
+        ("tetrominoes", 48, 40, 4, 4, False, 1),
+        ("sizes", 41, 37, 3, 5, False, 1),
+        ("path", 40, 30, 3, 5, True, 1),
+        ("workers", 48, 48, 3, 5, False, 2),
+    ])
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def test_valid_covering(self, _, width, height, min_size, max_size,
+                            path, workers):
+        model = TwoDCoveringModel(width, height, min_size, max_size)
+
+        if path:
+            model.add_constraint(PathConstraintWatcher)
+
+        random.seed(1)
+        cover_partitioned(model, tile_size=16, workers=workers)
+
+        self.assertTrue(model.is_filled())
+
+        for block in model.blocks:
+            self.assertGreaterEqual(len(block.positions), min_size)
+            self.assertLessEqual(len(block.positions), max_size)
+
+            if path:
+                self.assertTrue(PathConstraintWatcher.is_valid_block(
+                    block.positions, lambda pos: list(model.neighbors(pos))))
+
+    def test_renumbered(self):
+        model = TwoDCoveringModel(32, 32, 4, 4)
+        cover_partitioned(model, tile_size=16, workers=1)
+
+        firsts = [min((y, x) for x, y in block.positions)
+                  for block in model.blocks]
+
+        self.assertEqual(firsts, sorted(firsts))
+        self.assertEqual([block.number for block in model.blocks],
+                         list(range(1, len(model.blocks) + 1)))
+
+    def test_seams_randomized(self):
+        model = TwoDCoveringModel(48, 48, 3, 5)
+
+        def crossing():
+            return sum(1 for block in model.blocks
+                       if len({(x // 16, y // 16)
+                               for x, y in block.positions}) > 1)
+
+        random.seed(2)
+        cover_partitioned(model, tile_size=16, workers=1, seam_passes=0)
+        self.assertEqual(crossing(), 0)
+
+        cover_partitioned(model, tile_size=16, workers=1)
+        self.assertGreater(crossing(), 0)
+
+    def test_only_rectangles(self):
+        with self.assertRaises(ValueError):
+            cover_partitioned(PyramidCoveringModel(4, 4, 4))
@@ -0,0 +1,65 @@
+"""
+Unittest for the serialization module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import json
+import unittest
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+from pycovering.constraints import PathConstraintWatcher
+from pycovering.serialization import model_to_dict, model_from_dict, \
+                                     model_from_params, \
+                                     InvalidModelDataException
+
+
+class TestSerialization(unittest.TestCase):
+    """
+    Tests for model (de)serialization
+    """
+    def _assert_same_covering(self, model1, model2):
+        self.assertEqual(list(model1.all_positions()),
+                         list(model2.all_positions()))
+
+        for pos in model1.all_positions():
+            self.assertEqual(model1.state[pos].number,
+                             model2.state[pos].number)
+
+        for block1, block2 in zip(model1.blocks, model2.blocks):
+            self.assertEqual(block1.color, block2.color)
+
+    def test_two_d_roundtrip(self):
+        model = TwoDCoveringModel(4, 3, 2, 4)
+        model.add_constraint(PathConstraintWatcher)
+
+        model.add_block([(0, 0), (1, 0), (2, 0), (3, 0)])
+        model.add_block([(0, 1), (0, 2)])
+        model.add_block([(1, 1), (2, 1), (3, 1)])
+        model.add_block([(1, 2), (2, 2), (3, 2)])
+
+        data = json.loads(json.dumps(model_to_dict(model)))
+        restored = model_from_dict(data)
+
+        self.assertTrue(restored.is_filled())
+        self.assertEqual(restored.constraint_watchers,
+                         [PathConstraintWatcher])
+        self._assert_same_covering(model, restored)
+
+    def test_pyramid_roundtrip(self):
+        model = PyramidCoveringModel(4, 4, 4)
+        model.try_cover()
+
+        data = json.loads(json.dumps(model_to_dict(model)))
+        restored = model_from_dict(data)
+
+        self.assertEqual(restored.size, 4)
+        self._assert_same_covering(model, restored)
+
+    def test_invalid_params(self):
+        with self.assertRaises(InvalidModelDataException):
+            model_from_params({"model": "2d", "width": 4})
+
+        with self.assertRaises(InvalidModelDataException):
+            model_from_params({"model": "2d", "width": 4, "height": 4,
+                               "min_block_size": 5, "max_block_size": 4})
@@ -0,0 +1,40 @@
+"""
+Unittest for the server module (worker side)
+"""
+
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from pycovering.server import cover
+
+
+class TestCover(unittest.TestCase):
+    """
+    Tests for the `cover` worker function
+    """
+    def test_success(self):
+        response = cover({"model": "2d", "width": 4, "height": 4,
+                          "min_block_size": 4, "max_block_size": 4})
+
+        self.assertEqual(response["status"], "ok")
+        self.assertEqual(len(response["covering"]["blocks"]), 4)
+
+    def test_failed(self):
+        response = cover({"model": "2d", "width": 3, "height": 3,
+                          "min_block_size": 4, "max_block_size": 4})
+
+        self.assertEqual(response["status"], "failed")
+
+    def test_timeout(self):
+        response = cover({"model": "2d", "width": 80, "height": 80,
+                          "min_block_size": 4, "max_block_size": 4,
+                          "timeout": 0.01})
+
+        self.assertEqual(response["status"], "timeout")
+
+    def test_invalid(self):
+        response = cover({"model": "hexagon", "min_block_size": 4,
+                          "max_block_size": 4})
+
+        self.assertEqual(response["status"], "invalid")
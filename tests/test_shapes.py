@@ -0,0 +1,60 @@
+"""
+Unittest for the shapes module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import unittest
+
+from parameterized import parameterized
+
+from pycovering.shapes import shapes, normalize, pyramid_neighbors
+from pycovering.models import PyramidCoveringModel
+from pycovering.constraints import PathConstraintWatcher
+
+
+class TestShapes(unittest.TestCase):
+    """
+    Tests for the block shape enumeration
+    """
+    # Numbers of fixed polyominoes
+    @parameterized.expand([
+        (1, 1), (2, 2), (3, 6), (4, 19), (5, 63), (6, 216)
+    ])
+    def test_count(self, size, expected):
+        self.assertEqual(len(shapes(size, size)), expected)
+
+    def test_size_range(self):
+        self.assertEqual(len(shapes(2, 4)), 2 + 6 + 19)
+
+    def test_constraints(self):
+        # All tetrominoes except for the square and four T's are paths
+        self.assertEqual(len(shapes(4, 4, [PathConstraintWatcher])), 14)
+
+    def test_normalized(self):
+        for shape in shapes(1, 5):
+            self.assertEqual(shape[0], (0, 0))
+            self.assertEqual(normalize(shape), shape)
+
+    def test_normalize(self):
+        self.assertEqual(normalize([(3, 2), (2, 3), (3, 3)]),
+                         ((0, 0), (-1, 1), (0, 1)))
+
+    def test_normalize_pyramid(self):
+        self.assertEqual(normalize([(1, 1, 1), (2, 0, 2), (1, 2, 1)]),
+                         ((0, 0, 0), (0, 1, 0), (1, -1, 1)))
+
+    def test_pyramid_neighbors(self):
+        model = PyramidCoveringModel(5, 4, 4)
+        pos = (1, 1, 1)
+
+        self.assertEqual(sorted(pyramid_neighbors(pos)),
+                         sorted(model.neighbors(pos)))
+
+    def test_pyramid_shapes(self):
+        # Every position has twelve neighbors, half of them come later
+        self.assertEqual(len(shapes(2, 2, neighbors=pyramid_neighbors)), 6)
+
+        for shape in shapes(1, 3, neighbors=pyramid_neighbors):
+            self.assertEqual(shape[0], (0, 0, 0))
+            self.assertEqual(normalize(shape), shape)
@@ -0,0 +1,108 @@
+"""
+Unittest for the streaming module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import io
+import random
+import unittest
+
+from collections import defaultdict
+
+from parameterized import parameterized
+
+from pycovering.models import ImpossibleToFinishException
+from pycovering.constraints import PathConstraintWatcher
+from pycovering.streaming import StripStreamer, stream_covering, stream_rows
+
+
+def params(width, height, min_size, max_size, constraints=()):
+    return {
+        "model": "2d",
+        "width": width,
+        "height": height,
+        "min_block_size": min_size,
+        "max_block_size": max_size,
+        "constraints": list(constraints)
+    }
+
+
+def neighbors(width, height):
+    def get_neighbors(pos):
+        x, y = pos
+
+        return [(x + dx, y + dy)
+                for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1))
+                if 0 <= x + dx < width and 0 <= y + dy < height]
+
+    return get_neighbors
+
+
+class TestStreaming(unittest.TestCase):
+    """
+    Tests for streaming coverings of long strips
+    """
+    @parameterized.expand([
+        ("tetrominoes", 12, 300, 4, 4, ()),
+        ("sizes", 5, 203, 2, 3, ()),
+        ("path", 8, 150, 3, 5, ("path",)),
+        ("short", 4, 10, 4, 4, ()),
+    ])
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    def test_valid_covering(self, _, width, height, min_size, max_size,
+                            constraints):
+        random.seed(1)
+        streamer = StripStreamer(params(width, height, min_size, max_size,
+                                        constraints))
+        blocks = defaultdict(list)
+        rows = 0
+
+        for y, row in enumerate(streamer.covering_rows()):
+            self.assertEqual(len(row), width)
+            rows += 1
+
+            for x, number in enumerate(row):
+                blocks[number].append((x, y))
+
+        self.assertEqual(rows, height)
+        self.assertEqual(sorted(blocks), list(range(1, len(blocks) + 1)))
+        self.assertEqual(streamer.blocks, len(blocks))
+
+        for positions in blocks.values():
+            self.assertGreaterEqual(len(positions), min_size)
+            self.assertLessEqual(len(positions), max_size)
+
+            if constraints:
+                self.assertTrue(PathConstraintWatcher.is_valid_block(
+                    positions, neighbors(width, height)))
+
+    def test_bounded_window(self):
+        streamer = StripStreamer(params(6, 1000, 4, 4))
+        heights = set()
+
+        for _ in streamer.covering_rows():
+            # pylint: disable=protected-access
+            heights.add(streamer._model.height)
+
+        self.assertLessEqual(max(heights), 2 * streamer.rows)
+
+    def test_stream_rows(self):
+        self.assertEqual(stream_rows(5, 4, 4), 16)
+        self.assertEqual(stream_rows(5, 4, 4, 2), 4)
+        self.assertEqual(stream_rows(3, 5, 5, 16), 20)
+
+    def test_output(self):
+        out = io.StringIO()
+        stream_covering(params(4, 40, 4, 4), out)
+
+        lines = out.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 40)
+        self.assertEqual(lines[0].split()[0], "1")
+
+    def test_impossible(self):
+        streamer = StripStreamer(params(3, 10, 4, 4))
+
+        with self.assertRaises(ImpossibleToFinishException):
+            list(streamer.covering_rows())
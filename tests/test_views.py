@@ -0,0 +1,76 @@
+"""
+Unittest for the views module
+"""
+
+# pylint: disable=missing-function-docstring
+
+import io
+import unittest
+import unittest.mock
+
+from pycovering.models import TwoDCoveringModel, PyramidCoveringModel
+from pycovering.views import TwoDPrintView, PyramidPrintView
+
+
+class TestTwoDPrintView(unittest.TestCase):
+    """
+    Tests for the TwoDPrintView class
+    """
+    def setUp(self):
+        self.model = TwoDCoveringModel(4, 2, 4, 4)
+        self.model.add_block([(0, 0), (1, 0), (0, 1), (1, 1)])
+        self.model.add_block([(2, 0), (3, 0), (2, 1), (3, 1)])
+
+        self.view = TwoDPrintView()
+
+    def test_render_text(self):
+        out = io.StringIO()
+        self.view.render(self.model, out)
+
+        self.assertEqual(out.getvalue(), "1 1 2 2 \n1 1 2 2 \n")
+
+    def test_render_binary(self):
+        out = io.BytesIO()
+        self.view.render(self.model, out)
+
+        self.assertEqual(out.getvalue(), b"1 1 2 2 \n1 1 2 2 \n")
+
+    def test_render_hidden(self):
+        self.model.blocks[0].visible = False
+
+        out = io.StringIO()
+        self.view.render(self.model, out)
+
+        self.assertEqual(out.getvalue(), "    2 2 \n    2 2 \n")
+
+    def test_render_in_chunks(self):
+        model = TwoDCoveringModel(1, 10, 1, 1)
+
+        for y in range(10):
+            model.add_block([(0, y)])
+
+        class SmallChunkView(TwoDPrintView):
+            """
+            Writes three lines at once
+            """
+            CHUNK_LINES = 3
+
+        out = unittest.mock.Mock()
+        SmallChunkView().render(model, out)
+
+        self.assertEqual(out.write.call_count, 4)
+
+
+class TestPyramidPrintView(unittest.TestCase):
+    """
+    Tests for the PyramidPrintView class
+    """
+    def test_render(self):
+        model = PyramidCoveringModel(2, 4, 4)
+        model.add_block(list(model.all_positions()))
+
+        out = io.StringIO()
+        PyramidPrintView().render(model, out)
+
+        expected = "\nLayer 1\n\n1 1 \n 1 \n\nLayer 2\n\n1 \n"
+        self.assertEqual(out.getvalue(), expected)